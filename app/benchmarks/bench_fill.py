@@ -0,0 +1,78 @@
+"""NA imputation benchmark
+
+This script compares the time to fill all the 'NA' values of wide synthetic
+datasets using the previous per-column loop, which called fillna and mode
+on each column, against the vectorized engine of the cleaning module, both
+computing the statistics and reusing precomputed fill values.
+
+To execute this benchmark just open a terminal under the app folder and
+type the command:
+python -m benchmarks.bench_fill <rows> <extra_columns>
+"""
+# importing needed libraries
+import argparse
+import time
+
+import pandas as pd
+
+# importing needed modules
+from benchmarks.synthetic import generate_data
+from src import cleaning as cln
+
+
+def fill_per_column(data: pd.DataFrame) -> pd.DataFrame:
+    """Fill the 'NA' values with the previous per-column loop.
+
+    Args:
+        data (pd.DataFrame): the dataframe to be filled.
+
+    Returns:
+        data_imputed (pd.DataFrame): the dataframe filled.
+    """
+    data_imputed = data.copy()
+    for col in data_imputed.columns:
+        if data_imputed[col].dtype in ("float64", "int64"):
+            fill_value = data_imputed[col].mean()
+        else:
+            fill_value = data_imputed[col].mode()[0]
+        data_imputed[col] = data_imputed[col].fillna(fill_value)
+    return data_imputed
+
+
+def best_time(function, repeat: int = 5) -> float:
+    """Return the best wall time of several calls of a function.
+
+    Args:
+        function (Callable): the function to be called without arguments.
+        repeat (int): the number of calls.
+
+    Returns:
+        float: the minimum time in seconds.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="bench_fill",
+        description="per-column against vectorized NA imputation")
+    parser.add_argument("rows", type=int, nargs="?", default=100000)
+    parser.add_argument("extra_columns", type=int, nargs="?", default=40)
+    args = parser.parse_args()
+    data = generate_data(args.rows, extra_columns=args.extra_columns)
+    fill_values = cln.compute_fill_values(data)
+    results = {
+        "per-column loop": best_time(lambda: fill_per_column(data)),
+        "vectorized": best_time(lambda: cln.fill_all_na_values(data)),
+        "precomputed": best_time(
+            lambda: cln.fill_all_na_values(data, fill_values=fill_values)
+        ),
+    }
+    print(f"rows={args.rows} columns={data.shape[1]}")
+    for name, seconds in results.items():
+        print(f"{name:16} {seconds * 1000:9.1f}ms")
@@ -0,0 +1,85 @@
+"""Compiled forest benchmark
+
+This script measures the latency of the predictions of a random forest
+trained with a synthetic dataset, once with the predict method of
+scikit-learn and once with the compiled forest, for each batch size given,
+checking that both predictions are identical.
+
+It uses the CompiledForest class of the forest module.
+
+To execute this benchmark just open a terminal under the app folder and
+type the command:
+python -m benchmarks.bench_forest [--rows 10000] [--batches 1 100 100000]
+"""
+# importing needed libraries
+import argparse
+import time
+
+import numpy as np
+
+# importing needed modules
+from benchmarks.synthetic import generate_data
+from main import GOAL_VARIABLE, build_pipeline
+from src import training as trn
+from src.forest import CompiledForest
+
+
+def best_time(function, batch: np.ndarray, min_time: float = 0.5) -> float:
+    """Call a function with a batch until the minimum time passes.
+
+    Args:
+        function (Callable): the predict function.
+        batch (np.ndarray): the rows predicted.
+        min_time (float): the seconds spent on the repetitions.
+
+    Returns:
+        float: the fastest call, in seconds.
+    """
+    fastest, spent = float("inf"), 0.0
+    while spent < min_time or fastest == float("inf"):
+        start = time.perf_counter()
+        function(batch)
+        elapsed = time.perf_counter() - start
+        fastest, spent = min(fastest, elapsed), spent + elapsed
+    return fastest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="bench_forest",
+        description="latency of the compiled forest by batch size")
+    parser.add_argument(
+        "--rows", type=int, default=10000,
+        help="rows of the dataset the forest is trained with")
+    parser.add_argument("--max-leaf", type=int, default=250)
+    parser.add_argument(
+        "--batches", type=int, nargs="+", default=[1, 100, 100000])
+    args = parser.parse_args()
+    fitted_pipeline = build_pipeline()
+    final_data = fitted_pipeline.fit_transform(generate_data(args.rows))
+    X = fitted_pipeline.to_matrix(final_data)
+    model = trn.build_model(args.max_leaf, n_jobs=1).set_params(
+        random_state=0
+    ).fit(X, final_data[GOAL_VARIABLE].to_numpy(dtype=np.float64))
+    start = time.perf_counter()
+    compiled_forest = CompiledForest(model)
+    print(
+        f"trees={len(model.estimators_)} "
+        f"nodes={len(compiled_forest.value_)} "
+        f"compiled in {(time.perf_counter() - start) * 1000:.1f}ms"
+    )
+    rows = np.random.default_rng(0).integers(0, len(X), max(args.batches))
+    inputs = np.ascontiguousarray(X[rows])
+    for size in args.batches:
+        batch = inputs[:size]
+        sklearn_time = best_time(model.predict, batch)
+        compiled_time = best_time(compiled_forest.predict, batch)
+        identical = np.array_equal(
+            model.predict(batch), compiled_forest.predict(batch)
+        )
+        print(
+            f"batch={size:<7} sklearn={sklearn_time * 1000:9.3f}ms "
+            f"compiled={compiled_time * 1000:9.3f}ms "
+            f"speedup={sklearn_time / compiled_time:.2f}x "
+            f"identical={identical}"
+        )
@@ -0,0 +1,124 @@
+"""Start time of the subcommands of the main module
+
+This script runs each subcommand of the main module in a new Python process
+with the -X importtime option and reports the wall time of the process, the
+time spent importing modules and which heavy libraries were imported. The
+predict, validate and eda subcommands run over small synthetic files with a
+model trained and saved in a temporary folder, while the train subcommand
+only parses its arguments, since its start time is negligible compared to
+the training itself.
+
+To execute this benchmark just open a terminal under the app folder and
+type the command:
+python -m benchmarks.bench_import [rows]
+"""
+# importing needed libraries
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+# importing needed modules
+from benchmarks.synthetic import write_datasets
+from main import GOAL_VARIABLE, build_pipeline
+from src import artifacts as art
+from src import ingestion as ing
+from src import training as trn
+
+# libraries whose import is reported for each subcommand
+HEAVY_LIBRARIES = ["pandas", "sklearn", "matplotlib", "seaborn"]
+
+
+def import_profile(command: List[str]) -> Dict[str, float]:
+    """Run a command of the main module and profile its imports.
+
+    Args:
+        command (List[str]): the arguments given to the main module.
+
+    Returns:
+        Dict[str, float]: the wall time and the import time in milliseconds
+        and whether each heavy library was imported.
+    """
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "main.py", *command],
+        capture_output=True, text=True, check=True
+    )
+    wall = time.perf_counter() - start
+    import_time = 0.0
+    loaded = set()
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        loaded.add(name.strip().split(".")[0])
+        # the modules imported directly by the process are not indented, the
+        # cumulative time of each one includes the modules it imports
+        if not name.startswith("  "):
+            import_time += int(cumulative) / 1000
+    profile = {"wall_ms": wall * 1000, "import_ms": import_time}
+    for library in HEAVY_LIBRARIES:
+        profile[library] = library in loaded
+    return profile
+
+
+def prepare_files(folder: str, rows: int) -> Dict[str, str]:
+    """Write synthetic datasets and save a small model trained with them.
+
+    Args:
+        folder (str): the temporary folder of the files.
+        rows (int): the number of rows of each dataset.
+
+    Returns:
+        Dict[str, str]: the paths of the datasets and of the artifacts.
+    """
+    write_datasets(rows, folder)
+    train_path = os.path.join(folder, "train.csv")
+    test_path = os.path.join(folder, "test.csv")
+    data = ing.read_dataset(train_path)
+    fitted_pipeline = build_pipeline()
+    final_data = fitted_pipeline.fit_transform(data)
+    model = trn.build_model(max_leaf_nodes=50, n_jobs=1)
+    model.fit(final_data.drop(GOAL_VARIABLE, axis=1), final_data[GOAL_VARIABLE])
+    artifacts = os.path.join(folder, "artifacts")
+    art.save_artifacts(model, fitted_pipeline, artifacts)
+    return {"train": train_path, "test": test_path, "artifacts": artifacts}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="bench_import",
+        description="start time of the subcommands of the main module")
+    parser.add_argument("rows", type=int, nargs="?", default=100)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        files = prepare_files(tmp, args.rows)
+        commands = {
+            "--help": ["--help"],
+            "train --help": ["train", "--help"],
+            "predict": [
+                "predict", files["test"], os.path.join(tmp, "scored.csv"),
+                "--artifacts", files["artifacts"]
+            ],
+            "validate": [
+                "validate", files["test"], "--artifacts", files["artifacts"]
+            ],
+            "eda": [
+                "eda", files["train"],
+                "--heatmap", os.path.join(tmp, "heatmap.png"),
+                "--collage", os.path.join(tmp, "collage.png")
+            ]
+        }
+        for name, command in commands.items():
+            result = import_profile(command)
+            libraries = ",".join(
+                library for library in HEAVY_LIBRARIES if result[library]
+            )
+            print(
+                f"{name:14} wall={result['wall_ms']:7.0f}ms "
+                f"imports={result['import_ms']:7.0f}ms "
+                f"heavy=[{libraries}]"
+            )
@@ -0,0 +1,74 @@
+"""Dataset ingestion benchmark
+
+This script writes a synthetic train dataset to a temporary csv file and
+compares the time to read it and the memory of the resulting dataframe
+between the default pandas.read_csv call and the ingestion module, with the
+c engine and, when it is installed, the pyarrow engine.
+
+To execute this benchmark just open a terminal under the app folder and
+type the command:
+python -m benchmarks.bench_ingestion <rows>
+"""
+# importing needed libraries
+import argparse
+import importlib.util
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+# importing needed modules
+from benchmarks.synthetic import generate_data
+from main import CATEGORICAL_COLUMNS, COLS_TO_DROP, ID_COLUMN
+from src import ingestion as ing
+
+
+def measure(read) -> dict:
+    """Read a dataset and measure the time and the memory of the result.
+
+    Args:
+        read (Callable): a function without arguments which reads a dataset.
+
+    Returns:
+        dict: the seconds to read it, its memory in megabytes and its
+        number of columns.
+    """
+    start = time.perf_counter()
+    data = read()
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": elapsed,
+        "memory_mb": data.memory_usage(deep=True).sum() / 1e6,
+        "columns": data.shape[1]
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="bench_ingestion",
+        description="default against typed and pruned csv reading")
+    parser.add_argument("rows", type=int, nargs="?", default=200000)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "train.csv")
+        generate_data(args.rows).to_csv(path, index=False)
+        readers = {
+            "pandas default": lambda: pd.read_csv(path),
+            "ingestion c": lambda: ing.read_dataset(
+                path, COLS_TO_DROP, CATEGORICAL_COLUMNS, keep=[ID_COLUMN]
+            ),
+        }
+        if importlib.util.find_spec("pyarrow") is not None:
+            readers["ingestion pyarrow"] = lambda: ing.read_dataset(
+                path, COLS_TO_DROP, CATEGORICAL_COLUMNS, keep=[ID_COLUMN],
+                engine="pyarrow"
+            )
+        print(f"rows={args.rows}")
+        for name, read in readers.items():
+            result = measure(read)
+            print(
+                f"{name:18} {result['seconds']:7.2f}s "
+                f"{result['memory_mb']:9.1f}MB "
+                f"{result['columns']:3} columns"
+            )
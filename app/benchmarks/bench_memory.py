@@ -0,0 +1,71 @@
+"""Pipeline memory benchmark
+
+This script measures the peak memory allocated while running the pipeline
+over a synthetic dataset, once copying the dataframe on each step and once
+using the inplace mode. The peak is reported as a ratio of the size of the
+input dataframe, counting the input itself, so a pipeline which does not
+allocate anything has a ratio of 1.
+
+It uses the tracemalloc library to trace the allocations of numpy and
+pandas.
+
+To execute this benchmark just open a terminal under the app folder and
+type the command:
+python -m benchmarks.bench_memory <rows>
+"""
+# importing needed libraries
+import argparse
+import gc
+import time
+import tracemalloc
+
+# importing needed modules
+from benchmarks.synthetic import generate_data
+from main import pipeline
+
+
+def measure_pipeline(rows: int, inplace: bool) -> dict:
+    """Run the pipeline over a synthetic dataset and trace its allocations.
+
+    Args:
+        rows (int): the number of rows of the synthetic dataset.
+        inplace (bool): whether to run the pipeline in the inplace mode.
+
+    Returns:
+        dict: the size of the input, the peak of allocated memory during
+        the pipeline, their ratio and the wall time in seconds.
+    """
+    data = generate_data(rows)
+    input_size = data.memory_usage(deep=True).sum()
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    pipeline(data, inplace=inplace)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "rows": rows,
+        "inplace": inplace,
+        "input_mb": input_size / 1e6,
+        "peak_mb": peak / 1e6,
+        "peak_ratio": (input_size + peak) / input_size,
+        "seconds": elapsed
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="bench_memory",
+        description="peak memory of the pipeline with and without copies")
+    parser.add_argument("rows", type=int, nargs="?", default=100000)
+    args = parser.parse_args()
+    for mode in (False, True):
+        result = measure_pipeline(args.rows, mode)
+        print(
+            f"inplace={result['inplace']!s:5} "
+            f"input={result['input_mb']:.1f}MB "
+            f"peak={result['peak_mb']:.1f}MB "
+            f"ratio={result['peak_ratio']:.2f}x "
+            f"time={result['seconds']:.2f}s"
+        )
@@ -0,0 +1,137 @@
+"""Out-of-core training benchmark
+
+This script compares the random forest trained in memory with the one grown
+by chunks of a csv file, both with the same number of trees, writing a
+synthetic dataset to a temporary folder. It reports the R2 score of a
+validation file, the wall time and the peak memory allocated by each mode.
+
+It uses the tracemalloc library to trace the allocations of numpy and
+pandas, and the outofcore module to train and score by chunks.
+
+To execute this benchmark just open a terminal under the app folder and
+type the command:
+python -m benchmarks.bench_outofcore <rows> [--chunksize 50000]
+"""
+# importing needed libraries
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+
+# importing needed modules
+from benchmarks.synthetic import generate_data
+from main import GOAL_VARIABLE, build_pipeline
+from src import outofcore as ooc
+from src import training as trn
+from src.ingestion import read_dataset
+
+
+def train_in_memory(path: str, trees: int, max_leaf: int):
+    """Train the pipeline and the forest with the whole file in memory.
+
+    Args:
+        path (str): the csv file of the train dataset.
+        trees (int): the number of trees of the forest.
+        max_leaf (int): the number of max leaf nodes of each tree.
+
+    Returns:
+        Tuple: the trained forest and the fitted pipeline.
+    """
+    fitted_pipeline = build_pipeline()
+    data = read_dataset(path, fitted_pipeline.cols_to_drop)
+    final_data = fitted_pipeline.fit_transform(data)
+    del data
+    X = fitted_pipeline.to_matrix(final_data)
+    y = final_data[GOAL_VARIABLE].to_numpy(dtype="float64")
+    del final_data
+    model = trn.build_model(max_leaf, n_jobs=1).set_params(
+        n_estimators=trees, random_state=0
+    )
+    return model.fit(X, y), fitted_pipeline
+
+
+def train_chunked(path: str, chunksize: int, trees: int, max_leaf: int):
+    """Train the pipeline and the forest reading the file by chunks.
+
+    Args:
+        path (str): the csv file of the train dataset.
+        chunksize (int): the number of rows of each chunk.
+        trees (int): the number of trees fitted with each chunk.
+        max_leaf (int): the number of max leaf nodes of each tree.
+
+    Returns:
+        Tuple: the trained forest and the fitted pipeline.
+    """
+    fitted_pipeline = ooc.fit_pipeline_chunked(
+        build_pipeline(), path, chunksize
+    )
+    model = trn.build_model(max_leaf, n_jobs=1).set_params(random_state=0)
+    ooc.grow_forest(
+        model, fitted_pipeline, path, chunksize, GOAL_VARIABLE, trees
+    )
+    return model, fitted_pipeline
+
+
+def measure(function, *args):
+    """Run a training function tracing its allocations.
+
+    Args:
+        function (Callable): the training function.
+        *args: its arguments.
+
+    Returns:
+        Tuple: its result, the wall time in seconds and the peak of
+        allocated memory in MB.
+    """
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 2 ** 20
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="bench_outofcore",
+        description="accuracy, time and memory of the out-of-core training")
+    parser.add_argument("rows", type=int, nargs="?", default=200000)
+    parser.add_argument("--chunksize", type=int, default=50000)
+    parser.add_argument("--trees-per-chunk", type=int, default=25)
+    parser.add_argument("--max-leaf", type=int, default=250)
+    args = parser.parse_args()
+    chunks = -(-args.rows // args.chunksize)
+    with tempfile.TemporaryDirectory() as folder:
+        train_path = os.path.join(folder, "train.csv")
+        validation_path = os.path.join(folder, "validation.csv")
+        data = generate_data(args.rows + args.rows // 5)
+        data.iloc[:args.rows].to_csv(train_path, index=False)
+        data.iloc[args.rows:].to_csv(validation_path, index=False)
+        del data
+        print(
+            f"rows={args.rows} chunksize={args.chunksize} chunks={chunks} "
+            f"trees={chunks * args.trees_per_chunk}"
+        )
+        for name, function, arguments in (
+                    ("in-memory", train_in_memory,
+                     (train_path, chunks * args.trees_per_chunk,
+                      args.max_leaf)),
+                    ("chunked", train_chunked,
+                     (train_path, args.chunksize, args.trees_per_chunk,
+                      args.max_leaf))
+                ):
+            (model, fitted_pipeline), elapsed, peak = measure(
+                function, *arguments
+            )
+            score = ooc.r2_chunked(
+                model, fitted_pipeline, validation_path, args.chunksize,
+                GOAL_VARIABLE
+            )
+            print(
+                f"{name:<10} R2={score:.4f} time={elapsed:.1f}s "
+                f"peak={peak:,.0f}MB"
+            )
@@ -0,0 +1,52 @@
+"""Partitioned preprocessing benchmark
+
+This script measures the throughput of the fitted pipeline transforming a
+synthetic dataset into the feature matrix, once in the parent process and
+once with the partitioned mode for each number of workers given, so the
+scaling with the number of cores can be compared.
+
+It uses the transform_partitioned function of the parallel module.
+
+To execute this benchmark just open a terminal under the app folder and
+type the command:
+python -m benchmarks.bench_parallel <rows> [--workers 1 2 4 8 16 32]
+"""
+# importing needed libraries
+import argparse
+import os
+import time
+
+import numpy as np
+
+# importing needed modules
+from benchmarks.synthetic import generate_data
+from main import build_pipeline
+from src.parallel import transform_partitioned
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="bench_parallel",
+        description="throughput of the partitioned preprocessing")
+    parser.add_argument("rows", type=int, nargs="?", default=1000000)
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    args = parser.parse_args()
+    data = generate_data(args.rows)
+    fitted_pipeline = build_pipeline().fit(data)
+    start = time.perf_counter()
+    expected = fitted_pipeline.transform_matrix(data)
+    serial = time.perf_counter() - start
+    print(
+        f"cores={os.cpu_count()} rows={args.rows} serial: "
+        f"{serial:.2f}s {args.rows / serial:,.0f} rows/s"
+    )
+    for workers in args.workers:
+        start = time.perf_counter()
+        matrix = transform_partitioned(fitted_pipeline, data, workers)
+        elapsed = time.perf_counter() - start
+        print(
+            f"workers={workers:<3} {elapsed:.2f}s "
+            f"{args.rows / elapsed:,.0f} rows/s "
+            f"speedup={serial / elapsed:.2f}x "
+            f"identical={np.array_equal(matrix, expected)}"
+        )
@@ -0,0 +1,108 @@
+"""Prediction cache benchmark
+
+This script measures the time to score a synthetic inventory of listings
+twice, as a nightly job does, where only a fraction of the listings change
+from one night to the next. The first night fills the cache of predictions,
+and the second one is scored with the cache and without it, so the time
+saved by the rows read from the cache can be compared, and the predictions
+of both are checked to be identical.
+
+It uses the score_csv function of the scoring module and the
+PredictionCache class of the predictions module.
+
+To execute this benchmark just open a terminal under the app folder and
+type the command:
+python -m benchmarks.bench_predictions <rows> [--changed 0.05]
+"""
+# importing needed libraries
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# importing needed modules
+from benchmarks.synthetic import generate_data
+from main import GOAL_VARIABLE, build_pipeline
+from src import artifacts as art
+from src import predictions as prd
+from src import training as trn
+from src.scoring import score_csv
+
+
+def score(model, fitted_pipeline, input_path, output_path, cache=None):
+    """Score a csv file, measuring the time spent.
+
+    Args:
+        model (Any): a pretrained model.
+        fitted_pipeline (Any): the pipeline fitted with the train dataset.
+        input_path (str): the csv file to score.
+        output_path (str): the csv file of the predictions.
+        cache (PredictionCache): the cache of predictions, or None.
+
+    Returns:
+        float: the seconds spent.
+    """
+    start = time.perf_counter()
+    score_csv(model, fitted_pipeline, input_path, output_path, cache=cache)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="bench_predictions",
+        description="time saved by the cache of predictions")
+    parser.add_argument("rows", type=int, nargs="?", default=200000)
+    parser.add_argument("--changed", type=float, default=0.05)
+    args = parser.parse_args()
+    data_train = generate_data(20000)
+    fitted_pipeline = build_pipeline()
+    final_data = fitted_pipeline.fit_transform(data_train)
+    model = trn.build_model(250).set_params(random_state=0)
+    model.fit(
+        fitted_pipeline.to_matrix(final_data), final_data[GOAL_VARIABLE]
+    )
+    first_night = generate_data(args.rows, seed=1, with_target=False)
+    # the changed listings get a new living area, the rest are identical
+    second_night = first_night.copy()
+    changed = np.random.default_rng(2).random(args.rows) < args.changed
+    second_night.loc[changed, "GrLivArea"] += 1
+    with tempfile.TemporaryDirectory() as folder:
+        version = art.save_artifacts(model, fitted_pipeline, folder)
+        key = prd.model_key([
+            os.path.join(folder, version, art.MODEL_FILE),
+            os.path.join(folder, version, art.PIPELINE_FILE)
+        ], fitted_pipeline)
+        paths = {
+            name: os.path.join(folder, f"{name}.csv")
+            for name in ("first", "second", "plain", "cached")
+        }
+        first_night.to_csv(paths["first"], index=False)
+        second_night.to_csv(paths["second"], index=False)
+        cache_path = os.path.join(folder, "predictions.sqlite")
+        with prd.PredictionCache(cache_path, key) as cache:
+            cold = score(
+                model, fitted_pipeline, paths["first"], paths["cached"],
+                cache
+            )
+        plain = score(model, fitted_pipeline, paths["second"], paths["plain"])
+        with prd.PredictionCache(cache_path, key) as cache:
+            warm = score(
+                model, fitted_pipeline, paths["second"], paths["cached"],
+                cache
+            )
+            hits, misses = cache.hits, cache.misses
+        identical = pd.read_csv(paths["plain"]).equals(
+            pd.read_csv(paths["cached"])
+        )
+        size = os.path.getsize(cache_path)
+    print(f"rows={args.rows} changed={changed.mean():.1%}")
+    print(f"first night, empty cache  {cold:.2f}s")
+    print(f"second night, no cache    {plain:.2f}s")
+    print(
+        f"second night, cache       {warm:.2f}s hits={hits} misses={misses} "
+        f"speedup={plain / warm:.2f}x identical={identical}"
+    )
+    print(f"cache file {size / 1e6:.1f}MB")
@@ -0,0 +1,138 @@
+"""Scoring service load test
+
+This script trains a small model with a synthetic dataset, starts the
+scoring service on a free local port and sends concurrent single-listing
+requests to it, once without micro-batching (batches of one listing) and
+once with micro-batching. The latency and throughput seen by the clients and
+the ones reported by the service are printed for both runs.
+
+To execute this benchmark just open a terminal under the app folder and
+type the command:
+python -m benchmarks.bench_service <requests> <clients>
+"""
+# importing needed libraries
+import argparse
+import json
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# importing needed modules
+from benchmarks.synthetic import generate_data
+from main import GOAL_VARIABLE, build_pipeline
+from src import training as trn
+from src.service import make_server
+
+
+def train_model(rows: int = 2000):
+    """Train a small model with a synthetic dataset.
+
+    Args:
+        rows (int): the number of rows of the synthetic dataset.
+
+    Returns:
+        Tuple: the model, the fitted pipeline and the listings to score.
+    """
+    data = generate_data(rows)
+    fitted_pipeline = build_pipeline()
+    final_data = fitted_pipeline.fit_transform(data)
+    model = trn.build_model(max_leaf_nodes=250, n_jobs=1)
+    model.fit(final_data.drop(GOAL_VARIABLE, axis=1), final_data[GOAL_VARIABLE])
+    listings = json.loads(
+        generate_data(rows, seed=1, with_target=False).to_json(
+            orient="records"
+        )
+    )
+    return model, fitted_pipeline, listings
+
+
+def post(url: str, listing: dict) -> float:
+    """Send a listing to the service and measure the latency.
+
+    Args:
+        url (str): the url of the predict endpoint.
+        listing (dict): the listing to score.
+
+    Returns:
+        float: the latency of the request in seconds.
+    """
+    start = time.perf_counter()
+    request = urllib.request.Request(
+        url, data=json.dumps(listing).encode("utf-8"),
+        headers={"Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(request) as response:
+        response.read()
+    return time.perf_counter() - start
+
+
+def load_test(
+            model, fitted_pipeline, listings, requests: int, clients: int,
+            max_batch_size: int, max_wait: float
+        ) -> dict:
+    """Send concurrent requests to a new service.
+
+    Args:
+        model (Any): a pretrained model.
+        fitted_pipeline (Any): the pipeline fitted with the train dataset.
+        listings (list): the listings to send.
+        requests (int): the number of requests.
+        clients (int): the number of concurrent clients.
+        max_batch_size (int): the maximum number of listings of a batch.
+        max_wait (float): the maximum waiting time of a batch in seconds.
+
+    Returns:
+        dict: the latency and throughput seen by the clients and the stats
+        reported by the service.
+    """
+    server = make_server(
+        model, fitted_pipeline, port=0,
+        max_batch_size=max_batch_size, max_wait=max_wait
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address
+    url = f"http://{host}:{port}/predict"
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        latencies = list(executor.map(
+            lambda index: post(url, listings[index % len(listings)]),
+            range(requests)
+        ))
+    elapsed = time.perf_counter() - start
+    with urllib.request.urlopen(f"http://{host}:{port}/stats") as response:
+        stats = json.loads(response.read())
+    server.shutdown()
+    server.server_close()
+    server.batcher.stop()
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    return {
+        "client_p50_ms": p50,
+        "client_p99_ms": p99,
+        "client_rps": requests / elapsed,
+        "service": stats
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="bench_service",
+        description="load test of the scoring service")
+    parser.add_argument("requests", type=int, nargs="?", default=2000)
+    parser.add_argument("clients", type=int, nargs="?", default=32)
+    args = parser.parse_args()
+    trained = train_model()
+    for batch_size, wait in ((1, 0.0), (64, 0.005)):
+        result = load_test(
+            *trained, args.requests, args.clients, batch_size, wait
+        )
+        print(
+            f"max_batch_size={batch_size:3} "
+            f"p50={result['client_p50_ms']:.1f}ms "
+            f"p99={result['client_p99_ms']:.1f}ms "
+            f"rps={result['client_rps']:.0f} "
+            f"mean_batch={result['service']['mean_batch_size']:.1f}"
+        )
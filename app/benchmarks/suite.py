@@ -0,0 +1,407 @@
+"""Benchmark suite of the preprocessing and modelling hot paths
+
+This script times every public function of the cleaning and preprocessing
+modules, the main pipeline, the fitted pipeline and the fit, prediction
+and cross validation of the model over synthetic datasets with the Ames
+schema and the levels of the map_encoders.json file. Each case is timed
+over several sizes, from a thousand to millions of rows, and two widths:
+the standard set of columns and a wide one with extra numerical columns.
+
+The inputs of each case are prepared before timing it, and each case is
+called several times, keeping the minimum, the median and the mean time.
+The results are saved as a JSON file named after the commit they were
+measured on, so two runs can be compared offline to find regressions.
+
+To execute the suite just open a terminal under the app folder and type:
+python -m benchmarks.suite run [--rows 1000 10000 100000] [--widths
+standard wide] [--cases pattern] [--repeat 5]
+
+And to compare two saved runs:
+python -m benchmarks.suite compare <base_json> <head_json> [--threshold 1.1]
+
+This script can also be imported as a module.
+"""
+# importing needed libraries
+import argparse
+import fnmatch
+import functools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# importing needed modules
+from benchmarks.synthetic import generate_data
+from main import (CATEGORICAL_ENCODE, COLS_TO_DROP, FILL_CATEGORICAL,
+                  GOAL_VARIABLE, build_pipeline, pipeline)
+from src import cleaning as cln
+from src import preprocessing as prcs
+from src import training as trn
+
+# number of extra numerical columns of each width
+WIDTHS = {"standard": 0, "wide": 200}
+
+# folder where the results of each run are saved
+RESULTS_FOLDER = os.path.join(os.path.dirname(__file__), "results")
+
+# the model cases are slower by orders of magnitude, so they only run up to
+# this number of rows unless it is changed with --model-rows
+MODEL_ROWS = 10000
+
+
+class Inputs:
+    """The Inputs class prepares, once per size and width, the dataframes
+        received by each step of the pipeline.
+    """
+    def __init__(self, rows: int, extra_columns: int, categorical: bool):
+        """Generate a synthetic dataset and run the pipeline over it.
+
+        Args:
+            rows (int): the number of rows of the dataset.
+            extra_columns (int): the number of extra numerical columns.
+            categorical (bool): whether the categorical columns use the
+            category type, as when they are read by the ingestion module.
+        """
+        self.raw = generate_data(
+            rows, extra_columns=extra_columns, categorical=categorical
+        )
+        self.dropped = self.raw.drop(columns=COLS_TO_DROP)
+        self.custom = cln.custom_fill_na_values(
+            self.dropped, FILL_CATEGORICAL, "No"
+        )
+        self.fill_values = cln.compute_fill_values(self.custom)
+        self.filled = cln.fill_all_na_values(
+            self.custom, fill_values=self.fill_values
+        )
+        self.ordinal = prcs.encode_variables(self.filled)
+        self.label_categories = prcs.fit_label_categories(
+            self.ordinal, CATEGORICAL_ENCODE
+        )
+        self.encoded = prcs.encode_with_categories(
+            self.ordinal, self.label_categories, dtype="int64"
+        )
+        self.fitted_pipeline = build_pipeline().fit(self.raw)
+        final_data = self.fitted_pipeline.transform(self.raw)
+        self.y = final_data[GOAL_VARIABLE]
+        self.X = final_data.drop(columns=GOAL_VARIABLE)
+        self.model = None
+
+    def trained_model(self):
+        """Train, once, the model used by the prediction case.
+
+        Returns:
+            RandomForestRegressor: the trained model.
+        """
+        if self.model is None:
+            self.model = trn.build_model(max_leaf_nodes=250).fit(
+                self.X, self.y
+            )
+        return self.model
+
+
+# each case receives the prepared inputs and returns the function timed
+CASES: Dict[str, Callable[[Inputs], Callable[[], Any]]] = {
+    "cleaning.custom_fill_na_values": lambda inputs: lambda: (
+        cln.custom_fill_na_values(inputs.dropped, FILL_CATEGORICAL, "No")
+    ),
+    "cleaning.compute_fill_values": lambda inputs: lambda: (
+        cln.compute_fill_values(inputs.custom)
+    ),
+    "cleaning.fill_all_na_values": lambda inputs: lambda: (
+        cln.fill_all_na_values(inputs.custom)
+    ),
+    "cleaning.fill_all_na_values[precomputed]": lambda inputs: lambda: (
+        cln.fill_all_na_values(inputs.custom, fill_values=inputs.fill_values)
+    ),
+    "preprocessing.read_encoders": lambda inputs: prcs.read_encoders,
+    "preprocessing.encode_variables": lambda inputs: lambda: (
+        prcs.encode_variables(inputs.filled)
+    ),
+    "preprocessing.encode_categorical_columns": lambda inputs: lambda: (
+        prcs.encode_categorical_columns(inputs.ordinal, CATEGORICAL_ENCODE)
+    ),
+    "preprocessing.fit_label_categories": lambda inputs: lambda: (
+        prcs.fit_label_categories(inputs.ordinal, CATEGORICAL_ENCODE)
+    ),
+    "preprocessing.encode_with_categories": lambda inputs: lambda: (
+        prcs.encode_with_categories(
+            inputs.ordinal, inputs.label_categories, dtype="int64"
+        )
+    ),
+    "preprocessing.create_interactions": lambda inputs: lambda: (
+        prcs.create_interactions(inputs.encoded)
+    ),
+    "main.pipeline": lambda inputs: lambda: pipeline(inputs.raw),
+    "pipeline.fit": lambda inputs: lambda: build_pipeline().fit(inputs.raw),
+    "pipeline.transform": lambda inputs: lambda: (
+        inputs.fitted_pipeline.transform(inputs.raw)
+    ),
+    "model.fit": lambda inputs: lambda: (
+        trn.build_model(max_leaf_nodes=250).fit(inputs.X, inputs.y)
+    ),
+    "model.predict": lambda inputs: functools.partial(
+        inputs.trained_model().predict, inputs.X
+    ),
+    "model.cross_validate": lambda inputs: lambda: (
+        trn.cross_validate_model(
+            trn.build_model(max_leaf_nodes=250), inputs.X, inputs.y, folds=5
+        )
+    ),
+}
+
+# cases limited to the number of rows given by --model-rows
+MODEL_CASES = ["model.fit", "model.predict", "model.cross_validate"]
+
+
+def time_case(
+            function: Callable[[], Any],
+            repeat: int = 5,
+            min_time: float = 0.2,
+            max_time: float = 60.0
+        ) -> Dict[str, float]:
+    """Call a function several times and summarize its wall time. Fast
+        functions are called more times, until min_time seconds are spent,
+        and slow ones fewer times, once max_time seconds are spent.
+
+    Args:
+        function (Callable): the function to be called without arguments.
+        repeat (int): the number of calls.
+        min_time (float): the minimum total time of the calls in seconds.
+        max_time (float): the total time of the calls in seconds after
+        which no more calls are done, at least one call is always done.
+
+    Returns:
+        Dict[str, float]: the number of calls and the minimum, median and
+        mean time of a call in seconds.
+    """
+    times: List[float] = []
+    while not times or (
+                len(times) < repeat and sum(times) < max_time
+            ) or (sum(times) < min_time and len(times) < 1000):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return {
+        "calls": len(times),
+        "min_s": min(times),
+        "median_s": statistics.median(times),
+        "mean_s": statistics.fmean(times)
+    }
+
+
+def current_commit() -> Dict[str, Any]:
+    """Find the commit of the working tree the suite runs on.
+
+    Returns:
+        Dict[str, Any]: the short hash of the commit and whether the tree
+        has uncommitted changes.
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = bool(subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        commit, dirty = "unknown", False
+    return {"commit": commit, "dirty": dirty}
+
+
+def environment() -> Dict[str, str]:
+    """Describe the machine and the versions of the libraries.
+
+    Returns:
+        Dict[str, str]: the description of the environment.
+    """
+    import sklearn  # pylint: disable=import-outside-toplevel
+    return {
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpus": str(os.cpu_count()),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__
+    }
+
+
+def run_suite(
+            rows: List[int],
+            widths: List[str],
+            pattern: str = "*",
+            repeat: int = 5,
+            model_rows: int = MODEL_ROWS,
+            categorical: bool = False
+        ) -> Dict[str, Any]:
+    """Time the selected cases over every size and width.
+
+    Args:
+        rows (List[int]): the sizes of the datasets.
+        widths (List[str]): the widths of the datasets, keys of WIDTHS.
+        pattern (str): a shell pattern to select the cases by name.
+        repeat (int): the number of calls of each case, fewer when they
+        take more than a minute.
+        model_rows (int): the maximum size used by the model cases.
+        categorical (bool): whether the categorical columns use the
+        category type.
+
+    Returns:
+        Dict[str, Any]: the description of the run and its results.
+    """
+    cases = [name for name in CASES if fnmatch.fnmatch(name, pattern)]
+    results = []
+    for width in widths:
+        for size in rows:
+            inputs = Inputs(size, WIDTHS[width], categorical)
+            for name in cases:
+                if name in MODEL_CASES and size > model_rows:
+                    continue
+                result = time_case(CASES[name](inputs), repeat=repeat)
+                result.update(
+                    case=name, rows=size, width=width,
+                    columns=inputs.raw.shape[1]
+                )
+                results.append(result)
+                print(
+                    f"{name:45} {width:8} rows={size:<9} "
+                    f"min={result['min_s'] * 1000:10.2f}ms "
+                    f"median={result['median_s'] * 1000:10.2f}ms",
+                    flush=True
+                )
+    return {
+        **current_commit(),
+        "created": datetime.now(timezone.utc).isoformat(),
+        "categorical": categorical,
+        "environment": environment(),
+        "results": results
+    }
+
+
+def save_results(run: Dict[str, Any], folder: str = RESULTS_FOLDER) -> str:
+    """Save the results of a run as a JSON file.
+
+    Args:
+        run (Dict[str, Any]): the description of the run and its results.
+        folder (str): the folder of the saved runs.
+
+    Returns:
+        str: the path of the saved file.
+    """
+    os.makedirs(folder, exist_ok=True)
+    created = datetime.fromisoformat(run["created"]).strftime("%Y%m%dT%H%M%S")
+    suffix = "-dirty" if run["dirty"] else ""
+    path = os.path.join(folder, f"{created}-{run['commit']}{suffix}.json")
+    with open(path, "w", encoding="utf-8") as results_json:
+        json.dump(run, results_json, indent=2)
+    return path
+
+
+def compare_runs(
+            base: Dict[str, Any],
+            head: Dict[str, Any],
+            threshold: float = 1.1
+        ) -> List[Dict[str, Any]]:
+    """Compare the minimum times of the cases measured by two runs.
+
+    Args:
+        base (Dict[str, Any]): the run used as reference.
+        head (Dict[str, Any]): the run to be compared.
+        threshold (float): the ratio of the times above which a case is
+        reported as a regression.
+
+    Returns:
+        List[Dict[str, Any]]: the ratio of the times of each case measured
+        by both runs, and whether it is a regression.
+    """
+    def key(result):
+        return result["case"], result["rows"], result["width"]
+
+    base_times = {key(result): result["min_s"] for result in base["results"]}
+    comparison = []
+    for result in head["results"]:
+        if key(result) not in base_times:
+            continue
+        ratio = result["min_s"] / base_times[key(result)]
+        comparison.append({
+            "case": result["case"],
+            "rows": result["rows"],
+            "width": result["width"],
+            "base_s": base_times[key(result)],
+            "head_s": result["min_s"],
+            "ratio": ratio,
+            "regression": ratio > threshold
+        })
+    return comparison
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the suite or compare two saved runs.
+
+    Args:
+        argv (List[str]): the arguments, by default the ones of the process.
+
+    Returns:
+        int: the exit code, 1 when the comparison finds a regression.
+    """
+    parser = argparse.ArgumentParser(
+        prog="suite",
+        description="benchmark suite of the preprocessing and modelling")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="run and save the suite")
+    run_parser.add_argument(
+        "--rows", type=int, nargs="+", default=[1000, 10000, 100000],
+        help="sizes of the datasets, up to 10000000 rows")
+    run_parser.add_argument(
+        "--widths", nargs="+", choices=sorted(WIDTHS),
+        default=["standard", "wide"])
+    run_parser.add_argument(
+        "--cases", default="*", help="shell pattern of the cases to run")
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument(
+        "--model-rows", type=int, default=MODEL_ROWS,
+        help="maximum size used by the model cases")
+    run_parser.add_argument(
+        "--categorical", action="store_true",
+        help="generate the categorical columns with the category type, "
+             "which is needed to fit millions of rows in memory")
+    run_parser.add_argument("--output", default=RESULTS_FOLDER)
+    compare_parser = commands.add_parser(
+        "compare", help="compare two saved runs")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("head")
+    compare_parser.add_argument("--threshold", type=float, default=1.1)
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        run = run_suite(
+            args.rows, args.widths, args.cases, args.repeat,
+            args.model_rows, args.categorical
+        )
+        print(f"results saved to {save_results(run, args.output)}")
+        return 0
+    runs = []
+    for path in (args.base, args.head):
+        with open(path, encoding="utf-8") as results_json:
+            runs.append(json.load(results_json))
+    comparison = compare_runs(*runs, threshold=args.threshold)
+    for row in comparison:
+        print(
+            f"{row['case']:45} {row['width']:8} rows={row['rows']:<9} "
+            f"{row['base_s'] * 1000:10.2f}ms -> {row['head_s'] * 1000:10.2f}ms "
+            f"x{row['ratio']:.2f}{'  REGRESSION' if row['regression'] else ''}"
+        )
+    return int(any(row["regression"] for row in comparison))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
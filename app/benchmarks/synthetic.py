@@ -0,0 +1,227 @@
+"""Synthetic Ames dataset generator
+
+This script generates synthetic datasets that follow the column schema of
+the Kaggle house prices competition (the Ames dataset). The categorical
+columns use the levels of the map_encoders.json file, so the generated
+data can be sent through the whole pipeline, and the missing values are
+injected following rates similar to the ones of the real train dataset.
+
+It uses numpy and pandas libraries for data generation.
+
+To generate a couple of csv files just open a terminal and type:
+python -m benchmarks.synthetic <rows> <folder>
+
+This script can also be imported as a module.
+"""
+# importing needed libraries
+import argparse
+import json
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# importing needed modules
+from src.preprocessing import ENCODERS_PATH
+
+# levels of the categorical columns which are not part of the
+# map_encoders.json file
+EXTRA_LEVELS = {
+    "Street": ["Grvl", "Pave"],
+    "Alley": ["Grvl", "Pave"],
+    "LotShape": ["Reg", "IR1", "IR2", "IR3"],
+    "LandContour": ["Lvl", "Bnk", "HLS", "Low"],
+    "LotConfig": ["Inside", "Corner", "CulDSac", "FR2", "FR3"],
+    "LandSlope": ["Gtl", "Mod", "Sev"],
+    "Condition1": ["Norm", "Feedr", "Artery", "RRAn", "PosN"],
+    "Condition2": ["Norm", "Feedr", "Artery", "RRAn", "PosN"],
+    "BldgType": ["1Fam", "2fmCon", "Duplex", "TwnhsE", "Twnhs"],
+    "HouseStyle": ["1Story", "1.5Fin", "2Story", "SFoyer", "SLvl"],
+    "Exterior1st": ["VinylSd", "MetalSd", "Wd Sdng", "HdBoard", "Plywood"],
+    "Exterior2nd": ["VinylSd", "MetalSd", "Wd Sdng", "HdBoard", "Plywood"],
+    "BsmtExposure": ["No", "Mn", "Av", "Gd"],
+    "Heating": ["GasA", "GasW", "Grav", "Wall", "OthW"],
+    "HeatingQC": ["Po", "Fa", "TA", "Gd", "Ex"],
+    "CentralAir": ["N", "Y"],
+    "Functional": ["Typ", "Min1", "Min2", "Mod", "Maj1"],
+    "FireplaceQu": ["Po", "Fa", "TA", "Gd", "Ex"],
+    "GarageType": ["Attchd", "Detchd", "BuiltIn", "CarPort", "Basment"],
+    "GarageFinish": ["Unf", "RFn", "Fin"],
+    "GarageQual": ["Po", "Fa", "TA", "Gd", "Ex"],
+    "GarageCond": ["Po", "Fa", "TA", "Gd", "Ex"],
+    "PoolQC": ["Fa", "Gd", "Ex"],
+    "Fence": ["MnPrv", "GdWo", "GdPrv", "MnWw"],
+    "MiscFeature": ["Shed", "Gar2", "Othr", "TenC"],
+    "SaleType": ["WD", "New", "COD", "ConLD", "ConLw", "Oth"],
+}
+
+# numerical columns with the (low, high) range of the generated values
+NUMERIC_RANGES = {
+    "MSSubClass": (20, 190), "LotFrontage": (21, 313),
+    "LotArea": (1300, 215245), "OverallQual": (1, 10),
+    "OverallCond": (1, 9), "YearBuilt": (1872, 2010),
+    "YearRemodAdd": (1950, 2010), "MasVnrArea": (0, 1600),
+    "BsmtFinSF1": (0, 5644), "BsmtFinSF2": (0, 1474),
+    "BsmtUnfSF": (0, 2336), "TotalBsmtSF": (0, 6110),
+    "1stFlrSF": (334, 4692), "2ndFlrSF": (0, 2065),
+    "LowQualFinSF": (0, 572), "GrLivArea": (334, 5642),
+    "BsmtFullBath": (0, 3), "BsmtHalfBath": (0, 2),
+    "FullBath": (0, 3), "HalfBath": (0, 2), "BedroomAbvGr": (0, 8),
+    "KitchenAbvGr": (0, 3), "TotRmsAbvGrd": (2, 14),
+    "Fireplaces": (0, 3), "GarageYrBlt": (1900, 2010),
+    "GarageCars": (0, 4), "GarageArea": (0, 1418),
+    "WoodDeckSF": (0, 857), "OpenPorchSF": (0, 547),
+    "EnclosedPorch": (0, 552), "3SsnPorch": (0, 508),
+    "ScreenPorch": (0, 480), "PoolArea": (0, 738), "MiscVal": (0, 15500),
+    "MoSold": (1, 12), "YrSold": (2006, 2010),
+}
+
+# the column order of the original train dataset
+AMES_COLUMNS = [
+    "Id", "MSSubClass", "MSZoning", "LotFrontage", "LotArea", "Street",
+    "Alley", "LotShape", "LandContour", "Utilities", "LotConfig",
+    "LandSlope", "Neighborhood", "Condition1", "Condition2", "BldgType",
+    "HouseStyle", "OverallQual", "OverallCond", "YearBuilt",
+    "YearRemodAdd", "RoofStyle", "RoofMatl", "Exterior1st", "Exterior2nd",
+    "MasVnrType", "MasVnrArea", "ExterQual", "ExterCond", "Foundation",
+    "BsmtQual", "BsmtCond", "BsmtExposure", "BsmtFinType1", "BsmtFinSF1",
+    "BsmtFinType2", "BsmtFinSF2", "BsmtUnfSF", "TotalBsmtSF", "Heating",
+    "HeatingQC", "CentralAir", "Electrical", "1stFlrSF", "2ndFlrSF",
+    "LowQualFinSF", "GrLivArea", "BsmtFullBath", "BsmtHalfBath",
+    "FullBath", "HalfBath", "BedroomAbvGr", "KitchenAbvGr", "KitchenQual",
+    "TotRmsAbvGrd", "Functional", "Fireplaces", "FireplaceQu",
+    "GarageType", "GarageYrBlt", "GarageFinish", "GarageCars",
+    "GarageArea", "GarageQual", "GarageCond", "PavedDrive", "WoodDeckSF",
+    "OpenPorchSF", "EnclosedPorch", "3SsnPorch", "ScreenPorch",
+    "PoolArea", "PoolQC", "Fence", "MiscFeature", "MiscVal", "MoSold",
+    "YrSold", "SaleType", "SaleCondition", "SalePrice"
+]
+
+# approximate rate of missing values of the original train dataset
+NA_RATES = {
+    "LotFrontage": 0.18, "Alley": 0.94, "MasVnrType": 0.01,
+    "MasVnrArea": 0.01, "BsmtQual": 0.03, "BsmtCond": 0.03,
+    "BsmtExposure": 0.03, "BsmtFinType1": 0.03, "BsmtFinType2": 0.03,
+    "Electrical": 0.001, "FireplaceQu": 0.47, "GarageType": 0.06,
+    "GarageYrBlt": 0.06, "GarageFinish": 0.06, "GarageQual": 0.06,
+    "GarageCond": 0.06, "PoolQC": 0.99, "Fence": 0.81,
+    "MiscFeature": 0.96, "MSZoning": 0.003, "Utilities": 0.001,
+    "KitchenQual": 0.001, "SaleType": 0.001, "BsmtFullBath": 0.001,
+    "BsmtHalfBath": 0.001, "TotalBsmtSF": 0.001, "GarageCars": 0.001,
+}
+
+
+def read_levels(path: str = ENCODERS_PATH) -> Dict[str, List[str]]:
+    """Read the levels of all the categorical columns of the Ames schema.
+
+    Args:
+        path (str): the path of the map_encoders.json file.
+
+    Returns:
+        levels (Dict[str, List[str]]): the levels of each categorical column.
+    """
+    with open(path, encoding="utf-8") as encoders_json:
+        levels = json.load(encoders_json)
+    levels.update(EXTRA_LEVELS)
+    return levels
+
+
+def generate_data(
+            rows: int,
+            seed: int = 0,
+            with_target: bool = True,
+            extra_columns: int = 0,
+            levels: Optional[Dict[str, List[str]]] = None,
+            categorical: bool = False
+        ) -> pd.DataFrame:
+    """Generate a synthetic dataframe with the Ames schema.
+
+    Args:
+        rows (int): the number of rows to generate.
+        seed (int): the seed of the random generator.
+        with_target (bool): whether the SalePrice column is generated.
+        extra_columns (int): the number of additional numerical columns
+        appended to generate a wide dataset.
+        levels (Dict[str, List[str]]): the levels of the categorical
+        columns, by default the ones returned by read_levels.
+        categorical (bool): whether the categorical columns are generated
+        with the category type, with their levels sorted as when they are
+        read by the ingestion module, instead of Python strings. The values
+        are the same for a given seed.
+
+    Returns:
+        data (pd.DataFrame): the synthetic dataframe.
+    """
+    rng = np.random.default_rng(seed)
+    levels = read_levels() if levels is None else levels
+    columns = {}
+    for column in AMES_COLUMNS:
+        if column == "Id":
+            columns[column] = np.arange(1, rows + 1)
+        elif column == "SalePrice":
+            if with_target:
+                quality = columns["OverallQual"]
+                area = columns["GrLivArea"]
+                columns[column] = (
+                    20000 * quality + 60 * area +
+                    rng.normal(0, 20000, rows)
+                ).round().astype("int64")
+        elif column in levels:
+            column_levels = np.array(levels[column], dtype=object)
+            positions = rng.integers(0, len(column_levels), rows)
+            if categorical:
+                order = np.argsort(column_levels)
+                ranks = np.empty_like(order)
+                ranks[order] = np.arange(len(order))
+                columns[column] = pd.Categorical.from_codes(
+                    ranks[positions], column_levels[order]
+                )
+            else:
+                columns[column] = column_levels[positions]
+        else:
+            low, high = NUMERIC_RANGES[column]
+            columns[column] = rng.integers(low, high + 1, rows)
+    data = pd.DataFrame(columns)
+    for column, rate in NA_RATES.items():
+        mask = rng.random(rows) < rate
+        if mask.any():
+            if data[column].dtype.kind in "iu":
+                data[column] = data[column].astype("float64")
+            data.loc[mask, column] = np.nan
+    if extra_columns:
+        # the extra columns are joined at once to keep a single block
+        extra = pd.DataFrame(
+            rng.normal(0, 1, (rows, extra_columns)),
+            columns=[f"Extra{index}" for index in range(extra_columns)]
+        )
+        data = pd.concat([data, extra], axis=1)
+    return data
+
+
+def write_datasets(rows: int, folder: str, seed: int = 0):
+    """Generate and save a synthetic train and test dataset.
+
+    Args:
+        rows (int): the number of rows of each dataset.
+        folder (str): the relative path of the folder where the datasets
+        are going to be saved.
+        seed (int): the seed of the random generator.
+
+    Output:
+        a train.csv and a test.csv file in the folder given.
+    """
+    generate_data(rows, seed=seed).to_csv(f"{folder}/train.csv", index=False)
+    data_test = generate_data(rows, seed=seed + 1, with_target=False)
+    data_test["Id"] += rows
+    data_test.to_csv(f"{folder}/test.csv", index=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="synthetic",
+        description="generate a synthetic train and test dataset")
+    parser.add_argument("rows", type=int)
+    parser.add_argument("folder", type=str)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    write_datasets(args.rows, args.folder, args.seed)
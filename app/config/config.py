@@ -10,6 +10,7 @@ example_of_configvalues = ConfigVales()
 """
 
 from configparser import ConfigParser
+from typing import List
 
 
 class ConfigValues:
@@ -84,3 +85,193 @@ class ConfigValues:
         results_name = self.config["RESULTS"]["name"]
         path_to_return = f'{folder}/{results_name}'
         return path_to_return
+
+    def path_artifacts(self) -> str:
+        """Takes the name of the folder where the results are saved and the
+        name of the folder where the versions of the model are going to be
+        saved.
+
+        Returns:
+            path_to_return (str): the relative path of the folder of the
+            versions of the model.
+        """
+        folder = self.config["RESULTS"]["folder"]
+        artifacts_name = self.config.get(
+            "RESULTS", "artifacts", fallback="artifacts"
+        )
+        path_to_return = f'{folder}/{artifacts_name}'
+        return path_to_return
+
+    def path_search(self) -> str:
+        """Takes the name of the folder where the results are saved and the
+        name of the folder where the trials of each hyperparameter search
+        are going to be saved.
+
+        Returns:
+            path_to_return (str): the relative path of the folder of the
+            searches.
+        """
+        folder = self.config["RESULTS"]["folder"]
+        search_name = self.config.get(
+            "RESULTS", "search", fallback="search"
+        )
+        path_to_return = f'{folder}/{search_name}'
+        return path_to_return
+
+    def path_compare(self) -> str:
+        """Takes the name of the folder where the results are saved and the
+        name of the folder where the results of each comparison of models
+        are going to be saved.
+
+        Returns:
+            path_to_return (str): the relative path of the folder of the
+            comparisons.
+        """
+        folder = self.config["RESULTS"]["folder"]
+        compare_name = self.config.get(
+            "RESULTS", "compare", fallback="compare"
+        )
+        path_to_return = f'{folder}/{compare_name}'
+        return path_to_return
+
+    def models(self) -> List[str]:
+        """Takes the names of the models compared by the compare subcommand.
+
+        Returns:
+            List[str]: the names of the models in the registry.
+        """
+        models = self.config.get(
+            "TRAINING", "models",
+            fallback="random_forest, extra_trees, hist_gradient_boosting, "
+                     "ridge"
+        )
+        return [name.strip() for name in models.split(",") if name.strip()]
+
+    def trees_per_chunk(self) -> int:
+        """Takes the number of trees fitted with each chunk of rows by the
+        out-of-core training.
+
+        Returns:
+            int: the number of trees per chunk.
+        """
+        return self.config.getint("TRAINING", "trees_per_chunk", fallback=10)
+
+    def n_jobs(self) -> int:
+        """Takes the number of workers used to train and evaluate the model.
+
+        Returns:
+            int: the number of workers, -1 to use all the cores.
+        """
+        return self.config.getint("TRAINING", "n_jobs", fallback=-1)
+
+    def backend(self) -> str:
+        """Takes the pool of workers used to run the cross validation folds.
+
+        Returns:
+            str: the name of the pool: threads, processes or loky.
+        """
+        return self.config.get("TRAINING", "backend", fallback="loky")
+
+    def service_host(self) -> str:
+        """Takes the address where the scoring service listens.
+
+        Returns:
+            str: the address of the service.
+        """
+        return self.config.get("SERVICE", "host", fallback="127.0.0.1")
+
+    def service_port(self) -> int:
+        """Takes the port where the scoring service listens.
+
+        Returns:
+            int: the port of the service.
+        """
+        return self.config.getint("SERVICE", "port", fallback=8000)
+
+    def max_batch_size(self) -> int:
+        """Takes the maximum number of listings scored in a single batch by
+        the scoring service.
+
+        Returns:
+            int: the maximum size of a batch.
+        """
+        return self.config.getint("SERVICE", "max_batch_size", fallback=64)
+
+    def max_wait_ms(self) -> float:
+        """Takes the maximum time that a batch of the scoring service waits
+        for more listings.
+
+        Returns:
+            float: the maximum waiting time in milliseconds.
+        """
+        return self.config.getfloat("SERVICE", "max_wait_ms", fallback=5.0)
+
+    def coordinator_host(self) -> str:
+        """Takes the address where the coordinator of the distributed
+        trials listens.
+
+        Returns:
+            str: the address of the coordinator.
+        """
+        return self.config.get("DISTRIBUTED", "host", fallback="0.0.0.0")
+
+    def coordinator_port(self) -> int:
+        """Takes the port where the coordinator of the distributed trials
+        listens.
+
+        Returns:
+            int: the port of the coordinator.
+        """
+        return self.config.getint("DISTRIBUTED", "port", fallback=6000)
+
+    def task_timeout(self) -> float:
+        """Takes the seconds a worker of the distributed trials has to
+        answer a task before it is handed out again.
+
+        Returns:
+            float: the timeout of a task in seconds, 0 to wait while the
+            worker is connected.
+        """
+        return self.config.getfloat(
+            "DISTRIBUTED", "task_timeout", fallback=0.0
+        )
+
+    def path_prediction_cache(self) -> str:
+        """Takes the name of the folder of the cache and the name of the
+        SQLite file where the predictions of the scored rows are cached.
+
+        Returns:
+            path_to_return (str): the relative path of the file of the
+            predictions, under the folder of the cache.
+        """
+        predictions_name = self.config.get(
+            "CACHE", "predictions", fallback="predictions.sqlite"
+        )
+        path_to_return = f'{self.path_cache()}/{predictions_name}'
+        return path_to_return
+
+    def prediction_cache_max_rows(self) -> int:
+        """Takes the maximum number of predictions cached.
+
+        Returns:
+            int: the maximum number of rows of the cache of predictions.
+        """
+        return self.config.getint(
+            "CACHE", "predictions_max_rows", fallback=5000000
+        )
+
+    def path_cache(self) -> str:
+        """Takes the name of the folder where the cached datasets are saved.
+
+        Returns:
+            str: the relative path of the folder of the cache.
+        """
+        return self.config.get("CACHE", "folder", fallback="cache")
+
+    def cache_max_size_mb(self) -> float:
+        """Takes the maximum size of the cached datasets.
+
+        Returns:
+            float: the maximum size of the cache in megabytes.
+        """
+        return self.config.getfloat("CACHE", "max_size_mb", fallback=2048)
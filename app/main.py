@@ -7,32 +7,265 @@ Python file under the src folder.
 It uses pandas and scikit-learn libraries for data manipulation
 and creation of machine learning models.
 
+The operations are split into subcommands, and each one imports the heavy
+libraries it needs (pandas, scikit-learn, matplotlib...) only when it
+runs, so short-lived processes such as the scoring or the validation of a
+file do not pay the start time of the rest:
+- train: reads the datasets, generates the EDA plots, trains and evaluates
+  the model, saves it and generates the submissions.
+- predict: scores a csv file with a saved model.
+- eda: generates the EDA plots of a dataset.
+- validate: checks that a csv file can be processed by a saved pipeline.
+- search: searches the parameters of the model by successive halving.
+- compare: compares the score, speed and size of several models.
+- train-chunked: trains the model reading the train dataset by chunks, for
+  datasets which do not fit in memory.
+- coordinator: hands out the folds of the candidates of a grid to the
+  workers which connect to it, from this or other hosts.
+- worker: evaluates the tasks of a coordinator until it stops.
+
 To execute this Python script just open a terminal and type the command:
-python main.py.
+python main.py <subcommand> [options], for example python main.py train 250.
 """
+# the heavy modules are imported by the functions that use them
+# pylint: disable=import-outside-toplevel
 # importing needed libraries
+from __future__ import annotations
+
 import argparse
 import logging
+import os
+import sys
+import time
+from concurrent.futures import Future
 from statistics import mean
-
-import pandas as pd
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import cross_val_score
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
 # importing needed classes and modules
 from config import config
-from src import cleaning as cln
-from src import eda
-from src import preprocessing as prcs
+from src import instrumentation as instr
 
-# an argument parser was included to manage the number of max leaf nodes
-# of the random forest
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from src.cache import DatasetCache
+    from src.pipeline import HousePricingPipeline
+
+# an argument parser with a subcommand for each operation, the number of max
+# leaf nodes of the random forest is given to the train subcommand
 parser = argparse.ArgumentParser(
-    prog="main", 
-    usage="whoa, use: %(prog)s [options] number",
-    description="number of max leaf nodes of a random forest")
+    prog="main",
+    description="train, score and analyse the house pricing model")
+subparsers = parser.add_subparsers(dest="command", required=True)
+
+train_parser = subparsers.add_parser(
+    "train", help="train, evaluate and save the model")
+train_parser.add_argument('max_leaf', type=int)
+train_parser.add_argument(
+    '--inplace', action='store_true',
+    help="mutate the read datasets instead of copying them on each step")
+train_parser.add_argument(
+    '--engine', choices=["c", "pyarrow"], default=None,
+    help="parser engine of the csv files, pyarrow has to be installed")
+train_parser.add_argument(
+    '--skip-eda', action='store_true',
+    help="do not generate the EDA plots nor import the plotting libraries")
+train_parser.add_argument(
+    '--no-cache', action='store_true',
+    help="read and process the datasets without using the cache")
+train_parser.add_argument(
+    '--refresh-cache', action='store_true',
+    help="read and process the datasets again and replace the cache")
+train_parser.add_argument(
+    '--n-jobs', type=int, default=None,
+    help="workers to train and evaluate the model, -1 for all the cores "
+         "(overrides the TRAINING section of config.ini)")
+# the choices are the keys of training.BACKENDS, written here so the
+# parser does not import scikit-learn
+train_parser.add_argument(
+    '--backend', choices=["loky", "processes", "threads"], default=None,
+    help="pool of workers of the cross validation folds "
+         "(overrides the TRAINING section of config.ini)")
+
+predict_parser = subparsers.add_parser(
+    "predict", help="score a csv file with a saved model")
+predict_parser.add_argument(
+    'input', nargs='?', default=None,
+    help="csv file to score, by default the test dataset")
+predict_parser.add_argument(
+    'output', nargs='?', default=None,
+    help="csv file of the predictions, by default the submissions file")
+predict_parser.add_argument(
+    '--chunksize', type=int, default=None,
+    help="score the file by chunks of rows, appending the predictions of "
+         "each chunk to the output")
+predict_parser.add_argument(
+    '--n-jobs', type=int, default=1,
+    help="workers which process the rows of the file, -1 for all the "
+         "cores, ignored with --chunksize")
+predict_parser.add_argument(
+    '--cache', action='store_true',
+    help="read the predictions of the rows already scored by the same model "
+         "from the cache of predictions, and predict only the rest")
+
+eda_parser = subparsers.add_parser(
+    "eda", help="generate the EDA plots of a dataset")
+eda_parser.add_argument(
+    'input', nargs='?', default=None,
+    help="csv file to analyse, by default the train dataset")
+eda_parser.add_argument(
+    '--heatmap', default=None,
+    help="image of the heatmap of nulls, by default the configured one")
+eda_parser.add_argument(
+    '--collage', default=None,
+    help="image of the collage of plots, by default the configured one")
+
+validate_parser = subparsers.add_parser(
+    "validate", help="check that a csv file can be scored by a saved model")
+validate_parser.add_argument(
+    'input', nargs='?', default=None,
+    help="csv file to validate, by default the test dataset")
+validate_parser.add_argument(
+    '--chunksize', type=int, default=100000,
+    help="rows of the file processed at once")
+
+search_parser = subparsers.add_parser(
+    "search", help="search the parameters of the model by successive halving")
+search_parser.add_argument(
+    '--grid', action='append', default=None, metavar="NAME=VALUE,...",
+    help="values of a parameter of the forest, repeated for each parameter, "
+         "by default a grid of max_leaf_nodes, max_features and "
+         "min_samples_leaf")
+search_parser.add_argument(
+    '--eta', type=int, default=3,
+    help="factor by which the candidates are reduced, and the rows "
+         "increased, after each round")
+search_parser.add_argument(
+    '--min-rows', type=int, default=100,
+    help="minimum rows used to evaluate the candidates of the first round")
+search_parser.add_argument(
+    '--folds', type=int, default=5,
+    help="folds of the cross validation of each trial")
+search_parser.add_argument(
+    '--n-jobs', type=int, default=None,
+    help="candidates evaluated at the same time, -1 for all the cores "
+         "(overrides the TRAINING section of config.ini)")
+search_parser.add_argument(
+    '--output', default=None,
+    help="folder of the trials, by default a new folder under the "
+         "configured searches folder")
+
+compare_parser = subparsers.add_parser(
+    "compare", help="compare the models of the registry on the same features")
+compare_parser.add_argument(
+    '--model', action='append', default=None, dest='models',
+    metavar="NAME",
+    help="model of the registry, repeated for each model, by default the "
+         "models of the TRAINING section of config.ini")
+compare_parser.add_argument(
+    '--folds', type=int, default=5,
+    help="folds of the cross validation of each model")
+compare_parser.add_argument(
+    '--n-jobs', type=int, default=None,
+    help="models evaluated at the same time, -1 for all the cores "
+         "(overrides the TRAINING section of config.ini)")
+compare_parser.add_argument(
+    '--output', default=None,
+    help="folder of the results, by default a new folder under the "
+         "configured comparisons folder")
+
+chunked_parser = subparsers.add_parser(
+    "train-chunked",
+    help="train and save the model reading the train dataset by chunks")
+chunked_parser.add_argument('max_leaf', type=int)
+chunked_parser.add_argument(
+    'input', nargs='?', default=None,
+    help="csv file to train with, by default the train dataset")
+chunked_parser.add_argument(
+    '--chunksize', type=int, default=100000,
+    help="rows of the file read at once")
+chunked_parser.add_argument(
+    '--trees-per-chunk', type=int, default=None,
+    help="trees fitted with each chunk (overrides the TRAINING section of "
+         "config.ini)")
+chunked_parser.add_argument(
+    '--validation', default=None,
+    help="csv file with the output variable to score the model with, read "
+         "by chunks too")
+chunked_parser.add_argument(
+    '--n-jobs', type=int, default=None,
+    help="workers used to build the trees, -1 for all the cores "
+         "(overrides the TRAINING section of config.ini)")
+chunked_parser.add_argument(
+    '--artifacts', default=None,
+    help="folder of the saved models, by default the configured one")
 
-parser.add_argument('max_leaf', type=int)
+coordinator_parser = subparsers.add_parser(
+    "coordinator",
+    help="evaluate a grid of parameters with the workers which connect")
+coordinator_parser.add_argument(
+    '--grid', action='append', default=None, metavar="NAME=VALUE,...",
+    help="values of a parameter of the forest, repeated for each parameter, "
+         "by default the grid of the search subcommand")
+coordinator_parser.add_argument(
+    '--folds', type=int, default=5,
+    help="folds of the cross validation of each candidate, each fold is a "
+         "task")
+coordinator_parser.add_argument(
+    '--host', default=None,
+    help="address listened (overrides the DISTRIBUTED section of "
+         "config.ini)")
+coordinator_parser.add_argument(
+    '--port', type=int, default=None,
+    help="port listened (overrides the DISTRIBUTED section of config.ini)")
+coordinator_parser.add_argument(
+    '--task-timeout', type=float, default=None,
+    help="seconds a worker has to answer a task before it is handed out "
+         "again, 0 to wait while the worker is connected (overrides the "
+         "DISTRIBUTED section of config.ini)")
+coordinator_parser.add_argument(
+    '--data-path', default=None,
+    help="npz file on a filesystem shared with the workers to ship the "
+         "features through, by default they are sent to each worker")
+coordinator_parser.add_argument(
+    '--output', default=None,
+    help="folder of the trials, by default a new folder under the "
+         "configured searches folder")
+
+worker_parser = subparsers.add_parser(
+    "worker", help="evaluate the tasks of a coordinator")
+worker_parser.add_argument(
+    'address', help="host:port of the coordinator")
+worker_parser.add_argument(
+    '--connect-timeout', type=float, default=60.0,
+    help="seconds waiting for the coordinator to listen")
+
+for command_parser in (predict_parser, validate_parser):
+    command_parser.add_argument(
+        '--version', default=None,
+        help="version of the saved model, by default the last one")
+    command_parser.add_argument(
+        '--artifacts', default=None,
+        help="folder of the saved models, by default the configured one")
+for command_parser in (
+            train_parser, predict_parser, validate_parser, search_parser,
+            compare_parser, chunked_parser, coordinator_parser
+        ):
+    command_parser.add_argument(
+        '--metrics', default=None,
+        help="JSON lines file with the time, memory and shape of each "
+             "stage, by default the stages are not measured")
+    command_parser.add_argument(
+        '--profile', choices=instr.PROFILERS, default=None,
+        help="profile each stage measured with --metrics with cProfile or "
+             "tracemalloc")
+    command_parser.add_argument(
+        '--profile-dir', default="logs/profiles",
+        help="folder of the dumps of the profiler of each stage")
+for command_parser in (predict_parser, eda_parser):
+    command_parser.add_argument(
+        '--engine', choices=["c", "pyarrow"], default=None,
+        help="parser engine of the csv file, pyarrow has to be installed")
 
 # defining predefined set of variables for data manipulation
 COLS_TO_DROP = [
@@ -70,14 +303,46 @@ NOT_OUTPUT_VARIABLES = [
 
 GOAL_VARIABLE = "SalePrice"
 
+ID_COLUMN = "Id"
+
+CATEGORICAL_COLUMNS = ORDINAL_COLS + CATEGORICAL_ENCODE + FILL_CATEGORICAL
+
+NUMERICAL_COLUMNS = [
+                     "LotFrontage", "LotArea", "OverallQual", "YearBuilt",
+                     "MasVnrArea", "TotalBsmtSF", "1stFlrSF", "GrLivArea",
+                     "BsmtFullBath", "BsmtHalfBath", "FullBath", "HalfBath",
+                     "BedroomAbvGr", "KitchenAbvGr", "TotRmsAbvGrd",
+                     "Fireplaces", "GarageCars", "OpenPorchSF",
+                     "EnclosedPorch", "3SsnPorch", "ScreenPorch", "PoolArea",
+                     "MiscVal", GOAL_VARIABLE
+                 ]
+
+CV_FOLDS = 10
 
-def init_logging():
+# log file of each subcommand
+LOG_FILES = {
+    "train": "logs/logs.log",
+    "predict": "logs/predict.log",
+    "eda": "logs/eda.log",
+    "validate": "logs/validate.log",
+    "search": "logs/search.log",
+    "compare": "logs/compare.log",
+    "train-chunked": "logs/train_chunked.log",
+    "coordinator": "logs/coordinator.log",
+    "worker": "logs/worker.log"
+}
+
+
+def init_logging(filename: str = LOG_FILES["train"]):
     """Initialize the basic configuration parameters to save the log messages
         in a external log file.
+
+    Args:
+        filename (str): the relative path of the log file.
     """
     try:
         logging.basicConfig(
-                            filename='logs/logs.log',
+                            filename=filename,
                             level=logging.INFO,
                             filemode='w',
                             format='%(name)s - %(levelname)s - %(message)s'
@@ -86,125 +351,812 @@ def init_logging():
         logging.error("Logging could not start")
 
 
-def pipeline(data: pd.DataFrame):
+def build_pipeline(inplace: bool = False) -> HousePricingPipeline:
+    """Create a new pipeline with the predefined sets of variables.
+
+    Args:
+        inplace (bool): whether the pipeline mutates the dataframes given
+        instead of working on copies.
+
+    Returns:
+        HousePricingPipeline: a pipeline ready to be fitted.
+    """
+    from src.pipeline import HousePricingPipeline
+    return HousePricingPipeline(
+        cols_to_drop=COLS_TO_DROP,
+        fill_categorical=FILL_CATEGORICAL,
+        categorical_encode=CATEGORICAL_ENCODE,
+        not_output_variables=NOT_OUTPUT_VARIABLES,
+        custom_value="No",
+        inplace=inplace,
+        target=GOAL_VARIABLE
+    )
+
+
+def pipeline(data: pd.DataFrame, inplace: bool = False):
     """Performs all cleaning and preprocessing steps on a given dataframe.
 
     Args:
         data (pd.DataFrame): the dataframe to be processed.
+        inplace (bool): whether to use the dataframe given as the working
+        buffer of all the steps instead of copying it.
 
     Returns:
         final_data (pd.DataFrame): a datagrame with no "NA" values and
         columns encoded.
     """
-    aux_data = data.copy()
-    # dropping variables that are not going to be used in the analysis
-    # or predictions
-    data_filtered = aux_data.drop(COLS_TO_DROP, axis=1)
-    # fill NA values for custom variables with an specific value.
-    data_cleaned = cln.custom_fill_na_values(
-        data_filtered, FILL_CATEGORICAL, "No"
-    )
-    # fill all NA values
-    data_cleaned = cln.fill_all_na_values(data_cleaned)
-    logging.info("NA values removed.")
-    # performs the encoding of some categorical variables
-    preprocessed_data = prcs.encode_variables(data_cleaned)
-    preprocessed_data = prcs.encode_categorical_columns(
-        preprocessed_data, CATEGORICAL_ENCODE
-    )
-    logging.info("Encoding process finished.")
-    # create the interactions between variables
-    preprocessed_data = prcs.create_interactions(preprocessed_data)
-    logging.info("Interactions created successfully.")
-    # drop variables that are not going to be used for the predictions.
-    final_data = preprocessed_data.drop(NOT_OUTPUT_VARIABLES, axis=1)
-    logging.info("Pipeline finished.")
+    # learn the fill values and encodings from the same dataframe
+    final_data = build_pipeline(inplace).fit_transform(data)
     return final_data
 
 
-def generate_submissions(
-            ids: pd.core.series.Series,
-            model: RandomForestRegressor,
-            data: pd.DataFrame,
-            path_to_save: str
-        ):
-    """Generate a new dataset with the predictions generated from the
-        dataframe given.
-
-    Args:
-        ids (pd.core.series.Series): the ids to index the results.
-        model (RandomForestRegressor): a pretrained random forest model.
-        data (pd.DataFrame): the dataset which will be used to generate
-        the predictions.
-        path_to_save (str): the relative path where the results are going
-        to be saved.
-
-    Output:
-        a csv file with the predictions indexed by the ids given.
-    """
-    # generate predictions using a given model
-    price = model.predict(data)
-    # create the predictions dataset using the ids to index each entry
-    submission = pd.DataFrame({
-        "Id": ids,
-        "SalePrice": price
+def read_cached(cache: DatasetCache, path: str, **options) -> pd.DataFrame:
+    """Read a dataset, reusing the cached one when its file did not change.
+
+    Args:
+        cache (DatasetCache): the cache of the datasets.
+        path (str): the relative path of the csv file.
+        **options: the arguments of the ingestion.read_dataset function.
+
+    Returns:
+        data (pd.DataFrame): the dataset read.
+    """
+    from src import ingestion as ing
+    key = cache.key([path], {"stage": "raw", **options})
+    with instr.stage("read", path=path) as current:
+        data = cache.get_frame(key)
+        if data is None:
+            data = ing.read_dataset(path, **options)
+            cache.put_frame(key, data)
+        current.output(data)
+    return data
+
+
+def preprocess_cached(
+            cache: DatasetCache,
+            data_train: pd.DataFrame,
+            data_test: pd.DataFrame,
+            source_paths: List[str],
+            inplace: bool = False
+        ) -> Tuple[pd.DataFrame, pd.DataFrame, HousePricingPipeline]:
+    """Fit the pipeline on the train dataset and process both datasets,
+        reusing the cached results when the source files did not change.
+
+    Args:
+        cache (DatasetCache): the cache of the datasets.
+        data_train (pd.DataFrame): the train dataset.
+        data_test (pd.DataFrame): the test dataset.
+        source_paths (List[str]): the csv files of both datasets.
+        inplace (bool): whether the pipeline mutates the datasets given.
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame, HousePricingPipeline]: the
+        processed train and test datasets and the fitted pipeline.
+    """
+    fitted_pipeline = build_pipeline(inplace)
+    key = cache.key([
+        *source_paths,
+        fitted_pipeline.encoders_path,
+        fitted_pipeline.interactions_path
+    ], {
+        "stage": "pipeline",
+        "cols_to_drop": COLS_TO_DROP,
+        "fill_categorical": FILL_CATEGORICAL,
+        "categorical_encode": CATEGORICAL_ENCODE,
+        "not_output_variables": NOT_OUTPUT_VARIABLES
     })
-    submission.to_csv(path_to_save, index=False)
+    final_data_train = cache.get_frame(key + "-train")
+    final_data_test = cache.get_frame(key + "-test")
+    cached_pipeline = cache.get_object(key + "-pipeline")
+    if not any(
+                cached is None for cached in
+                (final_data_train, final_data_test, cached_pipeline)
+            ):
+        logging.info("Processed datasets read from the cache.")
+        return final_data_train, final_data_test, cached_pipeline
+    logging.info("Executing pipeline for train dataset.")
+    final_data_train = fitted_pipeline.fit_transform(data_train)
+    logging.info("Executing pipeline for test dataset.")
+    final_data_test = fitted_pipeline.transform(data_test)
+    # the inplace mode only applies to the datasets of this run, the cached
+    # and saved pipeline never mutates the dataframes it scores, and the
+    # key of the cache does not depend on it
+    fitted_pipeline.inplace = False
+    cache.put_frame(key + "-train", final_data_train)
+    cache.put_frame(key + "-test", final_data_test)
+    cache.put_object(key + "-pipeline", fitted_pipeline)
+    return final_data_train, final_data_test, fitted_pipeline
 
 
-if __name__ == "__main__":
-    # retrieving the arguments from the execution
-    args = parser.parse_args()
-    init_logging()
+def wait_plots(plots: List[Future]):
+    """Wait until the EDA plots generated in the background are saved.
+
+    Args:
+        plots (List[Future]): the future results of the heatmap and the
+        collage of plots.
+    """
+    names = ["Heatmap", "Collage of plots"]
+    for name, plot in zip(names, plots):
+        try:
+            plot.result()
+            logging.info("%s has been created succesfully.", name)
+        except FileNotFoundError:
+            logging.error("The path to save the %s is wrong.", name.lower())
+
+
+def train(args: argparse.Namespace) -> int:
+    """Read the datasets, generate the EDA plots, train and evaluate the
+        model, save it and generate the submissions.
+
+    Args:
+        args (argparse.Namespace): the arguments of the train subcommand.
+
+    Returns:
+        int: the exit code of the subcommand.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    import pandas as pd
+    from src import artifacts as art
+    from src import crossval as cv
+    from src import training as trn
+    from src.cache import DatasetCache
+    from src.scoring import generate_submissions
     config_values = config.ConfigValues()
+    cache = DatasetCache(
+        config_values.path_cache(),
+        config_values.cache_max_size_mb(),
+        enabled=not args.no_cache,
+        refresh=args.refresh_cache
+    )
     # read train and test data
     data_train = pd.DataFrame()
     data_test = pd.DataFrame()
     try:
-        data_train = pd.read_csv(config_values.path_train())
-        data_test = pd.read_csv(config_values.path_test())
+        # the train dataset keeps all its columns for the EDA, while the
+        # test dataset only parses the columns used by the pipeline
+        data_train = read_cached(
+            cache,
+            config_values.path_train(),
+            categorical=CATEGORICAL_COLUMNS,
+            numerical=NUMERICAL_COLUMNS,
+            engine=args.engine
+        )
+        data_test = read_cached(
+            cache,
+            config_values.path_test(),
+            cols_to_drop=COLS_TO_DROP,
+            categorical=CATEGORICAL_COLUMNS,
+            numerical=NUMERICAL_COLUMNS,
+            keep=[ID_COLUMN],
+            engine=args.engine
+        )
         logging.info("Train and test datasets have been read succesfully.")
     except FileNotFoundError:
-        data_train, data_test = None, None
         logging.error("The path for train or test dataset is wrong.")
+        return 1
     if not (data_train.empty and data_test.empty):
         # separate the ids to index each entry
-        output_ids = data_test["Id"]
-        # generate the plots from EDA analysis
-        try:
-            eda.heatmap_of_nulls(data_train, config_values.path_heatmap())
-            logging.info("Heatmap has been created succesfully.")
-            eda.collage_of_plots(data_train, config_values.path_collage())
-            logging.info("Collage of plots has been created succesfully.")
-        except FileNotFoundError:
-            logging.error("The path to save one or both plots is wrong.")
-        # execute the pipeline operations over each dataset
-        logging.info("Executing pipeline for train dataset.")
-        final_data_train = pipeline(data_train)
-        logging.info("Executing pipeline for test dataset.")
-        final_data_test = pipeline(data_test)
-        # define the input and output variables
-        y = final_data_train[GOAL_VARIABLE]
-        X = final_data_train.drop(GOAL_VARIABLE, axis=1)
+        output_ids = data_test[ID_COLUMN]
+        # generate the plots from EDA analysis in background processes
+        # while the model is trained, the plotting libraries are only
+        # imported when the plots are generated
+        eda_pool, eda_plots = None, []
+        if not args.skip_eda:
+            from src import eda as plots
+            eda_pool = ProcessPoolExecutor(max_workers=2)
+            eda_plots = plots.start_plots(
+                eda_pool,
+                data_train,
+                config_values.path_heatmap(),
+                config_values.path_collage()
+            )
+        # the cross validation learns the pipeline values again in every
+        # fold, so it needs the train dataset before it is processed
+        data_folds = data_train.copy() if args.inplace else data_train
+        # learn the pipeline values from the train dataset and reuse them
+        # to process the test dataset
+        with instr.stage("preprocess", data_train) as current:
+            final_data_train, final_data_test, fitted_pipeline = (
+                preprocess_cached(
+                    cache,
+                    data_train,
+                    data_test,
+                    [config_values.path_train(), config_values.path_test()],
+                    args.inplace
+                )
+            )
+            current.output(final_data_train)
+        logging.info("Cache hits: %s, misses: %s.", cache.hits, cache.misses)
+        # define the input and output variables, the input variables as
+        # the float32 matrix that the forest uses internally
+        y = final_data_train[GOAL_VARIABLE].to_numpy(dtype="float64")
+        X = fitted_pipeline.to_matrix(final_data_train)
         # create a Random forest regressor model, train it and evalute it
+        # using the configured pool of workers
+        n_jobs = (
+            config_values.n_jobs() if args.n_jobs is None else args.n_jobs
+        )
+        backend = (
+            config_values.backend() if args.backend is None else args.backend
+        )
         logging.info("Creating Random Forest model...")
         max_leaf_nodes = args.max_leaf
-        rf_model = RandomForestRegressor(
-                                        max_leaf_nodes=max_leaf_nodes
-                                    )
+        rf_model = trn.build_model(max_leaf_nodes, n_jobs=n_jobs)
         logging.info("Training Random Forest...")
-        rf_model.fit(X, y)
-        score = cross_val_score(rf_model, X, y, cv=10)
-        logging.info('The mean score of 10 folds in '
-                     'cross validation is: %s', mean(score))
+        start = time.perf_counter()
+        with instr.stage("fit", X):
+            rf_model.fit(X, y)
+        logging.info("Random Forest trained in %.3fs.",
+                     time.perf_counter() - start)
+        with instr.stage("cross_validation", data_folds, folds=CV_FOLDS):
+            score = cv.cross_validate_pipeline(
+                rf_model, fitted_pipeline, data_folds, y,
+                folds=CV_FOLDS, n_jobs=n_jobs, backend=backend
+            )
+        logging.info('The mean score of %s folds in '
+                     'cross validation is: %s', CV_FOLDS, mean(score))
+        # save the trained model and the fitted pipeline, so predictions can
+        # be generated later without training again
+        try:
+            art.save_artifacts(
+                rf_model,
+                fitted_pipeline,
+                config_values.path_artifacts(),
+                metadata={
+                    "max_leaf_nodes": max_leaf_nodes,
+                    "cv_folds": CV_FOLDS,
+                    "cv_score": mean(score)
+                }
+            )
+        except OSError:
+            logging.error("The path to save the artifacts is wrong.")
         # generate a new file with the predictions of the test dataset
         try:
             generate_submissions(
                                 output_ids,
                                 rf_model,
-                                final_data_test,
+                                fitted_pipeline.to_matrix(final_data_test),
                                 config_values.path_submissions()
                             )
             logging.info("Submissions file has been created successfully.")
         except OSError:
             logging.error("The path to save the submissions is wrong.")
+        # the run only waits for the EDA plots before exiting
+        wait_plots(eda_plots)
+        if eda_pool is not None:
+            eda_pool.shutdown()
+    return 0
+
+
+def predict(args: argparse.Namespace) -> int:
+    """Score a csv file with a saved model and its fitted pipeline.
+
+    Args:
+        args (argparse.Namespace): the arguments of the predict subcommand.
+
+    Returns:
+        int: the exit code of the subcommand.
+    """
+    from src import artifacts as art
+    from src import predictions as prd
+    from src.scoring import score_csv
+    config_values = config.ConfigValues()
+    input_path = args.input or config_values.path_test()
+    output_path = args.output or config_values.path_submissions()
+    folder = args.artifacts or config_values.path_artifacts()
+    try:
+        model, fitted_pipeline, metadata = art.load_artifacts(
+            folder, args.version
+        )
+    except FileNotFoundError:
+        logging.error("There are no saved artifacts to load.")
+        raise
+    cache = None
+    if args.cache:
+        # the cache is emptied when the files of the version change
+        version_folder = os.path.join(folder, metadata["version"])
+        cache = prd.PredictionCache(
+            config_values.path_prediction_cache(),
+            prd.model_key([
+                os.path.join(version_folder, art.MODEL_FILE),
+                os.path.join(version_folder, art.PIPELINE_FILE)
+            ], fitted_pipeline),
+            config_values.prediction_cache_max_rows()
+        )
+    try:
+        score_csv(
+            model, fitted_pipeline, input_path, output_path,
+            chunksize=args.chunksize, engine=args.engine, n_jobs=args.n_jobs,
+            cache=cache
+        )
+        logging.info("Submissions file has been created successfully.")
+    except FileNotFoundError:
+        logging.error("The path of the dataset to score is wrong.")
+        raise
+    finally:
+        if cache is not None:
+            cache.close()
+    if cache is not None:
+        logging.info(
+            "Prediction cache: %s hits, %s misses, %.3fs saved.",
+            cache.hits, cache.misses, cache.seconds_saved
+        )
+        print(
+            f"{cache.hits} cached predictions, {cache.misses} rows "
+            f"predicted, about {cache.seconds_saved:.3f}s saved"
+        )
+    return 0
+
+
+def eda(args: argparse.Namespace) -> int:
+    """Generate the EDA plots of a dataset.
+
+    Args:
+        args (argparse.Namespace): the arguments of the eda subcommand.
+
+    Returns:
+        int: the exit code of the subcommand.
+    """
+    from src import eda as plots
+    from src import ingestion as ing
+    config_values = config.ConfigValues()
+    try:
+        data = ing.read_dataset(
+            args.input or config_values.path_train(),
+            categorical=CATEGORICAL_COLUMNS,
+            numerical=NUMERICAL_COLUMNS,
+            engine=args.engine
+        )
+    except FileNotFoundError:
+        logging.error("The path of the dataset to analyse is wrong.")
+        return 1
+    try:
+        plots.heatmap_of_nulls(
+            data, args.heatmap or config_values.path_heatmap()
+        )
+        logging.info("Heatmap has been created succesfully.")
+        plots.collage_of_plots(
+            data, args.collage or config_values.path_collage()
+        )
+        logging.info("Collage of plots has been created succesfully.")
+    except FileNotFoundError:
+        logging.error("The path to save one or both plots is wrong.")
+        return 1
+    return 0
+
+
+def validate(args: argparse.Namespace) -> int:
+    """Check that every row of a csv file can be processed by the fitted
+        pipeline of a saved model, without loading the model itself.
+
+    Args:
+        args (argparse.Namespace): the arguments of the validate subcommand.
+
+    Returns:
+        int: the exit code of the subcommand, 1 if the file is not valid.
+    """
+    import pandas as pd
+    from src import artifacts as art
+    from src import ingestion as ing
+    config_values = config.ConfigValues()
+    input_path = args.input or config_values.path_test()
+    fitted_pipeline = art.load_pipeline(
+        args.artifacts or config_values.path_artifacts(), args.version
+    )
+    rows = 0
+    try:
+        options = ing.pipeline_read_options(input_path, fitted_pipeline)
+        for chunk in pd.read_csv(
+                    input_path, chunksize=args.chunksize, **options
+                ):
+            fitted_pipeline.transform(chunk)
+            rows += len(chunk)
+    except FileNotFoundError:
+        logging.error("The path of the dataset to validate is wrong.")
+        return 1
+    except (KeyError, ValueError) as error:
+        logging.error(
+            "The dataset is not valid after %s rows: %s", rows, error
+        )
+        print(f"{input_path}: not valid after {rows} rows: {error}")
+        return 1
+    logging.info("The %s rows of the dataset are valid.", rows)
+    print(f"{input_path}: {rows} valid rows")
+    return 0
+
+
+def search(args: argparse.Namespace) -> int:
+    """Search the parameters of the model by successive halving, processing
+        the train dataset once for all the trials.
+
+    Args:
+        args (argparse.Namespace): the arguments of the search subcommand.
+
+    Returns:
+        int: the exit code of the subcommand.
+    """
+    from src import search as srch
+    from src.cache import DatasetCache
+    config_values = config.ConfigValues()
+    cache = DatasetCache(
+        config_values.path_cache(), config_values.cache_max_size_mb()
+    )
+    try:
+        candidates = srch.expand_grid(
+            srch.parse_grid(args.grid) if args.grid else srch.DEFAULT_GRID
+        )
+    except ValueError as error:
+        print(error)
+        return 1
+    try:
+        data_train = read_cached(
+            cache,
+            config_values.path_train(),
+            categorical=CATEGORICAL_COLUMNS,
+            numerical=NUMERICAL_COLUMNS
+        )
+        data_test = read_cached(
+            cache,
+            config_values.path_test(),
+            cols_to_drop=COLS_TO_DROP,
+            categorical=CATEGORICAL_COLUMNS,
+            numerical=NUMERICAL_COLUMNS,
+            keep=[ID_COLUMN]
+        )
+    except FileNotFoundError:
+        logging.error("The path for train or test dataset is wrong.")
+        return 1
+    # the processed train dataset is shared with the training runs through
+    # the cache, so a search after a training does not process it again
+    with instr.stage("preprocess", data_train) as current:
+        final_data_train, _, _ = preprocess_cached(
+            cache,
+            data_train,
+            data_test,
+            [config_values.path_train(), config_values.path_test()]
+        )
+        current.output(final_data_train)
+    output = args.output or os.path.join(
+        config_values.path_search(), time.strftime('%Y%m%dT%H%M%S')
+    )
+    n_jobs = config_values.n_jobs() if args.n_jobs is None else args.n_jobs
+    with instr.stage("search", final_data_train, candidates=len(candidates)):
+        trials = srch.successive_halving(
+            final_data_train.drop(GOAL_VARIABLE, axis=1),
+            final_data_train[GOAL_VARIABLE],
+            candidates,
+            folds=args.folds,
+            eta=args.eta,
+            min_rows=args.min_rows,
+            n_jobs=n_jobs,
+            output=output
+        )
+    best = max(
+        (trial for trial in trials if trial["round"] == trials[-1]["round"]),
+        key=lambda trial: trial["mean_score"]
+    )
+    logging.info("Best parameters %s with R2 %.4f, trials saved to %s.",
+                 best["params"], best["mean_score"], output)
+    print(
+        f"{len(trials)} trials, best R2 {best['mean_score']:.4f} with "
+        f"{best['params']}, saved to {output}"
+    )
+    return 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    """Compare the models of the registry, processing the train dataset
+        once for all of them.
+
+    Args:
+        args (argparse.Namespace): the arguments of the compare subcommand.
+
+    Returns:
+        int: the exit code of the subcommand.
+    """
+    from src import compare as cmp
+    from src.cache import DatasetCache
+    config_values = config.ConfigValues()
+    cache = DatasetCache(
+        config_values.path_cache(), config_values.cache_max_size_mb()
+    )
+    try:
+        data_train = read_cached(
+            cache,
+            config_values.path_train(),
+            categorical=CATEGORICAL_COLUMNS,
+            numerical=NUMERICAL_COLUMNS
+        )
+        data_test = read_cached(
+            cache,
+            config_values.path_test(),
+            cols_to_drop=COLS_TO_DROP,
+            categorical=CATEGORICAL_COLUMNS,
+            numerical=NUMERICAL_COLUMNS,
+            keep=[ID_COLUMN]
+        )
+    except FileNotFoundError:
+        logging.error("The path for train or test dataset is wrong.")
+        return 1
+    # the processed train dataset is shared with the training runs through
+    # the cache, so a comparison after a training does not process it again
+    with instr.stage("preprocess", data_train) as current:
+        final_data_train, _, _ = preprocess_cached(
+            cache,
+            data_train,
+            data_test,
+            [config_values.path_train(), config_values.path_test()]
+        )
+        current.output(final_data_train)
+    output = args.output or os.path.join(
+        config_values.path_compare(), time.strftime('%Y%m%dT%H%M%S')
+    )
+    names = args.models or config_values.models()
+    n_jobs = config_values.n_jobs() if args.n_jobs is None else args.n_jobs
+    try:
+        with instr.stage("compare", final_data_train, models=len(names)):
+            results = cmp.compare_models(
+                final_data_train.drop(GOAL_VARIABLE, axis=1),
+                final_data_train[GOAL_VARIABLE],
+                names,
+                folds=args.folds,
+                n_jobs=n_jobs,
+                output=output
+            )
+    except ValueError as error:
+        print(error)
+        return 1
+    print(f"{'model':<24}{'R2':>8}{'fit s':>10}{'ms/1k rows':>12}{'KB':>10}")
+    for result in results:
+        print(
+            f"{result['model']:<24}{result['mean_score']:>8.4f}"
+            f"{result['fit_time_s']:>10.3f}"
+            f"{result['predict_ms_per_1k']:>12.3f}"
+            f"{result['size_bytes'] / 1024:>10.1f}"
+        )
+    logging.info("Comparison of %s models saved to %s.", len(results), output)
+    return 0
+
+
+def train_chunked(args: argparse.Namespace) -> int:
+    """Train the model with a train dataset read by chunks, so only a chunk
+        is processed in memory at once, and save it.
+
+    Args:
+        args (argparse.Namespace): the arguments of the train-chunked
+        subcommand.
+
+    Returns:
+        int: the exit code of the subcommand.
+    """
+    from src import artifacts as art
+    from src import outofcore as ooc
+    from src import training as trn
+    config_values = config.ConfigValues()
+    input_path = args.input or config_values.path_train()
+    trees_per_chunk = (
+        config_values.trees_per_chunk() if args.trees_per_chunk is None
+        else args.trees_per_chunk
+    )
+    n_jobs = config_values.n_jobs() if args.n_jobs is None else args.n_jobs
+    try:
+        with instr.stage("fit_pipeline_chunked", path=input_path):
+            fitted_pipeline = ooc.fit_pipeline_chunked(
+                build_pipeline(), input_path, args.chunksize
+            )
+        logging.info("Pipeline fitted by chunks of %s rows.", args.chunksize)
+        rf_model = trn.build_model(args.max_leaf, n_jobs=n_jobs)
+        with instr.stage("grow_forest", path=input_path):
+            ooc.grow_forest(
+                rf_model, fitted_pipeline, input_path, args.chunksize,
+                GOAL_VARIABLE, trees_per_chunk
+            )
+    except FileNotFoundError:
+        logging.error("The path of the train dataset is wrong.")
+        return 1
+    except ValueError as error:
+        print(error)
+        return 1
+    metadata = {
+        "max_leaf_nodes": args.max_leaf,
+        "chunksize": args.chunksize,
+        "trees_per_chunk": trees_per_chunk
+    }
+    if args.validation:
+        try:
+            with instr.stage("validation_score", path=args.validation):
+                metadata["validation_score"] = ooc.r2_chunked(
+                    rf_model, fitted_pipeline, args.validation,
+                    args.chunksize, GOAL_VARIABLE
+                )
+        except FileNotFoundError:
+            logging.error("The path of the validation dataset is wrong.")
+            return 1
+        logging.info("The R2 score of the validation dataset is: %s",
+                     metadata["validation_score"])
+        print(f"validation R2 {metadata['validation_score']:.4f}")
+    try:
+        version = art.save_artifacts(
+            rf_model, fitted_pipeline,
+            args.artifacts or config_values.path_artifacts(),
+            metadata=metadata
+        )
+    except OSError:
+        logging.error("The path to save the artifacts is wrong.")
+        return 1
+    print(f"{len(rf_model.estimators_)} trees saved as version {version}")
+    return 0
+
+
+def coordinator(args: argparse.Namespace) -> int:
+    """Evaluate a grid of parameters with the workers which connect, from
+        this or other hosts, processing the train dataset once.
+
+    Args:
+        args (argparse.Namespace): the arguments of the coordinator
+        subcommand.
+
+    Returns:
+        int: the exit code of the subcommand.
+    """
+    import secrets
+
+    from src import distributed as dist
+    from src import search as srch
+    from src.cache import DatasetCache
+    config_values = config.ConfigValues()
+    cache = DatasetCache(
+        config_values.path_cache(), config_values.cache_max_size_mb()
+    )
+    try:
+        candidates = srch.expand_grid(
+            srch.parse_grid(args.grid) if args.grid else srch.DEFAULT_GRID
+        )
+    except ValueError as error:
+        print(error)
+        return 1
+    try:
+        data_train = read_cached(
+            cache,
+            config_values.path_train(),
+            categorical=CATEGORICAL_COLUMNS,
+            numerical=NUMERICAL_COLUMNS
+        )
+        data_test = read_cached(
+            cache,
+            config_values.path_test(),
+            cols_to_drop=COLS_TO_DROP,
+            categorical=CATEGORICAL_COLUMNS,
+            numerical=NUMERICAL_COLUMNS,
+            keep=[ID_COLUMN]
+        )
+    except FileNotFoundError:
+        logging.error("The path for train or test dataset is wrong.")
+        return 1
+    with instr.stage("preprocess", data_train) as current:
+        final_data_train, _, _ = preprocess_cached(
+            cache,
+            data_train,
+            data_test,
+            [config_values.path_train(), config_values.path_test()]
+        )
+        current.output(final_data_train)
+    # the workers have to be started with the same key
+    authkey = os.environ.get(dist.AUTHKEY_VARIABLE)
+    if not authkey:
+        authkey = secrets.token_hex(16)
+        print(f"export {dist.AUTHKEY_VARIABLE}={authkey}")
+    address = (
+        args.host or config_values.coordinator_host(),
+        config_values.coordinator_port() if args.port is None else args.port
+    )
+    task_timeout = (
+        config_values.task_timeout() if args.task_timeout is None
+        else args.task_timeout
+    )
+    output = args.output or os.path.join(
+        config_values.path_search(), time.strftime('%Y%m%dT%H%M%S')
+    )
+    print(
+        f"{len(candidates)} candidates, {len(candidates) * args.folds} "
+        f"tasks, start the workers with: python main.py worker "
+        f"<this host>:{address[1]}"
+    )
+    try:
+        with instr.stage(
+                    "distributed_search", final_data_train,
+                    candidates=len(candidates)
+                ):
+            trials = dist.distributed_search(
+                final_data_train.drop(GOAL_VARIABLE, axis=1),
+                final_data_train[GOAL_VARIABLE],
+                candidates,
+                address,
+                authkey.encode("utf-8"),
+                folds=args.folds,
+                data_path=args.data_path,
+                task_timeout=task_timeout or None,
+                output=output
+            )
+    except (OSError, RuntimeError) as error:
+        print(error)
+        return 1
+    best = max(trials, key=lambda trial: trial["mean_score"])
+    logging.info("Best parameters %s with R2 %.4f, trials saved to %s.",
+                 best["params"], best["mean_score"], output)
+    print(
+        f"{len(trials)} trials, best R2 {best['mean_score']:.4f} with "
+        f"{best['params']}, saved to {output}"
+    )
+    return 0
+
+
+def worker(args: argparse.Namespace) -> int:
+    """Evaluate the tasks of a coordinator until it stops.
+
+    Args:
+        args (argparse.Namespace): the arguments of the worker subcommand.
+
+    Returns:
+        int: the exit code of the subcommand.
+    """
+    from src import distributed as dist
+    authkey = os.environ.get(dist.AUTHKEY_VARIABLE)
+    if not authkey:
+        print(f"The {dist.AUTHKEY_VARIABLE} variable printed by the "
+              f"coordinator has to be set.")
+        return 1
+    try:
+        evaluated = dist.run_worker(
+            dist.parse_address(args.address),
+            authkey.encode("utf-8"),
+            connect_timeout=args.connect_timeout
+        )
+    except (dist.AuthenticationError, OSError, ValueError) as error:
+        print(error)
+        return 1
+    print(f"{evaluated} tasks evaluated")
+    return 0
+
+
+# function of each subcommand
+COMMANDS = {
+    "train": train,
+    "predict": predict,
+    "eda": eda,
+    "validate": validate,
+    "search": search,
+    "compare": compare,
+    "train-chunked": train_chunked,
+    "coordinator": coordinator,
+    "worker": worker
+}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Parse the arguments and run the subcommand given.
+
+    Args:
+        argv (List[str]): the arguments, by default the ones of the process.
+
+    Returns:
+        int: the exit code of the subcommand.
+    """
+    argv = sys.argv[1:] if argv is None else list(argv)
+    # "python main.py <max_leaf>" keeps training as before the subcommands
+    if argv and argv[0] not in COMMANDS and not argv[0].startswith("-"):
+        argv = ["train", *argv]
+    args = parser.parse_args(argv)
+    init_logging(LOG_FILES[args.command])
+    if getattr(args, "metrics", None):
+        instr.configure(
+            args.metrics, args.profile, args.profile_dir,
+            command=args.command,
+            run=f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+        )
+    return COMMANDS[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
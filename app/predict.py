@@ -0,0 +1,23 @@
+"""Predictions module
+
+This script generates the predictions of a csv file using a model and its
+fitted pipeline previously saved by the main module, so no training is
+performed. The numpy arrays of the saved objects are memory-mapped, which
+only reduces the load time: the trees of the forest are copied into the
+buffers of scikit-learn when they are loaded, so each scoring process keeps
+its own copy of them.
+
+To execute this Python script just open a terminal and type the command:
+python predict.py [input_csv] [output_csv] [--version version]
+[--chunksize rows] [--engine c|pyarrow].
+
+It is the same as the predict subcommand of the main module.
+"""
+# importing needed libraries
+import sys
+
+# importing needed classes and modules
+from main import main
+
+if __name__ == "__main__":
+    sys.exit(main(["predict", *sys.argv[1:]]))
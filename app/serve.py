@@ -0,0 +1,85 @@
+"""Scoring service module
+
+This script starts a local HTTP service which scores listings with a model
+and its fitted pipeline previously saved by the main module. Both objects
+are loaded once, and the listings of concurrent requests are grouped into
+micro-batches before calling the model.
+
+To execute this Python script just open a terminal and type the command:
+python serve.py [--port port] [--max-batch-size rows] [--max-wait-ms ms]
+[--version version].
+
+Then a listing can be scored with:
+curl -X POST localhost:8000/predict -d '{"LotArea": 8450, ...}'
+"""
+# importing needed libraries
+import argparse
+import logging
+
+# importing needed classes and modules
+from config import config
+from src import artifacts as art
+from src.service import make_server
+
+parser = argparse.ArgumentParser(
+    prog="serve",
+    description="start a local service to score listings")
+parser.add_argument(
+    '--host', default=None,
+    help="address to listen on (overrides the SERVICE section)")
+parser.add_argument(
+    '--port', type=int, default=None,
+    help="port to listen on (overrides the SERVICE section)")
+parser.add_argument(
+    '--max-batch-size', type=int, default=None,
+    help="maximum listings of a batch (overrides the SERVICE section)")
+parser.add_argument(
+    '--max-wait-ms', type=float, default=None,
+    help="maximum time a batch waits for more listings "
+         "(overrides the SERVICE section)")
+parser.add_argument(
+    '--version', default=None,
+    help="version of the saved model, by default the last one")
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    logging.basicConfig(
+                        filename='logs/serve.log',
+                        level=logging.INFO,
+                        filemode='w',
+                        format='%(name)s - %(levelname)s - %(message)s'
+                    )
+    config_values = config.ConfigValues()
+    model, fitted_pipeline, metadata = art.load_artifacts(
+        config_values.path_artifacts(), args.version
+    )
+    max_wait_ms = (
+        config_values.max_wait_ms()
+        if args.max_wait_ms is None else args.max_wait_ms
+    )
+    server = make_server(
+        model,
+        fitted_pipeline,
+        host=args.host or config_values.service_host(),
+        port=(
+            config_values.service_port()
+            if args.port is None else args.port
+        ),
+        max_batch_size=(
+            config_values.max_batch_size()
+            if args.max_batch_size is None else args.max_batch_size
+        ),
+        max_wait=max_wait_ms / 1000,
+        version=metadata["version"]
+    )
+    logging.info("Serving version %s on %s:%s.", metadata["version"],
+                 *server.server_address)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logging.info("Stopping the service.")
+    finally:
+        server.shutdown()
+        server.server_close()
+        server.batcher.stop()
@@ -0,0 +1,159 @@
+"""Model artifacts
+
+This script allows the user to save a trained model together with its fitted
+pipeline into a versioned folder, and to load them back in order to generate
+predictions without training the model again.
+
+Each version is saved under its own folder, named after the moment it was
+created, and a LATEST file points to the last one. The objects are stored
+with joblib without compression, so their numpy arrays can be memory-mapped
+when they are loaded.
+
+It uses joblib for the serialization of the objects and json for the
+metadata of each version.
+
+This script can also be imported as a module.
+"""
+# importing needed libraries
+import copy
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+import joblib
+
+# names of the files of each version
+MODEL_FILE = "model.joblib"
+PIPELINE_FILE = "pipeline.joblib"
+METADATA_FILE = "metadata.json"
+LATEST_FILE = "LATEST"
+
+
+def save_artifacts(
+            model: Any,
+            fitted_pipeline: Any,
+            folder: str,
+            metadata: Optional[Dict[str, Any]] = None
+        ) -> str:
+    """Save a trained model and its fitted pipeline as a new version.
+
+    Args:
+        model (Any): the trained model.
+        fitted_pipeline (Any): the pipeline fitted with the train dataset.
+        folder (str): the relative path of the folder of all the versions.
+        metadata (Dict[str, Any]): additional values to describe the version.
+
+    Output:
+        a new folder with the model, the pipeline and the metadata.
+
+    Returns:
+        version (str): the name of the new version.
+    """
+    # scikit-learn is imported here, importing it costs more than the rest
+    # of the module and only the training needs its version
+    import sklearn  # pylint: disable=import-outside-toplevel
+    created = datetime.now(timezone.utc)
+    version = created.strftime("%Y%m%dT%H%M%S%fZ")
+    version_folder = os.path.join(folder, version)
+    os.makedirs(version_folder)
+    joblib.dump(model, os.path.join(version_folder, MODEL_FILE))
+    # the saved pipeline scores the dataframes of its callers, so it never
+    # runs in the inplace mode of the training run
+    if getattr(fitted_pipeline, "inplace", False):
+        fitted_pipeline = copy.copy(fitted_pipeline)
+        fitted_pipeline.inplace = False
+    joblib.dump(fitted_pipeline, os.path.join(version_folder, PIPELINE_FILE))
+    # a model trained with the feature matrix has no feature names, which
+    # are kept by the pipeline instead
+    features = getattr(model, "feature_names_in_", None)
+    if features is None:
+        features = getattr(fitted_pipeline, "feature_names_", None)
+    features = [] if features is None else list(features)
+    version_metadata = {
+        "version": version,
+        "created": created.isoformat(),
+        "sklearn": sklearn.__version__,
+        "model": type(model).__name__,
+        "features": features,
+    }
+    version_metadata.update(metadata or {})
+    with open(
+                os.path.join(version_folder, METADATA_FILE),
+                "w", encoding="utf-8"
+            ) as metadata_json:
+        json.dump(version_metadata, metadata_json, indent=4, default=str)
+    # the pointer is replaced atomically so readers never see a partial file
+    latest_tmp = os.path.join(folder, LATEST_FILE + ".tmp")
+    with open(latest_tmp, "w", encoding="utf-8") as latest:
+        latest.write(version)
+    os.replace(latest_tmp, os.path.join(folder, LATEST_FILE))
+    logging.info("Artifacts saved as version %s.", version)
+    return version
+
+
+def latest_version(folder: str) -> str:
+    """Read the name of the last saved version.
+
+    Args:
+        folder (str): the relative path of the folder of all the versions.
+
+    Returns:
+        str: the name of the last version.
+    """
+    with open(os.path.join(folder, LATEST_FILE), encoding="utf-8") as latest:
+        return latest.read().strip()
+
+
+def load_pipeline(
+            folder: str,
+            version: Optional[str] = None,
+            mmap_mode: Optional[str] = "r"
+        ) -> Any:
+    """Load only the fitted pipeline of a saved version, without the model.
+
+    Args:
+        folder (str): the relative path of the folder of all the versions.
+        version (str): the version to load, by default the last one.
+        mmap_mode (str): the joblib memory map mode of the numpy arrays, or
+        None to read them into memory.
+
+    Returns:
+        Any: the fitted pipeline of the version.
+    """
+    version = latest_version(folder) if version is None else version
+    return joblib.load(
+        os.path.join(folder, version, PIPELINE_FILE), mmap_mode=mmap_mode
+    )
+
+
+def load_artifacts(
+            folder: str,
+            version: Optional[str] = None,
+            mmap_mode: Optional[str] = "r"
+        ) -> Tuple[Any, Any, Dict[str, Any]]:
+    """Load a trained model and its fitted pipeline.
+
+    Args:
+        folder (str): the relative path of the folder of all the versions.
+        version (str): the version to load, by default the last one.
+        mmap_mode (str): the joblib memory map mode of the numpy arrays, or
+        None to read them into memory.
+
+    Returns:
+        Tuple[Any, Any, Dict[str, Any]]: the model, the fitted pipeline and
+        the metadata of the version.
+    """
+    version = latest_version(folder) if version is None else version
+    version_folder = os.path.join(folder, version)
+    model = joblib.load(
+        os.path.join(version_folder, MODEL_FILE), mmap_mode=mmap_mode
+    )
+    fitted_pipeline = load_pipeline(folder, version, mmap_mode)
+    with open(
+                os.path.join(version_folder, METADATA_FILE), encoding="utf-8"
+            ) as metadata_json:
+        metadata = json.load(metadata_json)
+    logging.info("Artifacts of version %s loaded.", version)
+    return model, fitted_pipeline, metadata
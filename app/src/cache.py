@@ -0,0 +1,230 @@
+"""Datasets cache
+
+This script implements the DatasetCache class, which stores dataframes and
+fitted objects on disk under a key computed from the content of the files
+they were generated from and the parameters used to generate them. So a
+dataset is parsed, or processed by the pipeline, only when one of its
+source files changes.
+
+The dataframes are stored in the Feather columnar format, read back with
+memory mapping, when pyarrow is installed, and as pickle files otherwise.
+When the size of the cache exceeds its limit, the entries used least
+recently are removed.
+
+It uses hashlib to compute the keys, pandas for data manipulation and
+joblib to store the fitted objects.
+
+To instantiate a new DatasetCache class is as follows:
+example_of_cache = DatasetCache("cache", max_size_mb=2048)
+
+This script can also be imported as a module.
+"""
+# importing needed libraries
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import joblib
+import pandas as pd
+
+# pyarrow is an optional dependency, without it the dataframes are pickled
+try:
+    from pyarrow import feather
+except ImportError:
+    feather = None
+
+# version of the format of the cached entries, it has to be increased when
+# the pipeline changes the way it processes the data
+CACHE_VERSION = "5"
+
+# size of the blocks used to hash the content of the files
+HASH_BLOCK_SIZE = 1 << 20
+
+
+# digests of the files already hashed by the process, keyed by their path,
+# modification time and size
+__FILE_DIGESTS: Dict[Tuple[str, int, int], str] = {}
+
+
+def hash_file(path: str) -> str:
+    """Compute a hash of the content of a file, reusing the one computed
+        before while the file is not modified.
+
+    Args:
+        path (str): the path of the file.
+
+    Returns:
+        str: the hexadecimal digest of the content of the file.
+    """
+    status = os.stat(path)
+    file_id = (os.path.abspath(path), status.st_mtime_ns, status.st_size)
+    if file_id not in __FILE_DIGESTS:
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as source:
+            for block in iter(lambda: source.read(HASH_BLOCK_SIZE), b""):
+                digest.update(block)
+        __FILE_DIGESTS[file_id] = digest.hexdigest()
+    return __FILE_DIGESTS[file_id]
+
+
+class DatasetCache:
+    """The DatasetCache class stores dataframes and fitted objects on disk
+        under keys computed from the content of their source files.
+    """
+    def __init__(
+                self,
+                folder: str,
+                max_size_mb: float = 2048,
+                enabled: bool = True,
+                refresh: bool = False
+            ):
+        """Store the location and the rules of the cache.
+
+        Args:
+            folder (str): the relative path of the folder of the cache.
+            max_size_mb (float): the maximum size of the cache in megabytes.
+            enabled (bool): whether the cache is used at all.
+            refresh (bool): whether the entries are always generated again
+            and replaced, instead of being read.
+        """
+        self.folder = folder
+        self.max_size = max_size_mb * 1e6
+        self.enabled = enabled
+        self.refresh = refresh
+        self.columnar = feather is not None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(paths: List[str], params: Optional[Dict[str, Any]] = None) -> str:
+        """Compute the key of an entry.
+
+        Args:
+            paths (List[str]): the source files of the entry.
+            params (Dict[str, Any]): the parameters used to generate it.
+
+        Returns:
+            str: the key of the entry.
+        """
+        described = json.dumps(params or {}, sort_keys=True, default=str)
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(CACHE_VERSION.encode("utf-8"))
+        for path in paths:
+            digest.update(hash_file(path).encode("utf-8"))
+        digest.update(described.encode("utf-8"))
+        return digest.hexdigest()
+
+    def __path(self, key: str, kind: str) -> str:
+        """Build the path of the file of an entry.
+
+        Args:
+            key (str): the key of the entry.
+            kind (str): the kind of entry, "frame" or "object".
+
+        Returns:
+            str: the path of the file.
+        """
+        if kind == "object":
+            extension = "joblib"
+        else:
+            extension = "feather" if self.columnar else "pkl"
+        return os.path.join(self.folder, f"{key}.{extension}")
+
+    def __hit(self, path: str) -> bool:
+        """Check whether an entry can be read, and mark it as recently used.
+
+        Args:
+            path (str): the path of the file of the entry.
+
+        Returns:
+            bool: True if the entry exists and it has to be read.
+        """
+        if not self.enabled or self.refresh or not os.path.exists(path):
+            self.misses += 1
+            return False
+        os.utime(path)
+        self.hits += 1
+        return True
+
+    def get_frame(self, key: str) -> Optional[pd.DataFrame]:
+        """Read a dataframe from the cache.
+
+        Args:
+            key (str): the key of the entry.
+
+        Returns:
+            pd.DataFrame: the cached dataframe, or None if it is not cached.
+        """
+        path = self.__path(key, "frame")
+        if not self.__hit(path):
+            return None
+        if self.columnar:
+            return feather.read_table(path, memory_map=True).to_pandas()
+        return pd.read_pickle(path)
+
+    def put_frame(self, key: str, data: pd.DataFrame):
+        """Store a dataframe in the cache.
+
+        Args:
+            key (str): the key of the entry.
+            data (pd.DataFrame): the dataframe, with a default index.
+        """
+        if not self.enabled:
+            return
+        path = self.__path(key, "frame")
+        os.makedirs(self.folder, exist_ok=True)
+        if self.columnar:
+            data.to_feather(path + ".tmp")
+        else:
+            data.to_pickle(path + ".tmp")
+        os.replace(path + ".tmp", path)
+        self.evict()
+
+    def get_object(self, key: str) -> Any:
+        """Read a fitted object from the cache.
+
+        Args:
+            key (str): the key of the entry.
+
+        Returns:
+            Any: the cached object, or None if it is not cached.
+        """
+        path = self.__path(key, "object")
+        if not self.__hit(path):
+            return None
+        return joblib.load(path)
+
+    def put_object(self, key: str, value: Any):
+        """Store a fitted object in the cache.
+
+        Args:
+            key (str): the key of the entry.
+            value (Any): the object.
+        """
+        if not self.enabled:
+            return
+        path = self.__path(key, "object")
+        os.makedirs(self.folder, exist_ok=True)
+        joblib.dump(value, path + ".tmp")
+        os.replace(path + ".tmp", path)
+        self.evict()
+
+    def evict(self):
+        """Remove the entries used least recently until the size of the
+            cache is below its limit.
+        """
+        if not os.path.isdir(self.folder):
+            return
+        entries = [
+            entry for entry in os.scandir(self.folder)
+            if entry.is_file() and not entry.name.endswith(".tmp")
+        ]
+        total = sum(entry.stat().st_size for entry in entries)
+        for entry in sorted(entries, key=lambda item: item.stat().st_mtime):
+            if total <= self.max_size:
+                break
+            total -= entry.stat().st_size
+            os.remove(entry.path)
+            logging.info("Cache entry %s evicted.", entry.name)
@@ -3,23 +3,32 @@
 This script allows the user to fill NA values by two functions.
 The first one allows to fill NA values from desired variables using
 an specific value. The second one fills all NA values on a given
-datafram based on the data type of each column. Both functions
-receives a dataframe as parameter and uses the pandas library for
-data manipulation.
+datafram based on the data type of each column, either computing the fill
+values from the dataframe or reusing precomputed ones. Both functions
+receives a dataframe as parameter and uses the pandas and numpy libraries
+for data manipulation.
+
+Every function that fills a dataframe accepts an inplace flag. When it is
+set, the dataframe given is used as the working buffer and mutated, instead
+of working on a copy.
 
 This script can also be imported as a module.
 """
 
 # importing needed libraries
-from typing import Any, List
+from typing import Any, Dict, List, Optional
 
 import pandas as pd
 
+# importing needed modules
+from src.incremental import FillStatistics
+
 
 def custom_fill_na_values(
             data: pd.DataFrame,
             variables: List[str],
-            new_value: Any
+            new_value: Any,
+            inplace: bool = False
         ):
     """Fill 'NA' values for a given list of variables on a dataframe.
 
@@ -27,37 +36,112 @@ def custom_fill_na_values(
         data (pd.DataFrame): the dataframe to be filled.
         variables (List[str]): the variables desired to be filled.
         new_value (Any): the value to be used to fill.
+        inplace (bool): whether to fill the dataframe given instead of
+        a copy.
 
     Returns:
         data_filled (pd.DataFrame): the resulting dataframe after filling
         the custom variables with the given value.
     """
-    data_filled = data.copy()
-    # for each of the given variables, fill the NA values with the
-    # new_value proposed
+    data_filled = data if inplace else data.copy()
+    # categorical columns need the new value as one of their categories,
+    # which are kept sorted as the ones inferred when reading the data
     for variable in variables:
-        data_filled[variable].fillna(new_value, inplace=True)
+        column = data_filled[variable]
+        if (
+            isinstance(column.dtype, pd.CategoricalDtype)
+            and new_value not in column.cat.categories
+        ):
+            data_filled[variable] = column.cat.set_categories(
+                sorted([*column.cat.categories, new_value])
+            )
+    # fill the NA values of the given variables with the new_value proposed
+    data_filled.fillna(
+        {variable: new_value for variable in variables}, inplace=True
+    )
     return data_filled
 
 
-def fill_all_na_values(data: pd.DataFrame):
+def __fill_statistics(data: pd.DataFrame):
+    """Compute the fill value of each column and find the columns that have
+        at least one 'NA' value.
+
+    The means of the numerical columns are computed from their exact sums,
+    and the mode of each categorical column from the counts of its
+    factorized values, by the FillStatistics class, so they are identical
+    to the ones updated incrementally by new partitions of the data.
+
+    Args:
+        data (pd.DataFrame): the dataframe to learn the values from.
+
+    Returns:
+        Tuple[Dict[str, Any], List[str]]: the fill value of each column and
+        the columns with missing values.
+    """
+    statistics = FillStatistics().update(data)
+    missing = [
+        col for col, count in statistics.non_missing().items()
+        if count < len(data)
+    ]
+    return statistics.fill_values(), missing
+
+
+def compute_fill_values(data: pd.DataFrame):
+    """Compute the value used to fill the 'NA' values of each column by the
+        same rules of fill_all_na_values.
+
+    Args:
+        data (pd.DataFrame): the dataframe to learn the values from.
+
+    Returns:
+        fill_values (Dict[str, Any]): the mean of each numerical column and
+        the mode of each categorical column.
+    """
+    fill_values, _ = __fill_statistics(data)
+    return fill_values
+
+
+def fill_all_na_values(
+            data: pd.DataFrame,
+            inplace: bool = False,
+            fill_values: Optional[Dict[str, Any]] = None
+        ):
     """Main function to fill 'NA' values of a given dataframe by predifined rules.
 
+    Numerical columns are filled with their mean and categorical columns with
+    their mode, all in a single fillna call.
+
     Args:
         data (pd.DataFrame): the dataframe to be filled.
+        inplace (bool): whether to fill the dataframe given instead of
+        a copy.
+        fill_values (Dict[str, Any]): precomputed values to fill each column,
+        as returned by compute_fill_values. When given, no statistic is
+        computed from the dataframe.
 
     Returns:
         data_imputed (pd.DataFrame): the resulting dataframe after filling
         the 'NA' values of all columns.
     """
-    data_imputed = data.copy()
-    for col in data_imputed.columns:
-        # for each variable of the dataset, check whether is a numerical or
-        # categorical variable.
-        if data_imputed[col].dtype in ("float64", "int64"):
-            #  For numerical variables, impute the NA with the mean.
-            data_imputed[col].fillna(data_imputed[col].mean(), inplace=True)
-        else:
-            # For categorical variables, impute the NA with the mode.
-            data_imputed[col].fillna(data_imputed[col].mode()[0], inplace=True)
+    if fill_values is None:
+        # only the columns with missing values need to be filled
+        statistics, missing = __fill_statistics(data)
+        fill_values = {col: statistics[col] for col in missing}
+    else:
+        missing = data.columns[data.isna().any().to_numpy()]
+        fill_values = {
+            col: fill_values[col] for col in missing if col in fill_values
+        }
+    data_imputed = data if inplace else data.copy()
+    # a batch read with the category type may not contain the value learned
+    # from the train dataset among its categories
+    for col, value in fill_values.items():
+        column = data_imputed[col]
+        if (
+            isinstance(column.dtype, pd.CategoricalDtype)
+            and pd.notna(value)
+            and value not in column.cat.categories
+        ):
+            data_imputed[col] = column.cat.add_categories([value])
+    data_imputed.fillna(fill_values, inplace=True)
     return data_imputed
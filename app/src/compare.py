@@ -0,0 +1,191 @@
+"""Model comparison
+
+This script implements the comparison of the models of the registry of the
+training module on the same features. The feature matrix is processed once
+and copied to shared memory, where the workers of a process pool read it
+without copying it, and each worker trains and evaluates a whole model, so
+the models are compared in parallel.
+
+Each model is evaluated with cross validation, and then trained with all
+the rows to measure what decides which model is shipped besides its score:
+the time it takes to train, the latency of its predictions per 1000 rows
+and the size of the model once serialized, as it is saved as an artifact.
+The results are written to a comparison.json file.
+
+It uses scikit-learn for the machine learning models, numpy and the shared
+memory helpers of the parallel module to share the data between the
+workers, and joblib to serialize the models.
+
+To compare two models is as follows:
+results = compare_models(X, y, ["random_forest", "ridge"])
+
+This script can also be imported as a module.
+"""
+# importing needed libraries
+import io
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.metrics import r2_score
+from sklearn.model_selection import KFold
+
+# importing needed modules
+from src import training as trn
+from src.parallel import SHARED, attach_arrays, release_arrays, share_arrays
+
+# rows of each batch used to measure the latency of the predictions
+LATENCY_ROWS = 1000
+
+# times each batch is predicted, the fastest one is reported
+LATENCY_REPEAT = 5
+
+def predict_latency(model: Any, X: np.ndarray) -> float:
+    """Measure the time a trained model takes to predict 1000 rows.
+
+    Args:
+        model (Any): the trained model.
+        X (np.ndarray): the input variables, of which the first 1000 rows
+        are predicted.
+
+    Returns:
+        float: the fastest time of the repetitions, in milliseconds per
+        1000 rows.
+    """
+    batch = X[:LATENCY_ROWS]
+    fastest = float("inf")
+    for _ in range(LATENCY_REPEAT):
+        start = time.perf_counter()
+        model.predict(batch)
+        fastest = min(fastest, time.perf_counter() - start)
+    return fastest * 1000 * LATENCY_ROWS / len(batch)
+
+
+def serialized_size(model: Any) -> int:
+    """Measure the size of a model saved as an artifact.
+
+    Args:
+        model (Any): the trained model.
+
+    Returns:
+        int: the bytes of the model serialized with joblib.
+    """
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+    return buffer.tell()
+
+
+def evaluate_model(name: str, folds: int, seed: int = 0) -> Dict[str, Any]:
+    """Evaluate a model of the registry with the shared arrays.
+
+    Args:
+        name (str): the name of the model in the registry.
+        folds (int): the number of folds of the cross validation.
+        seed (int): the seed of the model.
+
+    Returns:
+        Dict[str, Any]: the score of each fold, their mean and standard
+        deviation, the time to train the model with all the rows, the
+        latency of its predictions and its serialized size.
+    """
+    X, y = SHARED["X"], SHARED["y"]
+    scores = []
+    for train_index, test_index in KFold(folds).split(X):
+        model = trn.create_model(name, n_jobs=1, seed=seed)
+        model.fit(X[train_index], y[train_index])
+        scores.append(float(r2_score(y[test_index], model.predict(
+            X[test_index]
+        ))))
+    model = trn.create_model(name, n_jobs=1, seed=seed)
+    start = time.perf_counter()
+    model.fit(X, y)
+    fit_time = time.perf_counter() - start
+    return {
+        "model": name,
+        "folds": folds,
+        "scores": scores,
+        "mean_score": float(np.mean(scores)),
+        "std_score": float(np.std(scores)),
+        "fit_time_s": round(fit_time, 6),
+        "predict_ms_per_1k": round(predict_latency(model, X), 6),
+        "size_bytes": serialized_size(model),
+        "pid": os.getpid()
+    }
+
+
+def compare_models(
+            X: pd.DataFrame,
+            y: pd.Series,
+            names: List[str],
+            folds: int = 5,
+            n_jobs: int = -1,
+            output: Optional[str] = None,
+            seed: int = 0
+        ) -> List[Dict[str, Any]]:
+    """Evaluate the models of the registry given, in parallel.
+
+    Args:
+        X (pd.DataFrame): the input variables.
+        y (pd.Series): the output variable.
+        names (List[str]): the names of the models in the registry.
+        folds (int): the number of folds of each cross validation.
+        n_jobs (int): the number of workers, -1 for all the cores.
+        output (str): the folder of the comparison.json file, or None to not
+        write it.
+        seed (int): the seed of the models.
+
+    Raises:
+        ValueError: if a model is not in the registry.
+
+    Returns:
+        List[Dict[str, Any]]: the results of each model, in the order given.
+    """
+    unknown = [name for name in names if name not in trn.MODELS]
+    if unknown:
+        logging.error("The models %s are not in the registry.", unknown)
+        raise ValueError(
+            f"Unknown models {unknown}, expected some of {sorted(trn.MODELS)}."
+        )
+    names = list(dict.fromkeys(names))
+    # the models read float32 like the forests do internally
+    blocks, arrays = share_arrays({
+        "X": np.ascontiguousarray(X.to_numpy(dtype=np.float32)),
+        "y": np.asarray(y, dtype=np.float64)
+    })
+    workers = min(trn.resolve_workers(n_jobs), len(names))
+    logging.info("Comparing %s models with %s workers.", len(names), workers)
+    results: Dict[str, Dict[str, Any]] = {}
+    try:
+        with ProcessPoolExecutor(
+                    workers, initializer=attach_arrays, initargs=(arrays,)
+                ) as pool:
+            futures = [
+                pool.submit(evaluate_model, name, folds, seed)
+                for name in names
+            ]
+            for future in as_completed(futures):
+                result = future.result()
+                results[result["model"]] = result
+                logging.info(
+                    "%s: R2 %.4f, fit %.3fs, predict %.3fms per 1k rows, "
+                    "%s bytes.", result["model"], result["mean_score"],
+                    result["fit_time_s"], result["predict_ms_per_1k"],
+                    result["size_bytes"]
+                )
+    finally:
+        release_arrays(blocks)
+    comparison = [results[name] for name in names]
+    if output is not None:
+        os.makedirs(output, exist_ok=True)
+        with open(
+                    os.path.join(output, "comparison.json"), "w",
+                    encoding="utf-8"
+                ) as comparison_json:
+            json.dump(comparison, comparison_json, indent=2)
+    return comparison
@@ -0,0 +1,184 @@
+"""Leakage-free cross validation
+
+This script implements a cross validation in which the values of the
+pipeline are learned again in every fold, so the rows held out by a fold
+are filled and encoded only with the values learned from the rows the model
+is trained with, and the scores are not inflated by the held-out rows.
+
+Instead of fitting the pipeline again in every fold, the statistics of the
+rows held out by each fold (the counts and exact sums of the numerical
+variables and the counts of the values of the categorical ones) are computed
+once, in a single pass over the dataset, and merged into the statistics of
+the whole dataset. The statistics of the training rows of a fold are the
+ones of the whole dataset minus the ones of its held-out rows, derived in
+O(columns), and give exactly the values of a pipeline fitted with those
+rows. The held-out values of the label encoded variables which are not seen
+in the training rows are filled like the missing values.
+
+The feature matrix of each fold is generated when the pool of workers asks
+for it, and the forests of the folds are trained and scored in parallel,
+splitting the workers between the folds and the trees like the cross
+validation of the training module.
+
+It uses scikit-learn for the machine learning model and the folds, and
+joblib to manage the pool of workers.
+
+To evaluate a model with 10 folds is as follows:
+scores = cross_validate_pipeline(model, fitted_pipeline, data, y, folds=10)
+
+This script can also be imported as a module.
+"""
+# importing needed libraries
+import logging
+import time
+from typing import Any, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed, parallel_backend
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import r2_score
+from sklearn.model_selection import KFold
+
+# importing needed modules
+from src import instrumentation as instr
+from src import training as trn
+from src.incremental import FillStatistics
+
+
+def fold_statistics(
+            fitted_pipeline: Any,
+            data: pd.DataFrame,
+            splits: List[Tuple[np.ndarray, np.ndarray]]
+        ) -> Tuple[FillStatistics, List[FillStatistics]]:
+    """Compute the statistics of the rows held out by each fold and the
+        statistics of the whole dataset.
+
+    Args:
+        fitted_pipeline (Any): the pipeline fitted with the train dataset.
+        data (pd.DataFrame): the train dataset, before being processed.
+        splits (List[Tuple[np.ndarray, np.ndarray]]): the training and the
+        held-out rows of each fold, where every row is held out once.
+
+    Returns:
+        Tuple[FillStatistics, List[FillStatistics]]: the statistics of the
+        whole dataset and the ones of the held-out rows of each fold.
+    """
+    held_out = [
+        fitted_pipeline.compute_statistics(data.iloc[test_index])
+        for _, test_index in splits
+    ]
+    total = FillStatistics()
+    for statistics in held_out:
+        total.merge(statistics)
+    return total, held_out
+
+
+def fold_matrices(
+            fitted_pipeline: Any,
+            data: pd.DataFrame,
+            y: np.ndarray,
+            splits: List[Tuple[np.ndarray, np.ndarray]]
+        ) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+    """Process the dataset with the values learned by each fold.
+
+    Args:
+        fitted_pipeline (Any): the pipeline fitted with the train dataset.
+        data (pd.DataFrame): the train dataset, before being processed.
+        y (np.ndarray): the output variable.
+        splits (List[Tuple[np.ndarray, np.ndarray]]): the training and the
+        held-out rows of each fold.
+
+    Yields:
+        Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: the input
+        and the output variables of the training rows and of the held-out
+        rows of each fold.
+    """
+    total, held_out = fold_statistics(fitted_pipeline, data, splits)
+    for fold, (train_index, test_index) in enumerate(splits):
+        with instr.stage("fold_matrix", data, fold=fold) as current:
+            fold_pipeline = fitted_pipeline.with_statistics(
+                total.copy().subtract(held_out[fold])
+            )
+            X = current.output(fold_pipeline.transform_matrix(data))
+        yield X[train_index], y[train_index], X[test_index], y[test_index]
+
+
+def evaluate_fold(
+            model: RandomForestRegressor,
+            X_train: np.ndarray,
+            y_train: np.ndarray,
+            X_test: np.ndarray,
+            y_test: np.ndarray
+        ) -> Tuple[float, float, float]:
+    """Train a model with the training rows of a fold and score it with
+        the held-out rows.
+
+    Args:
+        model (RandomForestRegressor): the model to be trained.
+        X_train (np.ndarray): the input variables of the training rows.
+        y_train (np.ndarray): the output variable of the training rows.
+        X_test (np.ndarray): the input variables of the held-out rows.
+        y_test (np.ndarray): the output variable of the held-out rows.
+
+    Returns:
+        Tuple[float, float, float]: the time spent training and scoring,
+        and the R2 score.
+    """
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_time = time.perf_counter() - start
+    start = time.perf_counter()
+    score = float(r2_score(y_test, model.predict(X_test)))
+    return fit_time, time.perf_counter() - start, score
+
+
+def cross_validate_pipeline(
+            model: RandomForestRegressor,
+            fitted_pipeline: Any,
+            data: pd.DataFrame,
+            y: np.ndarray,
+            folds: int = 10,
+            n_jobs: int = 1,
+            backend: str = "loky"
+        ) -> np.ndarray:
+    """Evaluate a model with cross validation, learning the values of the
+        pipeline with the training rows of each fold.
+
+    Args:
+        model (RandomForestRegressor): the model to be evaluated.
+        fitted_pipeline (Any): the pipeline fitted with the train dataset,
+        whose encoders, interactions and features are reused.
+        data (pd.DataFrame): the train dataset, before being processed.
+        y (np.ndarray): the output variable.
+        folds (int): the number of folds.
+        n_jobs (int): the total number of workers.
+        backend (str): the pool of workers used to run the folds, one of
+        threads, processes or loky.
+
+    Returns:
+        np.ndarray: the score of each fold.
+    """
+    # the same folds the cross validation of the training module uses
+    splits = list(KFold(folds).split(data))
+    folds_jobs, trees_jobs = trn.split_workers(n_jobs, folds)
+    fold_model = clone(model).set_params(n_jobs=trees_jobs)
+    logging.info(
+        "Leakage-free cross validation with %s folds in parallel and %s "
+        "workers per forest using the %s backend.",
+        folds_jobs, trees_jobs, backend
+    )
+    with parallel_backend(trn.BACKENDS[backend], n_jobs=folds_jobs):
+        results = Parallel(n_jobs=folds_jobs)(
+            delayed(evaluate_fold)(clone(fold_model), *matrices)
+            for matrices in fold_matrices(
+                fitted_pipeline, data, np.asarray(y), splits
+            )
+        )
+    for fold, (fit_time, score_time, score) in enumerate(results):
+        logging.info(
+            "Fold %s: fit %.3fs, score %.3fs, R2 %.4f.",
+            fold, fit_time, score_time, score
+        )
+    return np.array([score for _, _, score in results])
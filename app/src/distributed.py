@@ -0,0 +1,524 @@
+"""Distributed trials
+
+This script implements the evaluation of the candidates of a grid of
+parameters, or of the folds of a single candidate, across several hosts.
+A Coordinator listens on a TCP port and each worker, started with the
+run_worker function on any host which reaches it, connects to it. The
+feature matrix is shipped once to each worker when it connects, as a
+compressed blob or as the path of a file on a shared filesystem, and then
+the coordinator hands out the tasks one by one: each task is the training
+of a forest with the training rows of a fold and its score with the
+held-out rows, so many workers evaluate the folds of the same candidate.
+
+When the connection of a worker breaks, because the process died or its
+host went down, or when it does not answer a task in time, the task it was
+evaluating is handed out again to the next idle worker. The scores of the
+folds of each candidate are gathered into a trial, and the trials are
+written to a trials.jsonl file and the best one to a best.json file, like
+the ones of the search by successive halving.
+
+The connections are authenticated with a shared key, as the messages are
+pickled, so only the workers started with the key of the coordinator can
+connect to it. Several workers can run on localhost to test the whole
+exchange on a single machine.
+
+It uses the multiprocessing.connection module of the standard library for
+the messages, numpy to ship the arrays and scikit-learn for the machine
+learning model.
+
+To evaluate a grid with the workers which connect to port 6000 is as follows:
+trials = distributed_search(X, y, candidates, ("0.0.0.0", 6000), authkey)
+and to start a worker on another host:
+run_worker(("coordinator-host", 6000), authkey)
+
+This script can also be imported as a module.
+"""
+# importing needed libraries
+import io
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import r2_score
+from sklearn.model_selection import KFold
+
+# importing needed modules
+from src import training as trn
+
+# environment variable with the key shared by the coordinator and workers
+AUTHKEY_VARIABLE = "HOUSE_PRICING_AUTHKEY"
+
+# seconds between the attempts of a worker to reach the coordinator
+RETRY_INTERVAL = 0.5
+
+
+def parse_address(address: str, default_port: int = 6000) -> Tuple[str, int]:
+    """Split an address given as host:port.
+
+    Args:
+        address (str): the address, like 10.0.0.5:6000 or 10.0.0.5.
+        default_port (int): the port used when the address has none.
+
+    Raises:
+        ValueError: if the port is not a number.
+
+    Returns:
+        Tuple[str, int]: the host and the port.
+    """
+    host, _, port = address.rpartition(":")
+    if not host:
+        return port, default_port
+    try:
+        return host, int(port)
+    except ValueError as error:
+        logging.error("The address %s is not valid.", address)
+        raise ValueError(f"Expected host:port, got {address}.") from error
+
+
+def pack_dataset(X: np.ndarray, y: np.ndarray) -> bytes:
+    """Compress the arrays shipped to the workers.
+
+    Args:
+        X (np.ndarray): the feature matrix.
+        y (np.ndarray): the output variable.
+
+    Returns:
+        bytes: the arrays in the compressed npz format.
+    """
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, X=X, y=y)
+    return buffer.getvalue()
+
+
+def unpack_dataset(
+            payload: Tuple[str, Any]
+        ) -> Tuple[np.ndarray, np.ndarray]:
+    """Read the arrays shipped by the coordinator.
+
+    Args:
+        payload (Tuple[str, Any]): ("blob", the compressed arrays) or
+        ("path", the path of the npz file on a shared filesystem).
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: the feature matrix and the output
+        variable.
+    """
+    kind, content = payload
+    source = io.BytesIO(content) if kind == "blob" else content
+    with np.load(source) as arrays:
+        return arrays["X"], arrays["y"]
+
+
+def fold_tasks(
+            candidates: List[Dict[str, Any]],
+            folds: int,
+            seed: int = 0
+        ) -> List[Dict[str, Any]]:
+    """Split the evaluation of the candidates into a task per fold.
+
+    Args:
+        candidates (List[Dict[str, Any]]): the parameters of each candidate.
+        folds (int): the number of folds of the cross validation.
+        seed (int): the seed of the forests.
+
+    Returns:
+        List[Dict[str, Any]]: the candidate, the parameters and the fold of
+        each task.
+    """
+    return [
+        {
+            "candidate": number,
+            "params": params,
+            "fold": fold,
+            "folds": folds,
+            "seed": seed
+        }
+        for number, params in enumerate(candidates)
+        for fold in range(folds)
+    ]
+
+
+def evaluate_task(
+            X: np.ndarray,
+            y: np.ndarray,
+            task: Dict[str, Any]
+        ) -> Dict[str, Any]:
+    """Train a forest with the training rows of a fold and score it with
+        the held-out rows.
+
+    Args:
+        X (np.ndarray): the feature matrix.
+        y (np.ndarray): the output variable.
+        task (Dict[str, Any]): the parameters, the fold, the number of folds
+        and the seed of the task.
+
+    Returns:
+        Dict[str, Any]: the score, the time spent and the worker of the task.
+    """
+    start = time.perf_counter()
+    train_index, test_index = list(
+        KFold(task["folds"]).split(X)
+    )[task["fold"]]
+    model = trn.build_model(n_jobs=1, **task["params"]).set_params(
+        random_state=task["seed"]
+    )
+    model.fit(X[train_index], y[train_index])
+    return {
+        "score": float(r2_score(y[test_index], model.predict(X[test_index]))),
+        "time_s": round(time.perf_counter() - start, 6),
+        "host": socket.gethostname(),
+        "pid": os.getpid()
+    }
+
+
+class Coordinator:
+    """The Coordinator class hands out tasks to the workers which connect to
+        it and gathers their results, handing out again the tasks of the
+        workers lost.
+    """
+    def __init__(
+                self,
+                X: np.ndarray,
+                y: np.ndarray,
+                tasks: List[Dict[str, Any]],
+                address: Tuple[str, int],
+                authkey: bytes,
+                data_path: Optional[str] = None,
+                task_timeout: Optional[float] = None
+            ):
+        """Listen on the address given and prepare the arrays shipped.
+
+        Args:
+            X (np.ndarray): the feature matrix.
+            y (np.ndarray): the output variable.
+            tasks (List[Dict[str, Any]]): the tasks evaluated by the workers.
+            address (Tuple[str, int]): the host and the port listened, port 0
+            for any free port.
+            authkey (bytes): the key shared with the workers.
+            data_path (str): a file on a filesystem shared with the workers
+            where the arrays are written, or None to send them to each
+            worker.
+            task_timeout (float): the seconds a worker has to answer a task
+            before it is considered lost, or None to wait while it is
+            connected.
+        """
+        self.tasks = tasks
+        self.task_timeout = task_timeout
+        if data_path is None:
+            self.payload = ("blob", pack_dataset(X, y))
+        else:
+            with open(data_path, "wb") as data_file:
+                data_file.write(pack_dataset(X, y))
+            self.payload = ("path", data_path)
+        self.listener = Listener(address, authkey=authkey)
+        self.address = self.listener.address
+        self.authkey = authkey
+        self.results: Dict[int, Dict[str, Any]] = {}
+        self.failures: Dict[int, Any] = {}
+        self.reassigned = 0
+        self.workers = 0
+        self.__pending = list(range(len(tasks)))
+        self.__condition = threading.Condition()
+        self.__closing = False
+
+    def __done(self) -> bool:
+        """Check whether every task has a result or failed.
+
+        Returns:
+            bool: True if no task is left.
+        """
+        return len(self.results) + len(self.failures) == len(self.tasks)
+
+    def __next_task(self) -> Optional[int]:
+        """Wait for a task to hand out.
+
+        Returns:
+            int: the index of the task, or None when every task finished.
+        """
+        with self.__condition:
+            while not self.__pending and not self.__done():
+                self.__condition.wait()
+            if self.__done():
+                return None
+            return self.__pending.pop(0)
+
+    def __finish(self, index: int, result: Any, failed: bool):
+        """Store the result of a task.
+
+        Args:
+            index (int): the index of the task.
+            result (Any): the result, or the error of the task.
+            failed (bool): whether the task raised an error.
+        """
+        with self.__condition:
+            if failed:
+                self.failures[index] = result
+            else:
+                self.results[index] = result
+            self.__condition.notify_all()
+
+    def __reassign(self, index: int):
+        """Put back the task of a worker lost, ahead of the other ones.
+
+        Args:
+            index (int): the index of the task.
+        """
+        with self.__condition:
+            self.reassigned += 1
+            self.__pending.insert(0, index)
+            self.__condition.notify_all()
+
+    def __serve_worker(self, connection: Connection):
+        """Ship the arrays to a worker and hand it out tasks until none is
+            left or the worker is lost.
+
+        Args:
+            connection (Connection): the connection of the worker.
+        """
+        index = None
+        worker = "unknown worker"
+        try:
+            _, host, pid = connection.recv()
+            worker = f"{host}:{pid}"
+            logging.info("Worker %s connected.", worker)
+            connection.send(self.payload)
+            while True:
+                index = self.__next_task()
+                if index is None:
+                    connection.send(("stop",))
+                    break
+                connection.send(("task", index, self.tasks[index]))
+                if self.task_timeout is not None and not connection.poll(
+                            self.task_timeout
+                        ):
+                    raise TimeoutError(f"no answer to task {index}")
+                kind, _, result = connection.recv()
+                self.__finish(index, result, kind == "error")
+                if kind == "error":
+                    logging.error("Task %s failed in %s: %s",
+                                  index, worker, result)
+                index = None
+        except (EOFError, OSError, TimeoutError) as error:
+            logging.warning("Worker %s lost: %r", worker, error)
+            if index is not None:
+                logging.warning("Task %s handed out again.", index)
+                self.__reassign(index)
+        finally:
+            connection.close()
+
+    def __accept(self):
+        """Accept the workers until the coordinator closes."""
+        while True:
+            try:
+                connection = self.listener.accept()
+            except (AuthenticationError, EOFError, OSError) as error:
+                # a worker which failed the authentication is ignored
+                if self.__closing:
+                    return
+                logging.warning("A connection was refused: %s", error)
+                continue
+            if self.__closing:
+                connection.close()
+                return
+            self.workers += 1
+            threading.Thread(
+                target=self.__serve_worker, args=(connection,), daemon=True
+            ).start()
+
+    def serve(self) -> List[Dict[str, Any]]:
+        """Hand out the tasks until every one has a result.
+
+        Raises:
+            RuntimeError: if a task raised an error in a worker.
+
+        Returns:
+            List[Dict[str, Any]]: the result of each task, in the order of the
+            tasks.
+        """
+        accepting = threading.Thread(target=self.__accept, daemon=True)
+        accepting.start()
+        with self.__condition:
+            while not self.__done():
+                self.__condition.wait()
+        # a last connection wakes up the thread blocked accepting workers
+        self.__closing = True
+        try:
+            Client(self.address, authkey=self.authkey).close()
+        except OSError:
+            pass
+        accepting.join()
+        self.listener.close()
+        logging.info(
+            "%s tasks evaluated by %s workers, %s handed out again.",
+            len(self.tasks), self.workers, self.reassigned
+        )
+        if self.failures:
+            logging.error("The tasks %s failed.", sorted(self.failures))
+            raise RuntimeError(
+                f"{len(self.failures)} tasks failed, the first one with "
+                f"{self.failures[min(self.failures)]}"
+            )
+        return [self.results[index] for index in range(len(self.tasks))]
+
+
+def run_worker(
+            address: Tuple[str, int],
+            authkey: bytes,
+            connect_timeout: float = 60.0
+        ) -> int:
+    """Connect to a coordinator and evaluate its tasks until it stops.
+
+    Args:
+        address (Tuple[str, int]): the host and the port of the coordinator.
+        authkey (bytes): the key shared with the coordinator.
+        connect_timeout (float): the seconds waiting for the coordinator to
+        listen.
+
+    Raises:
+        ConnectionRefusedError: if the coordinator was not reached in time.
+
+    Returns:
+        int: the number of tasks evaluated.
+    """
+    deadline = time.monotonic() + connect_timeout
+    while True:
+        try:
+            connection = Client(address, authkey=authkey)
+            break
+        except ConnectionRefusedError:
+            if time.monotonic() > deadline:
+                logging.error("The coordinator %s was not reached.", address)
+                raise
+            time.sleep(RETRY_INTERVAL)
+    evaluated = 0
+    with connection:
+        connection.send(("hello", socket.gethostname(), os.getpid()))
+        X, y = unpack_dataset(connection.recv())
+        logging.info("Dataset of %s rows received.", len(X))
+        while True:
+            try:
+                message = connection.recv()
+            except EOFError:
+                logging.warning("The coordinator closed the connection.")
+                break
+            if message[0] == "stop":
+                break
+            _, index, task = message
+            try:
+                connection.send(("result", index, evaluate_task(X, y, task)))
+            # the error is reported to the coordinator instead of killing
+            # the worker, so the task is not handed out again
+            except Exception as error:  # pylint: disable=broad-except
+                connection.send(("error", index, repr(error)))
+            evaluated += 1
+    logging.info("Worker stopped after %s tasks.", evaluated)
+    return evaluated
+
+
+def gather_trials(
+            candidates: List[Dict[str, Any]],
+            tasks: List[Dict[str, Any]],
+            results: List[Dict[str, Any]]
+        ) -> List[Dict[str, Any]]:
+    """Gather the scores of the folds of each candidate into a trial.
+
+    Args:
+        candidates (List[Dict[str, Any]]): the parameters of each candidate.
+        tasks (List[Dict[str, Any]]): the tasks of the folds.
+        results (List[Dict[str, Any]]): the result of each task.
+
+    Returns:
+        List[Dict[str, Any]]: the trial of each candidate, in their order.
+    """
+    folds: List[Dict[int, Dict[str, Any]]] = [{} for _ in candidates]
+    for task, result in zip(tasks, results):
+        folds[task["candidate"]][task["fold"]] = result
+    trials = []
+    for number, params in enumerate(candidates):
+        fold_results = [folds[number][fold] for fold in sorted(folds[number])]
+        scores = [result["score"] for result in fold_results]
+        trials.append({
+            "trial": number,
+            "params": params,
+            "folds": len(scores),
+            "scores": scores,
+            "mean_score": float(np.mean(scores)),
+            "std_score": float(np.std(scores)),
+            "time_s": round(sum(result["time_s"] for result in fold_results),
+                            6),
+            "workers": sorted({
+                f"{result['host']}:{result['pid']}" for result in fold_results
+            })
+        })
+    return trials
+
+
+def distributed_search(
+            X: pd.DataFrame,
+            y: pd.Series,
+            candidates: List[Dict[str, Any]],
+            address: Tuple[str, int],
+            authkey: bytes,
+            folds: int = 5,
+            data_path: Optional[str] = None,
+            task_timeout: Optional[float] = None,
+            output: Optional[str] = None,
+            seed: int = 0
+        ) -> List[Dict[str, Any]]:
+    """Evaluate every candidate with cross validation in the workers which
+        connect to the coordinator.
+
+    Args:
+        X (pd.DataFrame): the input variables.
+        y (pd.Series): the output variable.
+        candidates (List[Dict[str, Any]]): the parameters of each candidate.
+        address (Tuple[str, int]): the host and the port listened.
+        authkey (bytes): the key shared with the workers.
+        folds (int): the number of folds of each cross validation.
+        data_path (str): a file on a shared filesystem for the arrays, or
+        None to send them to each worker.
+        task_timeout (float): the seconds a worker has to answer a task.
+        output (str): the folder of the trials.jsonl and best.json files,
+        or None to not write them.
+        seed (int): the seed used to shuffle the rows and of the forests.
+
+    Returns:
+        List[Dict[str, Any]]: the trial of each candidate.
+    """
+    # the rows are shuffled once, like in the search by successive halving,
+    # and the forests read float32 like they do internally
+    order = np.random.default_rng(seed).permutation(len(X))
+    tasks = fold_tasks(candidates, folds, seed)
+    coordinator = Coordinator(
+        np.ascontiguousarray(X.to_numpy(dtype=np.float32)[order]),
+        np.asarray(y, dtype=np.float64)[order],
+        tasks, address, authkey, data_path, task_timeout
+    )
+    logging.info(
+        "Coordinator listening on %s with %s tasks.",
+        coordinator.address, len(tasks)
+    )
+    trials = gather_trials(candidates, tasks, coordinator.serve())
+    if output is not None:
+        os.makedirs(output, exist_ok=True)
+        with open(
+                    os.path.join(output, "trials.jsonl"), "w", encoding="utf-8"
+                ) as trials_json:
+            for trial in trials:
+                trials_json.write(json.dumps(trial) + "\n")
+        with open(
+                    os.path.join(output, "best.json"), "w", encoding="utf-8"
+                ) as best_json:
+            json.dump(
+                max(trials, key=lambda trial: trial["mean_score"]),
+                best_json, indent=2
+            )
+    return trials
@@ -10,19 +10,65 @@ register of a dataset given. The second one is a mix of plots to
 make explicit the dispersion and distribution of the values for
 some variables.
 
+The plots are drawn with the headless Agg backend, so they can also be
+generated by a pool of background processes with the start_plots function
+while the model is trained. For large datasets the heatmap draws the
+fraction of null values of each block of rows instead of one cell per row.
+
 This script can also be imported as a module.
 """
 # importing needed libraries
-import matplotlib.pyplot as plt
+from concurrent.futures import Executor, Future
+from typing import List, Optional
+
+import matplotlib
+import numpy as np
 import pandas as pd
-import seaborn as sns
 
+# the plots are only saved to files, so no display is needed
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402 pylint: disable=C0413
+import seaborn as sns  # noqa: E402 pylint: disable=C0413
 
-def heatmap_of_nulls(data: pd.DataFrame, path_to_save: str):
-    """Create a heatmap with the NA values for each variable of a given dataframe.
+# maximum number of rows drawn by the heatmap of nulls
+HEATMAP_MAX_ROWS = 2000
+
+# columns used by the collage of plots
+COLLAGE_COLUMNS = [
+    "SaleCondition", "SaleType", "HouseStyle", "Foundation", "SalePrice"
+]
+
+
+def null_matrix(
+            data: pd.DataFrame,
+            max_rows: Optional[int] = None
+        ) -> pd.DataFrame:
+    """Compute the null values of each variable of a given dataframe. When
+        the dataframe has more than max_rows rows, they are split into
+        max_rows consecutive blocks and the fraction of null values of each
+        block is computed instead.
 
     Args:
         data (pd.DataFrame): a dataset to be analysed.
+        max_rows (int): the maximum number of rows of the result, None to
+        keep one row per register.
+
+    Returns:
+        pd.DataFrame: the null values, or null fractions, of each variable.
+    """
+    nulls = data.isnull()
+    if max_rows is None or len(nulls) <= max_rows:
+        return nulls
+    blocks = np.arange(len(nulls)) * max_rows // len(nulls)
+    return nulls.groupby(blocks).mean()
+
+
+def plot_null_matrix(nulls: pd.DataFrame, path_to_save: str):
+    """Create a heatmap with the null values computed by null_matrix.
+
+    Args:
+        nulls (pd.DataFrame): the null values, or null fractions, of each
+        variable.
         path_to_save (str): the relative path where the plot is going to
         be saved.
 
@@ -32,8 +78,29 @@ def heatmap_of_nulls(data: pd.DataFrame, path_to_save: str):
     # create a space for the plot
     fig, axis = plt.subplots(figsize=(25, 10))
     # generate the heatmap and save it
-    sns.heatmap(data=data.isnull(), yticklabels=False, ax=axis)
+    sns.heatmap(data=nulls, yticklabels=False, ax=axis)
     fig.savefig(path_to_save)
+    plt.close(fig)
+
+
+def heatmap_of_nulls(
+            data: pd.DataFrame,
+            path_to_save: str,
+            max_rows: Optional[int] = HEATMAP_MAX_ROWS
+        ):
+    """Create a heatmap with the NA values for each variable of a given dataframe.
+
+    Args:
+        data (pd.DataFrame): a dataset to be analysed.
+        path_to_save (str): the relative path where the plot is going to
+        be saved.
+        max_rows (int): the maximum number of rows drawn, None to draw one
+        row per register.
+
+    Output:
+        an image with the plot generated.
+    """
+    plot_null_matrix(null_matrix(data, max_rows), path_to_save)
 
 
 def collage_of_plots(data: pd.DataFrame, path_to_save: str):
@@ -58,3 +125,34 @@ def collage_of_plots(data: pd.DataFrame, path_to_save: str):
     # integrate all plots in a single image and save it
     plt.grid()
     fig.savefig(path_to_save)
+    plt.close(fig)
+
+
+def start_plots(
+            executor: Executor,
+            data: pd.DataFrame,
+            path_heatmap: str,
+            path_collage: str,
+            max_rows: Optional[int] = HEATMAP_MAX_ROWS
+        ) -> List[Future]:
+    """Submit the heatmap of nulls and the collage of plots to a pool of
+        workers. Only the null matrix and the columns of the collage are
+        sent to the workers, and the dataset given can be modified as soon
+        as this function returns.
+
+    Args:
+        executor (Executor): the pool of workers, usually processes.
+        data (pd.DataFrame): a dataset to be analysed.
+        path_heatmap (str): the relative path where the heatmap is saved.
+        path_collage (str): the relative path where the collage is saved.
+        max_rows (int): the maximum number of rows drawn by the heatmap.
+
+    Returns:
+        List[Future]: the future results of the heatmap and the collage.
+    """
+    nulls = null_matrix(data, max_rows)
+    sample = data[COLLAGE_COLUMNS].copy()
+    return [
+        executor.submit(plot_null_matrix, nulls, path_heatmap),
+        executor.submit(collage_of_plots, sample, path_collage)
+    ]
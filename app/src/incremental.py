@@ -0,0 +1,353 @@
+"""Incremental fill statistics
+
+This script implements the FillStatistics class, which keeps the state
+needed to compute the values used to fill the 'NA' values of a dataset, the
+mean of each numerical column and the mode of each categorical column, and
+the vocabulary of each categorical column. The state of a new partition of
+the data is merged into the current one, so the fill values and the
+vocabularies are updated in O(new rows) instead of reading the whole
+history again. The state of a partition can also be subtracted from the
+state of the data it belongs to, which gives the state of the rest of the
+rows, as the folds of a cross validation need.
+
+The numerical columns keep the count of their values and their exact sum,
+stored as an integer number of units of 2**-1074 (every float64 value is a
+multiple of that unit), so the sums do not depend on the order in which the
+partitions are added and the incremental means are identical to the means
+computed from the whole history at once. The categorical columns keep the
+count of each value in arrays sorted by value, so the ties of the mode are
+broken as in Series.mode.
+
+It uses numpy and pandas libraries for data manipulation.
+
+To update the statistics with a new partition is as follows:
+statistics = FillStatistics().update(history)
+statistics.update(partition)
+fill_values = statistics.fill_values()
+
+This script can also be imported as a module.
+"""
+# importing needed libraries
+import copy
+import logging
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+# exponent of the unit of the exact sums, the smallest float64 is 2**-1074
+UNIT_EXPONENT = 1074
+
+# the mantissas of float64 values have 53 bits, split in two halves
+MANTISSA_BITS = 53
+HALF_BITS = 26
+
+# values summed at once, few enough to keep every partial sum of the halves
+# of the mantissas exact in float64
+BLOCK_ROWS = 1 << 20
+
+# offset of the exponents of frexp, which range from -1073 to 1024
+EXPONENT_OFFSET = 1100
+EXPONENT_SLOTS = 2200
+
+
+def exact_sum(values: np.ndarray) -> int:
+    """Sum an array of floats exactly. The integer values are summed as
+        int64, and the rest by adding the integer mantissas of the values
+        with the same exponent.
+
+    Args:
+        values (np.ndarray): a one dimensional float64 array without NaN
+        values.
+
+    Raises:
+        ValueError: if the array has infinite values.
+
+    Returns:
+        int: the sum as a number of units of 2**-1074.
+    """
+    if len(values) == 0:
+        return 0
+    largest = np.abs(values).max()
+    if np.isinf(largest):
+        logging.error("The numerical columns have infinite values.")
+        raise ValueError("Infinite values cannot be summed exactly.")
+    # the sum of the integer values cannot overflow an int64
+    if largest < 2.0 ** 62 / len(values) and (
+                values == np.trunc(values)
+            ).all():
+        return int(values.astype(np.int64).sum()) << UNIT_EXPONENT
+    total = 0
+    for start in range(0, len(values), BLOCK_ROWS):
+        mantissas, exponents = np.frexp(values[start:start + BLOCK_ROWS])
+        # value = integer * 2**(exponent - 53), where the integer is exact
+        integers = (mantissas * 2.0 ** MANTISSA_BITS).astype(np.int64)
+        halves = integers >> HALF_BITS
+        slots = exponents + EXPONENT_OFFSET
+        high = np.bincount(slots, halves, EXPONENT_SLOTS)
+        low = np.bincount(
+            slots, integers - (halves << HALF_BITS), EXPONENT_SLOTS
+        )
+        for slot in np.flatnonzero(high.astype(bool) | low.astype(bool)):
+            value = (int(high[slot]) << HALF_BITS) + int(low[slot])
+            shift = (
+                int(slot) - EXPONENT_OFFSET - MANTISSA_BITS + UNIT_EXPONENT
+            )
+            # the subnormal values are still a whole number of units
+            total += value << shift if shift >= 0 else value >> -shift
+    return total
+
+
+def exact_mean(total: int, count: int) -> float:
+    """Divide an exact sum by the number of values, rounding only once.
+
+    Args:
+        total (int): the sum as a number of units of 2**-1074.
+        count (int): the number of values.
+
+    Returns:
+        float: the mean, NaN when there are no values.
+    """
+    if count == 0:
+        return np.nan
+    return total / (count << UNIT_EXPONENT)
+
+
+def is_numerical(column: pd.Series) -> bool:
+    """Check whether a column is filled with its mean or with its mode.
+
+    Args:
+        column (pd.Series): the column.
+
+    Returns:
+        bool: True for the float and integer columns of any width, like
+        the float32 ones read with the numerical dtypes of the project.
+    """
+    return column.dtype.kind in "fiu"
+
+
+class FillStatistics:
+    """The FillStatistics class keeps the mergeable state of the fill values
+        and the vocabularies of the columns of a dataset.
+    """
+    def __init__(self):
+        """Start empty statistics."""
+        # columns in the order they were first seen
+        self.columns_: List[str] = []
+        self.rows_ = 0
+        # count and exact sum of each numerical column
+        self.numerical_: List[str] = []
+        self.counts_ = np.zeros(0, dtype=np.int64)
+        self.sums_ = np.zeros(0, dtype=object)
+        # sorted values of each categorical column and the count of each one
+        self.vocabularies_: Dict[str, np.ndarray] = {}
+        self.value_counts_: Dict[str, np.ndarray] = {}
+
+    def __check_kinds(self, data: pd.DataFrame) -> List[str]:
+        """Find the numerical columns of a partition, checking that every
+            known column keeps its kind.
+
+        Args:
+            data (pd.DataFrame): the new partition.
+
+        Raises:
+            ValueError: if a column changed from numerical to categorical,
+            or the other way around.
+
+        Returns:
+            List[str]: the numerical columns of the partition.
+        """
+        numerical = [col for col in data.columns if is_numerical(data[col])]
+        for col in data.columns:
+            known_numerical = col in self.numerical_
+            known = known_numerical or col in self.vocabularies_
+            if known and known_numerical != (col in numerical):
+                logging.error("The type of the column %s changed.", col)
+                raise ValueError(f"The column {col} changed its type.")
+        return numerical
+
+    def __add_numerical(self, data: pd.DataFrame, numerical: List[str]):
+        """Add the counts and the sums of the numerical columns.
+
+        Args:
+            data (pd.DataFrame): the new partition.
+            numerical (List[str]): its numerical columns.
+        """
+        new = [col for col in numerical if col not in self.numerical_]
+        self.numerical_.extend(new)
+        self.counts_ = np.append(self.counts_, np.zeros(len(new), np.int64))
+        self.sums_ = np.append(self.sums_, np.zeros(len(new), dtype=object))
+        for col in numerical:
+            position = self.numerical_.index(col)
+            values = data[col].to_numpy(dtype=np.float64)
+            values = values[~np.isnan(values)]
+            self.counts_[position] += len(values)
+            self.sums_[position] += exact_sum(values)
+
+    def __add_counts(self, col: str, values: np.ndarray, counts: np.ndarray):
+        """Merge the counts of the values of a categorical column.
+
+        Args:
+            col (str): the column.
+            values (np.ndarray): the sorted values.
+            counts (np.ndarray): the count of each value.
+        """
+        known = self.vocabularies_.get(col)
+        if known is None:
+            self.vocabularies_[col] = values
+            self.value_counts_[col] = counts
+            return
+        merged = np.union1d(known, values) if len(values) else known
+        merged_counts = np.zeros(len(merged), dtype=np.int64)
+        merged_counts[np.searchsorted(merged, known)] += self.value_counts_[col]
+        merged_counts[np.searchsorted(merged, values)] += counts
+        self.vocabularies_[col] = merged
+        self.value_counts_[col] = merged_counts
+
+    def update(self, data: pd.DataFrame):
+        """Add a new partition of the data to the statistics.
+
+        Args:
+            data (pd.DataFrame): the new partition.
+
+        Returns:
+            FillStatistics: the updated statistics.
+        """
+        numerical = self.__check_kinds(data)
+        self.columns_.extend(
+            col for col in data.columns if col not in self.columns_
+        )
+        self.rows_ += len(data)
+        self.__add_numerical(data, numerical)
+        for col in data.columns.difference(numerical, sort=False):
+            codes, uniques = pd.factorize(data[col], sort=True)
+            counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+            # the categories of a categorical column may not be sorted
+            values = np.asarray(uniques, dtype=object)
+            order = np.argsort(values, kind="stable")
+            self.__add_counts(
+                col, values[order], counts[order].astype(np.int64)
+            )
+        return self
+
+    def merge(self, other: "FillStatistics"):
+        """Add the statistics of other partitions, computed separately.
+
+        Args:
+            other (FillStatistics): the statistics of the other partitions.
+
+        Returns:
+            FillStatistics: the merged statistics.
+        """
+        for col in other.columns_:
+            known_numerical = col in self.numerical_
+            known = known_numerical or col in self.vocabularies_
+            if known and known_numerical != (col in other.numerical_):
+                logging.error("The type of the column %s changed.", col)
+                raise ValueError(f"The column {col} changed its type.")
+            if col not in self.columns_:
+                self.columns_.append(col)
+        self.rows_ += other.rows_
+        for col, count, total in zip(
+                    other.numerical_, other.counts_, other.sums_
+                ):
+            if col not in self.numerical_:
+                self.numerical_.append(col)
+                self.counts_ = np.append(self.counts_, 0)
+                self.sums_ = np.append(self.sums_, np.zeros(1, dtype=object))
+            position = self.numerical_.index(col)
+            self.counts_[position] += count
+            self.sums_[position] += total
+        for col, values in other.vocabularies_.items():
+            self.__add_counts(col, values, other.value_counts_[col])
+        return self
+
+    def subtract(self, other: "FillStatistics"):
+        """Remove the statistics of some partitions already added, leaving
+            the statistics of the rest of the rows.
+
+        Args:
+            other (FillStatistics): the statistics of the partitions.
+
+        Raises:
+            ValueError: if the partitions were not added to the statistics.
+
+        Returns:
+            FillStatistics: the statistics without the partitions.
+        """
+        for col, count, total in zip(
+                    other.numerical_, other.counts_, other.sums_
+                ):
+            if col not in self.numerical_:
+                logging.error("The column %s was not added.", col)
+                raise ValueError(f"The column {col} cannot be subtracted.")
+            position = self.numerical_.index(col)
+            self.counts_[position] -= count
+            self.sums_[position] -= total
+        for col, values in other.vocabularies_.items():
+            known = self.vocabularies_.get(col, np.zeros(0, dtype=object))
+            positions = np.searchsorted(known, values)
+            counts = self.value_counts_.get(col, np.zeros(0, np.int64)).copy()
+            found = positions < len(known)
+            if not found.all() or (known[positions[found]] != values).any():
+                logging.error("The values of the column %s were not added.",
+                              col)
+                raise ValueError(f"The column {col} cannot be subtracted.")
+            counts[positions] -= other.value_counts_[col]
+            # the values only seen in the partitions leave the vocabulary
+            seen = counts > 0
+            self.vocabularies_[col] = known[seen]
+            self.value_counts_[col] = counts[seen]
+        self.rows_ -= other.rows_
+        return self
+
+    def copy(self) -> "FillStatistics":
+        """Copy the statistics, so they can be updated independently.
+
+        Returns:
+            FillStatistics: the copy.
+        """
+        return copy.deepcopy(self)
+
+    def fill_values(self) -> Dict[str, Any]:
+        """Compute the fill value of each column.
+
+        Returns:
+            Dict[str, Any]: the mean of each numerical column and the mode of
+            each categorical column, NaN when a column has no values.
+        """
+        fill_values = {
+            col: exact_mean(total, int(count))
+            for col, count, total in zip(
+                self.numerical_, self.counts_, self.sums_
+            )
+        }
+        for col, values in self.vocabularies_.items():
+            counts = self.value_counts_[col]
+            # the values are sorted, so the first maximum is the smallest
+            fill_values[col] = values[counts.argmax()] if len(values) else np.nan
+        return {col: fill_values[col] for col in self.columns_}
+
+    def non_missing(self) -> Dict[str, int]:
+        """Count the values of each column which are not missing.
+
+        Returns:
+            Dict[str, int]: the number of values of each column.
+        """
+        counts = dict(zip(self.numerical_, self.counts_.tolist()))
+        counts.update(
+            (col, int(value_counts.sum()))
+            for col, value_counts in self.value_counts_.items()
+        )
+        return {col: counts[col] for col in self.columns_}
+
+    def vocabulary(self, col: str) -> np.ndarray:
+        """Take the sorted values seen in a categorical column.
+
+        Args:
+            col (str): the column.
+
+        Returns:
+            np.ndarray: the sorted values, as a label encoder learns them.
+        """
+        return self.vocabularies_[col]
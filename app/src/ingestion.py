@@ -0,0 +1,140 @@
+"""Dataset ingestion
+
+This script allows the user to read the csv datasets using the sets of
+variables of the project. The variables that are dropped by the pipeline
+are not parsed at all, the categorical variables are read with the
+category data type, which stores each distinct level once instead of a
+Python string per row, and the numerical variables are read as float32,
+which holds exactly every value of the dataset (integers below 2**24) with
+half the memory of the inferred int64 and float64 types. Only the types of
+the columns missing from both lists are inferred, from a sample of their
+first rows. The pyarrow engine of pandas can optionally be used
+to parse the files when it is installed.
+
+It uses pandas for data manipulation.
+
+This script can also be imported as a module.
+"""
+# importing needed libraries
+import importlib.util
+import logging
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+# type of the numerical variables, the one the random forest works with
+NUMERICAL_DTYPE = "float32"
+
+
+def read_options(
+            path: str,
+            cols_to_drop: Optional[List[str]] = None,
+            categorical: Optional[List[str]] = None,
+            keep: Optional[List[str]] = None,
+            engine: Optional[str] = None,
+            numerical: Optional[List[str]] = None
+        ) -> Dict[str, Any]:
+    """Build the arguments of pandas.read_csv to read a dataset.
+
+    Args:
+        path (str): the relative path of the csv file.
+        cols_to_drop (List[str]): the columns which are not parsed.
+        categorical (List[str]): the columns read with the category type.
+        Any other column whose values are not numeric is also read with the
+        category type.
+        keep (List[str]): the columns of cols_to_drop that are parsed anyway,
+        like the ids of the dataset.
+        engine (str): the parser engine, "c" or "pyarrow". The c engine is
+        used when pyarrow is not installed.
+        numerical (List[str]): the columns read as float32.
+
+    Returns:
+        Dict[str, Any]: the usecols, dtype and engine arguments.
+    """
+    skipped = set(cols_to_drop or []) - set(keep or [])
+    usecols = [
+        column for column in pd.read_csv(path, nrows=0).columns
+        if column not in skipped
+    ]
+    categories = set(categorical or [])
+    numbers = set(numerical or []) - categories
+    # only the columns of neither list are sampled to find the text ones
+    unlisted = [
+        column for column in usecols
+        if column not in categories and column not in numbers
+    ]
+    if unlisted:
+        sample = pd.read_csv(path, nrows=1000, usecols=unlisted)
+        categories |= set(sample.select_dtypes("object").columns)
+    dtype = {column: "category" for column in usecols if column in categories}
+    dtype.update(
+        (column, NUMERICAL_DTYPE) for column in usecols if column in numbers
+    )
+    if engine == "pyarrow" and importlib.util.find_spec("pyarrow") is None:
+        logging.warning("pyarrow is not installed, using the c engine.")
+        engine = None
+    options = {"usecols": usecols, "dtype": dtype}
+    if engine is not None:
+        options["engine"] = engine
+    return options
+
+
+def pipeline_read_options(
+            path: str,
+            fitted_pipeline: Any,
+            keep: Optional[List[str]] = None,
+            engine: Optional[str] = None
+        ) -> Dict[str, Any]:
+    """Build the arguments of pandas.read_csv to read a dataset that is going
+        to be processed by a fitted pipeline.
+
+    Args:
+        path (str): the relative path of the csv file.
+        fitted_pipeline (Any): the pipeline fitted with the train dataset.
+        keep (List[str]): the dropped columns that are parsed anyway.
+        engine (str): the parser engine, "c" or "pyarrow".
+
+    Returns:
+        Dict[str, Any]: the usecols, dtype and engine arguments.
+    """
+    categorical = [
+        *fitted_pipeline.ordinal_categories_,
+        *fitted_pipeline.categorical_encode,
+        *fitted_pipeline.fill_categorical
+    ]
+    # the numerical variables learned by fit, none for the pipelines saved
+    # before the statistics were kept
+    statistics = getattr(fitted_pipeline, "statistics_", None)
+    numerical = [] if statistics is None else list(statistics.numerical_)
+    return read_options(
+        path, fitted_pipeline.cols_to_drop, categorical, keep, engine,
+        numerical
+    )
+
+
+def read_dataset(
+            path: str,
+            cols_to_drop: Optional[List[str]] = None,
+            categorical: Optional[List[str]] = None,
+            keep: Optional[List[str]] = None,
+            engine: Optional[str] = None,
+            numerical: Optional[List[str]] = None
+        ) -> pd.DataFrame:
+    """Read a dataset parsing only the used columns with explicit types.
+
+    Args:
+        path (str): the relative path of the csv file.
+        cols_to_drop (List[str]): the columns which are not parsed.
+        categorical (List[str]): the columns read with the category type.
+        keep (List[str]): the columns of cols_to_drop that are parsed anyway.
+        engine (str): the parser engine, "c" or "pyarrow".
+        numerical (List[str]): the columns read as float32.
+
+    Returns:
+        data (pd.DataFrame): the dataset read.
+    """
+    options = read_options(
+        path, cols_to_drop, categorical, keep, engine, numerical
+    )
+    data = pd.read_csv(path, **options)
+    return data
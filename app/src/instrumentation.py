@@ -0,0 +1,326 @@
+"""Stage instrumentation
+
+This script implements a small instrumentation layer to measure each stage
+of the pipeline, the training and the scoring. The stage context manager,
+or the instrumented decorator, records the wall time, the CPU time, the
+increase of the peak resident memory of the process and the rows and
+columns of the data received and returned by the stage. Each record is
+written as a JSON line to the file given to the configure function, and
+nothing is measured until it is called.
+
+Optionally, each stage can also be profiled with cProfile, dumping the
+statistics of the stage to a .prof file, or traced with tracemalloc,
+adding the increase of traced memory to the record and dumping the lines
+that allocated the most memory during the stage to a .txt file. The time
+spent by the profilers is not included in the records. The stages can be
+nested, in which case the record of each one keeps the name of its parent,
+and only the outermost stage running on a thread is profiled with
+cProfile, since it already includes the calls of the nested ones.
+
+It uses the resource, cProfile and tracemalloc libraries of the standard
+library.
+
+To measure a stage is as follows:
+configure("logs/metrics.jsonl")
+with stage("drop", data) as current:
+    data = data.drop(columns=columns)
+    current.output(data)
+
+This script can also be imported as a module.
+"""
+# importing needed libraries
+import cProfile
+import functools
+import json
+import os
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+# profilers which can be enabled for each stage
+PROFILERS = ["cprofile", "tracemalloc"]
+
+# number of lines of each tracemalloc dump
+TRACEMALLOC_LINES = 25
+
+# the settings of the instrumentation, empty until configure is called
+__SETTINGS: Dict[str, Any] = {}
+
+# the stages running on each thread
+__ACTIVE = threading.local()
+
+__LOCK = threading.Lock()
+
+
+def configure(
+            path: Optional[str],
+            profile: Optional[str] = None,
+            profile_dir: str = "logs/profiles",
+            **fields
+        ):
+    """Start, or stop, writing the records of the stages.
+
+    Args:
+        path (str): the JSON lines file where the records are appended, or
+        None to stop measuring the stages.
+        profile (str): the profiler of each stage, "cprofile" or
+        "tracemalloc", or None to not profile them.
+        profile_dir (str): the folder of the dumps of the profiler.
+        **fields: values added to every record, like the name of the run.
+
+    Raises:
+        ValueError: if the profiler is not known.
+    """
+    if profile is not None and profile not in PROFILERS:
+        raise ValueError(f"Unknown profiler {profile}.")
+    if __SETTINGS.get("started_tracing") and profile != "tracemalloc":
+        tracemalloc.stop()
+    started_tracing = __SETTINGS.get("started_tracing", False)
+    __SETTINGS.clear()
+    if path is None:
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if profile is not None:
+        os.makedirs(profile_dir, exist_ok=True)
+    if profile == "tracemalloc" and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        started_tracing = True
+    __SETTINGS.update(
+        path=path, profile=profile, profile_dir=profile_dir, sequence=0,
+        fields=fields,
+        started_tracing=started_tracing and profile == "tracemalloc"
+    )
+
+
+def is_enabled() -> bool:
+    """Check whether the stages are being measured.
+
+    Returns:
+        bool: True if configure was called with a file.
+    """
+    return bool(__SETTINGS)
+
+
+def __peak_rss_mb() -> float:
+    """Read the peak resident memory of the process.
+
+    Returns:
+        float: the peak resident memory in megabytes.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # linux reports kilobytes and macOS bytes
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+def __write(record: Dict[str, Any]):
+    """Append a record to the JSON lines file.
+
+    Args:
+        record (Dict[str, Any]): the measures of a stage.
+    """
+    line = json.dumps(record, default=str)
+    with __LOCK:
+        with open(__SETTINGS["path"], "a", encoding="utf-8") as metrics:
+            metrics.write(line + "\n")
+
+
+class StageRecord:
+    """The StageRecord class keeps the measures of a running stage."""
+    def __init__(self, name: str, data: Any = None, **fields):
+        """Start the record of a stage.
+
+        Args:
+            name (str): the name of the stage.
+            data (Any): the data received by the stage.
+            **fields: additional values added to the record.
+        """
+        self.name = name
+        self.fields = fields
+        self.shape_in = self.shape(data)
+        self.shape_out = {"rows": None, "columns": None}
+        self.snapshot = None
+        self.traced_start = 0
+        self.traced_peak = 0
+        self.profiled = False
+        # time spent by the nested stages writing their profiler dumps
+        self.overhead_wall = 0.0
+        self.overhead_cpu = 0.0
+
+    @staticmethod
+    def shape(data: Any) -> Dict[str, Optional[int]]:
+        """Take the number of rows and columns of the data of a stage.
+
+        Args:
+            data (Any): a dataframe, a series or an array, or any other
+            object.
+
+        Returns:
+            Dict[str, Optional[int]]: the rows and the columns, None when
+            they are not known.
+        """
+        shape = getattr(data, "shape", None)
+        if shape is None:
+            return {"rows": None, "columns": None}
+        return {
+            "rows": int(shape[0]) if len(shape) > 0 else None,
+            "columns": int(shape[1]) if len(shape) > 1 else 1
+        }
+
+    def output(self, data: Any) -> Any:
+        """Record the data returned by the stage.
+
+        Args:
+            data (Any): the data returned by the stage.
+
+        Returns:
+            Any: the same data, so it can be used in an assignment.
+        """
+        self.shape_out = self.shape(data)
+        return data
+
+
+def __dump_profile(record: StageRecord, sequence: int, profiler: Any):
+    """Write the dump of the profiler of a stage.
+
+    Args:
+        record (StageRecord): the record of the stage.
+        sequence (int): the number of the stage in the process.
+        profiler (Any): the cProfile profiler of the stage, or None when
+        tracemalloc is used.
+    """
+    name = f"{os.getpid()}-{sequence:04d}-{record.name}"
+    base = os.path.join(__SETTINGS["profile_dir"], name)
+    if profiler is not None:
+        profiler.dump_stats(base + ".prof")
+        return
+    # the lines which allocated the most memory since the stage started
+    own_frames = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    statistics = tracemalloc.take_snapshot().filter_traces(own_frames)
+    statistics = statistics.compare_to(
+        record.snapshot.filter_traces(own_frames), "lineno"
+    )
+    record.snapshot = None
+    with open(base + ".txt", "w", encoding="utf-8") as dump:
+        for statistic in statistics[:TRACEMALLOC_LINES]:
+            dump.write(f"{statistic}\n")
+
+
+@contextmanager
+def stage(name: str, data: Any = None, **fields) -> Iterator[StageRecord]:
+    """Measure a stage and write its record when it finishes.
+
+    Args:
+        name (str): the name of the stage.
+        data (Any): the data received by the stage.
+        **fields: additional values added to the record.
+
+    Yields:
+        StageRecord: the record of the stage, whose output method records
+        the data returned by the stage.
+    """
+    record = StageRecord(name, data, **fields)
+    if not __SETTINGS:
+        yield record
+        return
+    stack = getattr(__ACTIVE, "stack", None)
+    if stack is None:
+        stack = __ACTIVE.stack = []
+    parent = stack[-1] if stack else None
+    with __LOCK:
+        __SETTINGS["sequence"] += 1
+        sequence = __SETTINGS["sequence"]
+    profile = __SETTINGS["profile"]
+    profiler = None
+    if profile == "cprofile" and not any(
+                active.profiled for active in stack
+            ):
+        profiler = cProfile.Profile()
+        record.profiled = True
+    elif profile == "tracemalloc":
+        # the peak of the parent is kept before the peak is reset
+        if parent is not None:
+            parent.traced_peak = max(
+                parent.traced_peak, tracemalloc.get_traced_memory()[1]
+            )
+        snapshot_wall, snapshot_cpu = time.perf_counter(), time.process_time()
+        record.snapshot = tracemalloc.take_snapshot()
+        for active in stack:
+            active.overhead_wall += time.perf_counter() - snapshot_wall
+            active.overhead_cpu += time.process_time() - snapshot_cpu
+        tracemalloc.reset_peak()
+        record.traced_start = tracemalloc.get_traced_memory()[0]
+    stack.append(record)
+    peak_rss = __peak_rss_mb()
+    wall, cpu = time.perf_counter(), time.process_time()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield record
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        wall = time.perf_counter() - wall - record.overhead_wall
+        cpu = time.process_time() - cpu - record.overhead_cpu
+        stack.pop()
+        result = {
+            "stage": record.name,
+            "parent": parent.name if parent is not None else None,
+            "pid": os.getpid(),
+            "wall_s": round(wall, 6),
+            "cpu_s": round(cpu, 6),
+            "peak_rss_delta_mb": round(__peak_rss_mb() - peak_rss, 3),
+            "rows_in": record.shape_in["rows"],
+            "columns_in": record.shape_in["columns"],
+            "rows_out": record.shape_out["rows"],
+            "columns_out": record.shape_out["columns"],
+            **__SETTINGS["fields"],
+            **record.fields
+        }
+        if profile == "tracemalloc":
+            record.traced_peak = max(
+                record.traced_peak, tracemalloc.get_traced_memory()[1]
+            )
+            result["traced_peak_delta_mb"] = round(
+                (record.traced_peak - record.traced_start) / 1e6, 3
+            )
+            if parent is not None:
+                parent.traced_peak = max(
+                    parent.traced_peak, record.traced_peak
+                )
+        if profiler is not None or profile == "tracemalloc":
+            dump_wall, dump_cpu = time.perf_counter(), time.process_time()
+            __dump_profile(record, sequence, profiler)
+            # the dump is not part of the time of the parent stages
+            dump_wall = time.perf_counter() - dump_wall
+            dump_cpu = time.process_time() - dump_cpu
+            if profile == "tracemalloc":
+                # neither is the memory used to take the snapshot
+                tracemalloc.reset_peak()
+            for active in stack:
+                active.overhead_wall += dump_wall
+                active.overhead_cpu += dump_cpu
+        __write(result)
+
+
+def instrumented(name: str) -> Callable:
+    """Create a decorator which measures every call of a function as a
+        stage. The first positional argument is taken as the data received
+        and the returned value as the data returned.
+
+    Args:
+        name (str): the name of the stage.
+
+    Returns:
+        Callable: the decorator.
+    """
+    def decorator(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with stage(name, args[0] if args else None) as current:
+                return current.output(function(*args, **kwargs))
+        return wrapper
+    return decorator
@@ -0,0 +1,186 @@
+"""Out-of-core training
+
+This script implements the training of the random forest over a train
+dataset which does not fit in memory. The csv file is read by chunks of
+rows twice: the first pass updates the fitted pipeline with each chunk,
+through its mergeable statistics, and the second one processes each chunk
+with the fitted pipeline and grows the forest with warm_start, fitting a
+fixed number of new trees with the rows of the chunk. Only a chunk and its
+feature matrix are in memory at once, besides the trees.
+
+Each tree only sees the rows of its own chunk, so the forest is an ensemble
+of forests trained with partitions of the dataset, and its accuracy can be
+compared with the one of a forest trained in memory with the r2_chunked
+function, which scores a csv file by chunks too.
+
+It uses scikit-learn for the machine learning model and pandas to read the
+csv files by chunks.
+
+To train a forest with 10 trees per chunk of 100000 rows is as follows:
+fitted_pipeline = fit_pipeline_chunked(pipeline, path, 100000)
+model = grow_forest(model, fitted_pipeline, path, 100000, "SalePrice", 10)
+
+This script can also be imported as a module.
+"""
+# importing needed libraries
+import logging
+from typing import Any, Iterator, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+# importing needed modules
+from src import instrumentation as instr
+from src.ingestion import read_options
+from src.preprocessing import read_encoders
+
+
+def read_chunks(
+            path: str,
+            chunksize: int,
+            fitted_pipeline: Any
+        ) -> Iterator[pd.DataFrame]:
+    """Read a csv file by chunks, parsing only the columns of the pipeline.
+
+    Args:
+        path (str): the relative path of the csv file.
+        chunksize (int): the number of rows of each chunk.
+        fitted_pipeline (Any): the pipeline, fitted or not, whose variables
+        are parsed.
+
+    Yields:
+        pd.DataFrame: each chunk of rows.
+    """
+    # the categorical variables are declared, so every chunk reads them
+    # with the same type even if a chunk has none of their values
+    categorical = [
+        *read_encoders(fitted_pipeline.encoders_path),
+        *fitted_pipeline.categorical_encode,
+        *fitted_pipeline.fill_categorical
+    ]
+    options = read_options(path, fitted_pipeline.cols_to_drop, categorical)
+    with pd.read_csv(path, chunksize=chunksize, **options) as chunks:
+        yield from chunks
+
+
+def fit_pipeline_chunked(
+            fitted_pipeline: Any,
+            path: str,
+            chunksize: int
+        ) -> Any:
+    """Fit a pipeline with a csv file, updating it chunk by chunk.
+
+    Args:
+        fitted_pipeline (Any): the pipeline to be fitted.
+        path (str): the relative path of the train dataset.
+        chunksize (int): the number of rows of each chunk.
+
+    Returns:
+        Any: the pipeline, with the same values as if it was fitted with
+        the whole file at once.
+    """
+    for number, chunk in enumerate(read_chunks(
+                path, chunksize, fitted_pipeline
+            )):
+        with instr.stage("fit_pipeline_chunk", chunk, chunk=number):
+            fitted_pipeline.partial_fit(chunk)
+    return fitted_pipeline
+
+
+def chunk_matrices(
+            fitted_pipeline: Any,
+            path: str,
+            chunksize: int,
+            target: str
+        ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Process a csv file by chunks with a fitted pipeline.
+
+    Args:
+        fitted_pipeline (Any): the pipeline fitted with the train dataset.
+        path (str): the relative path of the csv file.
+        chunksize (int): the number of rows of each chunk.
+        target (str): the output variable.
+
+    Yields:
+        Tuple[np.ndarray, np.ndarray]: the float32 feature matrix and the
+        output variable of each chunk.
+    """
+    for chunk in read_chunks(path, chunksize, fitted_pipeline):
+        final_chunk = fitted_pipeline.transform(chunk)
+        yield (
+            fitted_pipeline.to_matrix(final_chunk),
+            final_chunk[target].to_numpy(dtype=np.float64)
+        )
+
+
+def grow_forest(
+            model: RandomForestRegressor,
+            fitted_pipeline: Any,
+            path: str,
+            chunksize: int,
+            target: str,
+            trees_per_chunk: int = 10
+        ) -> RandomForestRegressor:
+    """Grow a forest with a csv file, fitting new trees with each chunk.
+
+    Args:
+        model (RandomForestRegressor): the model to be trained.
+        fitted_pipeline (Any): the pipeline fitted with the train dataset.
+        path (str): the relative path of the train dataset.
+        chunksize (int): the number of rows of each chunk.
+        target (str): the output variable.
+        trees_per_chunk (int): the number of trees fitted with each chunk.
+
+    Raises:
+        ValueError: if the number of trees per chunk is not positive.
+
+    Returns:
+        RandomForestRegressor: the forest with the trees of every chunk.
+    """
+    if trees_per_chunk < 1:
+        logging.error("The trees per chunk have to be positive.")
+        raise ValueError("At least one tree has to be fitted per chunk.")
+    model.set_params(warm_start=True)
+    trees = 0
+    for number, (X, y) in enumerate(chunk_matrices(
+                fitted_pipeline, path, chunksize, target
+            )):
+        with instr.stage("grow_forest_chunk", X, chunk=number):
+            trees += trees_per_chunk
+            model.set_params(n_estimators=trees)
+            model.fit(X, y)
+        logging.info(
+            "Chunk %s: %s rows, %s trees.", number, len(X), model.n_estimators
+        )
+    # later calls to fit train a new forest
+    model.set_params(warm_start=False)
+    return model
+
+
+def r2_chunked(
+            model: Any,
+            fitted_pipeline: Any,
+            path: str,
+            chunksize: int,
+            target: str
+        ) -> float:
+    """Score a model with a csv file, predicting it chunk by chunk.
+
+    Args:
+        model (Any): a pretrained model.
+        fitted_pipeline (Any): the pipeline fitted with the train dataset.
+        path (str): the relative path of the csv file.
+        chunksize (int): the number of rows of each chunk.
+        target (str): the output variable.
+
+    Returns:
+        float: the R2 score of the whole file, from the sums of each chunk.
+    """
+    rows, total, squares, errors = 0, 0.0, 0.0, 0.0
+    for X, y in chunk_matrices(fitted_pipeline, path, chunksize, target):
+        rows += len(y)
+        total += float(y.sum())
+        squares += float(np.square(y).sum())
+        errors += float(np.square(y - model.predict(X)).sum())
+    return 1 - errors / (squares - total * total / rows)
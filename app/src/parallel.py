@@ -0,0 +1,239 @@
+"""Partitioned preprocessing
+
+This script implements a partitioned execution mode of a fitted pipeline.
+Once the fill values and the encodings are learned, each row is processed
+on its own, so the input dataframe is split into blocks of consecutive rows
+which are transformed at the same time by a pool of processes.
+
+The fitted pipeline and the input are given once to each worker when it
+starts (shared copy-on-write when the processes are forked, pickled once
+per worker otherwise), and each task only receives the range of rows of its
+block. The workers write the features of their rows directly into a float32
+matrix in shared memory, at the position of the rows in the input, so the
+results are reassembled in order without sending them back to the parent
+process.
+
+It also keeps the helpers that publish the arrays of a dataset in shared
+memory and attach the workers of a pool to them as read-only arrays, used
+by the search of parameters and the comparison of models.
+
+It uses numpy and pandas for data manipulation and the multiprocessing
+library of the standard library.
+
+To transform a dataframe with 8 workers is as follows:
+matrix = transform_partitioned(fitted_pipeline, data, n_jobs=8)
+
+This script can also be imported as a module.
+"""
+# importing needed libraries
+import logging
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# importing needed modules
+from src import instrumentation as instr
+from src.training import resolve_workers
+
+# the inputs smaller than this number of rows per worker are transformed by
+# the parent process, since starting the workers costs more
+MIN_PARTITION_ROWS = 10000
+
+# number of blocks of rows given to each worker, more than one balances the
+# blocks that take longer
+PARTITIONS_PER_WORKER = 4
+
+# the state given to each worker when it starts, set by __init_worker
+__WORKER: Dict[str, Any] = {}
+
+# the name of the block, the shape and the type of an array in shared memory
+SharedArray = Tuple[str, Tuple[int, ...], str]
+
+# the arrays shared with the workers of a pool, set by attach_arrays
+SHARED: Dict[str, Any] = {}
+
+
+def share_array(array: np.ndarray) -> shared_memory.SharedMemory:
+    """Copy an array to a new block of shared memory.
+
+    Args:
+        array (np.ndarray): the array to be shared.
+
+    Returns:
+        shared_memory.SharedMemory: the block, which has to be closed and
+        unlinked by the caller.
+    """
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, array.dtype, buffer=block.buf)[:] = array
+    return block
+
+
+def share_arrays(
+            arrays: Dict[str, np.ndarray]
+        ) -> Tuple[Dict[str, shared_memory.SharedMemory],
+                   Dict[str, SharedArray]]:
+    """Copy several arrays to new blocks of shared memory.
+
+    Args:
+        arrays (Dict[str, np.ndarray]): the arrays to be shared, by key.
+
+    Returns:
+        Tuple[Dict[str, shared_memory.SharedMemory], Dict[str, SharedArray]]:
+        the block of each array, to be released with release_arrays, and
+        the description of each array that attach_arrays receives.
+    """
+    blocks: Dict[str, shared_memory.SharedMemory] = {}
+    try:
+        for key, array in arrays.items():
+            blocks[key] = share_array(array)
+    except OSError:
+        release_arrays(blocks)
+        raise
+    return blocks, {
+        key: (blocks[key].name, array.shape, array.dtype.str)
+        for key, array in arrays.items()
+    }
+
+
+def attach_arrays(arrays: Dict[str, SharedArray]):
+    """Attach a worker to the arrays in shared memory, as read-only
+        arrays in the SHARED dictionary. It is the initializer of the
+        workers of a pool.
+
+    Args:
+        arrays (Dict[str, SharedArray]): the name of the block, the shape
+        and the type of each array.
+    """
+    for key, (name, shape, dtype) in arrays.items():
+        block = shared_memory.SharedMemory(name=name)
+        # the block is kept so the array is valid while the worker lives
+        SHARED[key + "_block"] = block
+        array = np.ndarray(shape, dtype, buffer=block.buf)
+        array.flags.writeable = False
+        SHARED[key] = array
+
+
+def release_arrays(blocks: Dict[str, shared_memory.SharedMemory]):
+    """Close and remove the blocks of shared memory of the arrays.
+
+    Args:
+        blocks (Dict[str, shared_memory.SharedMemory]): the block of each
+        array.
+    """
+    for block in blocks.values():
+        block.close()
+        block.unlink()
+
+
+def __init_worker(
+            fitted_pipeline: Any,
+            data: pd.DataFrame,
+            block_name: str,
+            shape: Tuple[int, int]
+        ):
+    """Keep the state shared by every task of a worker.
+
+    Args:
+        fitted_pipeline (Any): the pipeline fitted with the train dataset.
+        data (pd.DataFrame): the whole input dataframe.
+        block_name (str): the name of the shared memory of the output.
+        shape (Tuple[int, int]): the rows and the features of the output.
+    """
+    block = shared_memory.SharedMemory(name=block_name)
+    __WORKER.update(
+        pipeline=fitted_pipeline,
+        data=data,
+        block=block,
+        matrix=np.ndarray(shape, np.float32, buffer=block.buf)
+    )
+
+
+def __transform_rows(start: int, stop: int) -> int:
+    """Transform a block of rows of the input into the shared output.
+
+    Args:
+        start (int): the first row of the block.
+        stop (int): the row after the last one of the block.
+
+    Returns:
+        int: the number of rows transformed.
+    """
+    fitted_pipeline = __WORKER["pipeline"]
+    rows = __WORKER["data"].iloc[start:stop]
+    if fitted_pipeline.inplace:
+        # the inplace mode deletes columns, which a slice cannot do
+        rows = rows.copy()
+    fitted_pipeline.transform_matrix(rows, out=__WORKER["matrix"][start:stop])
+    return stop - start
+
+
+def transform_partitioned(
+            fitted_pipeline: Any,
+            data: pd.DataFrame,
+            n_jobs: int = -1,
+            partition_rows: Optional[int] = None
+        ) -> np.ndarray:
+    """Transform a dataframe into the feature matrix by blocks of rows in a
+        pool of processes.
+
+    Args:
+        fitted_pipeline (Any): the pipeline fitted with the train dataset.
+        data (pd.DataFrame): the dataframe to be processed.
+        n_jobs (int): the number of workers, -1 for all the cores.
+        partition_rows (int): the rows of each block, by default the rows
+        are split into 4 blocks per worker.
+
+    Returns:
+        np.ndarray: a C-contiguous float32 matrix, identical to the one of
+        the transform_matrix method of the pipeline.
+    """
+    workers = min(
+        resolve_workers(n_jobs), math.ceil(len(data) / MIN_PARTITION_ROWS)
+    )
+    if workers <= 1:
+        return fitted_pipeline.transform_matrix(data)
+    if partition_rows is None:
+        partition_rows = math.ceil(
+            len(data) / (workers * PARTITIONS_PER_WORKER)
+        )
+    shape = (len(data), len(fitted_pipeline.feature_names_))
+    block = shared_memory.SharedMemory(
+        create=True, size=max(shape[0] * shape[1] * 4, 1)
+    )
+    # forked workers share the input with the parent instead of receiving
+    # a pickled copy of it
+    context = multiprocessing.get_context(
+        "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+    )
+    logging.info(
+        "Transforming %s rows with %s workers in blocks of %s rows.",
+        len(data), workers, partition_rows
+    )
+    try:
+        with instr.stage("transform_partitioned", data) as current:
+            with ProcessPoolExecutor(
+                        workers,
+                        mp_context=context,
+                        initializer=__init_worker,
+                        initargs=(fitted_pipeline, data, block.name, shape)
+                    ) as pool:
+                starts = range(0, len(data), partition_rows)
+                for transformed in pool.map(
+                            __transform_rows,
+                            starts,
+                            [start + partition_rows for start in starts]
+                        ):
+                    logging.debug("Block of %s rows transformed.", transformed)
+            # the only copy of the results, out of the shared memory
+            matrix = current.output(
+                np.ndarray(shape, np.float32, buffer=block.buf).copy()
+            )
+    finally:
+        block.close()
+        block.unlink()
+    return matrix
@@ -0,0 +1,484 @@
+"""Fitted preprocessing pipeline
+
+This script implements the HousePricingPipeline class, which performs the
+same cleaning and preprocessing steps of the functions under the src folder
+but splits them in two stages. The first one learns, from a train dataset,
+the values used to fill the 'NA' values, the categories of the ordinal
+variables and the vocabularies of the label encoded variables. The second
+one applies the learned values to any new dataset, so the test dataset
+and the incoming listings are encoded exactly as the train dataset without
+computing any statistic again.
+
+The fill values and the vocabularies of the label encoded variables are
+derived from a FillStatistics state, which the partial_fit method updates
+with each new partition of the train dataset in O(new rows), giving exactly
+the same values as fitting the whole history again. The state is saved with
+the pipeline, so a saved version can keep being updated. A copy of a
+fitted pipeline can also be given other statistics, like the ones of the
+training rows of a fold of a cross validation.
+
+The interactions between variables are compiled from their JSON file when
+the pipeline is fitted and kept with the fitted values, so a saved pipeline
+creates the same variables even if the file is modified afterwards.
+
+The values of the ordinal and label encoded variables which were not seen
+when the pipeline was fitted, like the neighborhood of a new listing, are
+filled with the mode of their variable, logging a warning, so a single new
+value never stops the scoring of a dataset.
+
+The ordinal and label codes are stored with the smallest integer type able
+to hold them, and the transform_matrix method returns the features as a
+single C-contiguous float32 matrix, in the order of the feature names
+learned by fit, which is the type the random forest works with.
+
+The pipeline can also run in an inplace mode, in which the dataframe given
+to transform (or fit_transform) is used as the single working buffer and
+mutated from the first to the last step, instead of copying it on each step.
+
+It uses numpy and pandas libraries for data manipulation.
+
+To instantiate a new HousePricingPipeline class is as follows:
+example_of_pipeline = HousePricingPipeline(cols_to_drop, fill_categorical,
+                                           categorical_encode,
+                                           not_output_variables)
+
+This script can also be imported as a module.
+"""
+# importing needed libraries
+import copy
+import logging
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# importing needed modules
+from src import cleaning as cln
+from src import instrumentation as instr
+from src import preprocessing as prcs
+from src.incremental import FillStatistics
+
+
+class HousePricingPipeline:
+    """The HousePricingPipeline class learns the values required by the
+        cleaning and encoding steps once and reuses them on new datasets.
+    """
+    def __init__(
+                self,
+                cols_to_drop: List[str],
+                fill_categorical: List[str],
+                categorical_encode: List[str],
+                not_output_variables: List[str],
+                custom_value: Any = "No",
+                encoders_path: str = prcs.ENCODERS_PATH,
+                interactions_path: str = prcs.INTERACTIONS_PATH,
+                inplace: bool = False,
+                target: Optional[str] = None
+            ):
+        """Store the sets of variables used on each step of the pipeline.
+
+        Args:
+            cols_to_drop (List[str]): the variables dropped before cleaning.
+            fill_categorical (List[str]): the variables filled with the
+            custom value.
+            categorical_encode (List[str]): the variables encoded with the
+            label encoding rules.
+            not_output_variables (List[str]): the variables dropped after
+            creating the interactions.
+            custom_value (Any): the value used to fill the custom variables.
+            encoders_path (str): the path of the JSON file with the
+            categories of the ordinal variables.
+            interactions_path (str): the path of the JSON file with the
+            interactions between variables.
+            inplace (bool): whether transform and fit_transform mutate the
+            dataframe given instead of working on copies.
+            target (str): the output variable, which is not a feature.
+        """
+        self.cols_to_drop = cols_to_drop
+        self.fill_categorical = fill_categorical
+        self.categorical_encode = categorical_encode
+        self.not_output_variables = not_output_variables
+        self.custom_value = custom_value
+        self.encoders_path = encoders_path
+        self.interactions_path = interactions_path
+        self.inplace = inplace
+        self.target = target
+        # fitted state
+        self.input_columns_ = None
+        self.fill_columns_ = None
+        self.fill_values_ = None
+        self.ordinal_categories_ = None
+        self.label_categories_ = None
+        self.interactions_ = None
+        self.strict_unknown_ = False
+        self.feature_names_ = None
+        self.statistics_ = None
+
+    def is_fitted(self) -> bool:
+        """Check whether the pipeline has already learned its values.
+
+        Returns:
+            bool: True if the fit method has been called.
+        """
+        return self.fill_columns_ is not None
+
+    @staticmethod
+    def __drop(
+                data: pd.DataFrame,
+                columns: List[str],
+                inplace: bool
+            ) -> pd.DataFrame:
+        """Drop a set of columns from a dataframe.
+
+        Args:
+            data (pd.DataFrame): the dataframe to be processed.
+            columns (List[str]): the columns to drop. The columns which are
+            not present, because they were not read, are ignored.
+            inplace (bool): whether to delete the columns from the dataframe
+            given, which does not copy the remaining columns.
+
+        Returns:
+            pd.DataFrame: the dataframe without the columns given.
+        """
+        if not inplace:
+            return data.drop(columns, axis=1, errors="ignore")
+        for column in columns:
+            if column in data:
+                del data[column]
+        return data
+
+    def __drop_and_fill_custom(
+                self,
+                data: pd.DataFrame,
+                inplace: bool
+            ) -> pd.DataFrame:
+        """Drop the unused variables and fill the custom variables.
+
+        Args:
+            data (pd.DataFrame): the dataframe to be processed.
+            inplace (bool): whether to mutate the dataframe given.
+
+        Returns:
+            pd.DataFrame: the dataframe without the dropped variables.
+        """
+        with instr.stage("drop", data) as current:
+            data_filtered = current.output(
+                self.__drop(data, self.cols_to_drop, inplace)
+            )
+        # the drop already returned a new dataframe when inplace is not set
+        with instr.stage("custom_fill", data_filtered) as current:
+            return current.output(cln.custom_fill_na_values(
+                data_filtered, self.fill_categorical, self.custom_value,
+                inplace=True
+            ))
+
+    def __fill_values(self, data: pd.DataFrame) -> dict:
+        """Build the mapping of fill values for the columns of a dataframe.
+
+        Args:
+            data (pd.DataFrame): the dataframe to be filled.
+
+        Returns:
+            dict: the learned fill value of each column present in data.
+        """
+        present = np.isin(self.fill_columns_, data.columns)
+        return dict(zip(
+            self.fill_columns_[present], self.fill_values_[present]
+        ))
+
+    def __encode(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Fill, encode and interact a dataframe with the learned values.
+
+        Args:
+            data (pd.DataFrame): a working dataframe already dropped and
+            filled with the custom value, which is mutated.
+
+        Returns:
+            pd.DataFrame: the final dataframe.
+        """
+        # the dataframe given is already a working buffer owned by the
+        # pipeline, so every step mutates it
+        # the pipelines saved before the attribute existed fill them too
+        if not getattr(self, "strict_unknown_", False):
+            with instr.stage("fill_unknown", data) as current:
+                current.output(self.__fill_unknown(data))
+        with instr.stage("fill_all", data) as current:
+            current.output(cln.fill_all_na_values(
+                data, inplace=True, fill_values=self.__fill_values(data)
+            ))
+        logging.info("NA values removed.")
+        with instr.stage("ordinal_encode", data) as current:
+            current.output(prcs.encode_with_categories(
+                data, self.ordinal_categories_, dtype=None, inplace=True
+            ))
+        with instr.stage("label_encode", data) as current:
+            current.output(prcs.encode_with_categories(
+                data, self.label_categories_, dtype=None, inplace=True
+            ))
+        logging.info("Encoding process finished.")
+        with instr.stage("interactions", data) as current:
+            data = current.output(prcs.create_interactions(
+                data, inplace=True, plan=self.__interactions()
+            ))
+        logging.info("Interactions created successfully.")
+        with instr.stage("drop_output", data) as current:
+            final_data = current.output(
+                self.__drop(data, self.not_output_variables, True)
+            )
+        logging.info("Pipeline finished.")
+        return final_data
+
+    def __fill_unknown(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Replace the values of the ordinal and label encoded variables
+            which are not in their categories by missing values.
+
+        Args:
+            data (pd.DataFrame): a working dataframe, which is mutated.
+
+        Returns:
+            pd.DataFrame: the dataframe, where the unknown values will be
+            filled with the mode of their variable.
+        """
+        categories = {**self.ordinal_categories_, **self.label_categories_}
+        for column, column_categories in categories.items():
+            if column not in data:
+                continue
+            # the missing values are filled afterwards anyway
+            values = data[column]
+            known = values.isin(column_categories) | values.isna()
+            if not known.all():
+                logging.warning(
+                    "%s values of %s not seen in training, like %s, are "
+                    "filled with its mode.", int((~known).sum()), column,
+                    values[~known].iloc[0]
+                )
+                data[column] = values.where(known)
+        return data
+
+    def __apply_statistics(self):
+        """Derive the fill values and the label vocabularies from the
+            current statistics.
+        """
+        fill_values = self.statistics_.fill_values()
+        self.fill_columns_ = np.array(list(fill_values), dtype=object)
+        self.fill_values_ = np.array(list(fill_values.values()), dtype=object)
+        # the missing values are filled with the mode, which is already one
+        # of the values of the vocabulary
+        self.label_categories_ = {
+            column: self.statistics_.vocabulary(column)
+            for column in self.categorical_encode
+        }
+
+    def __interactions(self) -> List[Tuple[str, Any, List[str]]]:
+        """Take the compiled interactions learned with the fitted values.
+
+        Returns:
+            List[Tuple[str, Any, List[str]]]: the plan of the interactions,
+            read from the default file for pipelines fitted before the
+            interactions were learned.
+        """
+        interactions = getattr(self, "interactions_", None)
+        if interactions is None:
+            interactions = prcs.read_interactions()
+        return interactions
+
+    def __learn(self, data: pd.DataFrame):
+        """Learn the fill values and the categories from a dataframe
+            already dropped and filled with the custom value.
+
+        Args:
+            data (pd.DataFrame): the dataframe to learn the values from.
+        """
+        self.statistics_ = FillStatistics().update(data)
+        try:
+            self.ordinal_categories_ = prcs.read_encoders(self.encoders_path)
+        except FileNotFoundError as fnfe:
+            logging.error("The file with the encoding values was not found.")
+            raise fnfe
+        try:
+            self.interactions_ = prcs.read_interactions(self.interactions_path)
+        except FileNotFoundError as fnfe:
+            logging.error("The file with the interactions was not found.")
+            raise fnfe
+        self.__apply_statistics()
+
+    def __learn_features(self, final_data: pd.DataFrame):
+        """Learn the names of the features from a processed dataframe.
+
+        Args:
+            final_data (pd.DataFrame): a dataframe processed by the pipeline.
+        """
+        self.feature_names_ = final_data.columns.drop(
+            self.target, errors="ignore"
+        )
+
+    def fit(self, data: pd.DataFrame):
+        """Learn the values required by the pipeline from a train dataset.
+
+        Args:
+            data (pd.DataFrame): the train dataset.
+
+        Returns:
+            HousePricingPipeline: the fitted pipeline.
+        """
+        self.input_columns_ = np.array(data.columns, dtype=object)
+        with instr.stage("pipeline_fit", data):
+            data_filled = self.__drop_and_fill_custom(data, inplace=False)
+            self.__learn(data_filled)
+            # the features are the columns of an empty processed dataframe
+            self.__learn_features(self.__encode(data_filled.iloc[:0].copy()))
+        return self
+
+    def partial_fit(self, data: pd.DataFrame):
+        """Update the learned values with a new partition of the train
+            dataset, without reading the partitions already learned.
+
+        Args:
+            data (pd.DataFrame): the new partition of the train dataset.
+
+        Raises:
+            RuntimeError: if the pipeline was fitted without statistics,
+            before they were introduced.
+
+        Returns:
+            HousePricingPipeline: the updated pipeline.
+        """
+        if not self.is_fitted():
+            return self.fit(data)
+        if getattr(self, "statistics_", None) is None:
+            raise RuntimeError(
+                "The pipeline has no statistics to update, fit it again."
+            )
+        with instr.stage("pipeline_partial_fit", data):
+            self.statistics_.update(
+                self.__drop_and_fill_custom(data, inplace=False)
+            )
+            self.__apply_statistics()
+        return self
+
+    def compute_statistics(self, data: pd.DataFrame) -> FillStatistics:
+        """Compute the statistics of a dataset without learning them.
+
+        Args:
+            data (pd.DataFrame): the dataset, which is not mutated.
+
+        Returns:
+            FillStatistics: the statistics of the dataset, as fit learns
+            them.
+        """
+        with instr.stage("pipeline_statistics", data):
+            return FillStatistics().update(
+                self.__drop_and_fill_custom(data, inplace=False)
+            )
+
+    def with_statistics(
+                self,
+                statistics: FillStatistics,
+                fill_unknown: bool = True
+            ):
+        """Copy the fitted pipeline with other statistics, keeping its
+            encoders, interactions and features.
+
+        Args:
+            statistics (FillStatistics): the statistics of the copy.
+            fill_unknown (bool): whether the copy fills the values of the
+            encoded variables missing from the new vocabularies, which
+            otherwise raise a ValueError.
+
+        Raises:
+            RuntimeError: if the pipeline has not been fitted.
+
+        Returns:
+            HousePricingPipeline: a copy which does not mutate the
+            dataframes given.
+        """
+        if not self.is_fitted():
+            raise RuntimeError("The pipeline has not been fitted yet.")
+        fitted_pipeline = copy.copy(self)
+        fitted_pipeline.statistics_ = statistics
+        fitted_pipeline.strict_unknown_ = not fill_unknown
+        fitted_pipeline.inplace = False
+        fitted_pipeline.__apply_statistics()
+        return fitted_pipeline
+
+    def transform(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Performs all cleaning and preprocessing steps on a given dataframe
+            using the learned values.
+
+        Args:
+            data (pd.DataFrame): the dataframe to be processed.
+
+        Raises:
+            RuntimeError: if the pipeline has not been fitted.
+
+        Returns:
+            pd.DataFrame: a dataframe with no "NA" values and columns encoded.
+        """
+        if not self.is_fitted():
+            raise RuntimeError("The pipeline has not been fitted yet.")
+        with instr.stage("pipeline_transform", data) as current:
+            return current.output(self.__encode(
+                self.__drop_and_fill_custom(data, self.inplace)
+            ))
+
+    def fit_transform(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Learn the values from a train dataset and process it.
+
+        Args:
+            data (pd.DataFrame): the train dataset.
+
+        Returns:
+            pd.DataFrame: a dataframe with no "NA" values and columns encoded.
+        """
+        self.input_columns_ = np.array(data.columns, dtype=object)
+        with instr.stage("pipeline_fit_transform", data) as current:
+            data_filled = self.__drop_and_fill_custom(data, self.inplace)
+            self.__learn(data_filled)
+            final_data = current.output(self.__encode(data_filled))
+            self.__learn_features(final_data)
+            return final_data
+
+    def to_matrix(
+                self,
+                final_data: pd.DataFrame,
+                out: Optional[np.ndarray] = None
+            ) -> np.ndarray:
+        """Convert a dataframe processed by the pipeline into the feature
+            matrix, with the columns in the order of the feature names.
+
+        Args:
+            final_data (pd.DataFrame): a dataframe processed by the pipeline.
+            out (np.ndarray): a float32 matrix where the features are
+            written instead of a new one.
+
+        Raises:
+            RuntimeError: if the pipeline has not been fitted.
+
+        Returns:
+            np.ndarray: a C-contiguous float32 matrix without the target.
+        """
+        if getattr(self, "feature_names_", None) is None:
+            raise RuntimeError("The pipeline has not been fitted yet.")
+        with instr.stage("matrix", final_data) as current:
+            return current.output(
+                prcs.feature_matrix(final_data, self.feature_names_, out)
+            )
+
+    def transform_matrix(
+                self,
+                data: pd.DataFrame,
+                out: Optional[np.ndarray] = None
+            ) -> np.ndarray:
+        """Performs all cleaning and preprocessing steps on a given dataframe
+            and returns the feature matrix.
+
+        Args:
+            data (pd.DataFrame): the dataframe to be processed.
+            out (np.ndarray): a float32 matrix where the features are
+            written instead of a new one.
+
+        Returns:
+            np.ndarray: a C-contiguous float32 matrix whose columns are the
+            feature_names_ of the pipeline.
+        """
+        return self.to_matrix(self.transform(data), out)
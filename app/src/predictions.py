@@ -0,0 +1,254 @@
+"""Predictions cache
+
+This script implements the PredictionCache class, which stores the
+prediction of each row already scored in an SQLite file, keyed by a hash of
+the raw values of the row. When a file is scored again, only the rows whose
+values changed, the misses, are processed by the pipeline and predicted by
+the model, and the predictions of the rest are read from the cache.
+
+The cache belongs to a single model: it stores a key computed from the
+content of the files of the saved model and pipeline and of the
+map_encoders.json and interactions.json files, and every entry is
+removed as soon as a file is scored with a different key, so the cached
+predictions never outlive the model that generated them. When the cache
+exceeds its maximum number of rows, the entries used least recently, by
+the runs which scored them, are removed.
+
+It uses sqlite3 of the standard library for the storage and pandas to hash
+the rows and to align the cached predictions with them.
+
+To read the cached predictions of the rows of a dataframe is as follows:
+with PredictionCache("predictions.sqlite", key) as cache:
+    price, hit = cache.get(hash_rows(data, ["Id"]))
+
+This script can also be imported as a module.
+"""
+# importing needed libraries
+import hashlib
+import logging
+import os
+import sqlite3
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# importing needed modules
+from src.cache import hash_file
+from src.preprocessing import INTERACTIONS_PATH
+
+# version of the format of the keys, it has to be increased when the rows
+# are hashed in a different way
+KEY_VERSION = "1"
+
+
+def hash_rows(
+            data: pd.DataFrame,
+            exclude: Optional[List[str]] = None
+        ) -> np.ndarray:
+    """Compute a stable hash of the raw values of each row.
+
+    Args:
+        data (pd.DataFrame): the rows, as read from the csv file.
+        exclude (List[str]): the columns which are not hashed, like the id.
+
+    Returns:
+        np.ndarray: the int64 hash of each row, the same in every process
+        for the same values.
+    """
+    # the columns are sorted so their order in the file does not matter
+    values = data[sorted(set(data.columns) - set(exclude or []))]
+    # the same number is parsed as an integer or as a float depending on
+    # the nulls of the rows read with it, so they are hashed as floats
+    values = values.astype({
+        column: np.float64
+        for column in values.select_dtypes("number").columns
+    })
+    return pd.util.hash_pandas_object(
+        values, index=False
+    ).to_numpy().view(np.int64)
+
+
+def model_key(artifact_paths: List[str], fitted_pipeline: Any) -> str:
+    """Compute the key of a model, which changes when the model, the
+        pipeline or its JSON files change.
+
+    Args:
+        artifact_paths (List[str]): the files of the saved model and
+        pipeline.
+        fitted_pipeline (Any): the pipeline fitted with the train dataset.
+
+    Returns:
+        str: the hexadecimal key of the model.
+    """
+    paths = [
+        *artifact_paths,
+        fitted_pipeline.encoders_path,
+        getattr(fitted_pipeline, "interactions_path", INTERACTIONS_PATH)
+    ]
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(KEY_VERSION.encode("utf-8"))
+    for path in paths:
+        digest.update(
+            (hash_file(path) if os.path.exists(path) else "").encode("utf-8")
+        )
+    return digest.hexdigest()
+
+
+class PredictionCache:
+    """The PredictionCache class stores the predictions of the rows of a
+        model on disk, keyed by the hash of each row.
+    """
+    def __init__(self, path: str, key: str, max_rows: int = 5_000_000):
+        """Open the cache, removing its entries if they belong to another
+            model.
+
+        Args:
+            path (str): the relative path of the SQLite file.
+            key (str): the key of the model.
+            max_rows (int): the maximum number of predictions stored.
+        """
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.path = path
+        self.key = key
+        self.max_rows = max_rows
+        self.hits = 0
+        self.misses = 0
+        self.seconds_saved = 0.0
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(
+            "CREATE TABLE IF NOT EXISTS meta ("
+            "name TEXT PRIMARY KEY, value TEXT);"
+            "CREATE TABLE IF NOT EXISTS predictions ("
+            "row_hash INTEGER PRIMARY KEY, price REAL, used INTEGER);"
+            "CREATE INDEX IF NOT EXISTS predictions_used "
+            "ON predictions (used);"
+        )
+        with self.connection:
+            if self.__meta("key") != key:
+                if self.__meta("key") is not None:
+                    logging.info("The model changed, the cached predictions "
+                                 "are removed.")
+                self.connection.execute("DELETE FROM predictions")
+                self.connection.execute("DELETE FROM meta")
+                self.__set_meta("key", key)
+            # each run marks the rows it uses, the oldest runs are evicted
+            self.run = int(self.__meta("run") or 0) + 1
+            self.__set_meta("run", str(self.run))
+
+    def __meta(self, name: str) -> Optional[str]:
+        """Read a value of the meta table.
+
+        Args:
+            name (str): the name of the value.
+
+        Returns:
+            str: the value, or None if it is not stored.
+        """
+        found = self.connection.execute(
+            "SELECT value FROM meta WHERE name = ?", (name,)
+        ).fetchone()
+        return None if found is None else found[0]
+
+    def __set_meta(self, name: str, value: str):
+        """Store a value of the meta table.
+
+        Args:
+            name (str): the name of the value.
+            value (str): the value.
+        """
+        self.connection.execute(
+            "INSERT OR REPLACE INTO meta VALUES (?, ?)", (name, value)
+        )
+
+    def seconds_per_row(self) -> float:
+        """Read the time spent to process and predict a row by the last run
+            with misses.
+
+        Returns:
+            float: the seconds per row, 0 if no row was predicted yet.
+        """
+        return float(self.__meta("seconds_per_row") or 0.0)
+
+    def get(self, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Read the predictions of the rows which are cached, marking them
+            as used by this run.
+
+        Args:
+            rows (np.ndarray): the hash of each row.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: the prediction of each row, NaN for
+            the misses, and whether each row was cached.
+        """
+        unique = np.unique(rows)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS wanted "
+                "(row_hash INTEGER PRIMARY KEY)"
+            )
+            self.connection.execute("DELETE FROM wanted")
+            self.connection.executemany(
+                "INSERT INTO wanted VALUES (?)", zip(unique.tolist())
+            )
+            found = self.connection.execute(
+                "SELECT p.row_hash, p.price FROM predictions p "
+                "JOIN wanted w ON p.row_hash = w.row_hash"
+            ).fetchall()
+            self.connection.execute(
+                "UPDATE predictions SET used = ? WHERE row_hash IN "
+                "(SELECT row_hash FROM wanted)", (self.run,)
+            )
+        cached = pd.Series(
+            [price for _, price in found],
+            index=pd.Index([row for row, _ in found], dtype=np.int64),
+            dtype=np.float64
+        )
+        price = cached.reindex(rows).to_numpy()
+        return price, ~np.isnan(price)
+
+    def put(self, rows: np.ndarray, price: np.ndarray, seconds: float):
+        """Store the predictions of the misses of this run, and evict the
+            ones used least recently when the cache is full.
+
+        Args:
+            rows (np.ndarray): the hash of each row predicted.
+            price (np.ndarray): the prediction of each row.
+            seconds (float): the time spent to process and predict them.
+        """
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?)",
+                zip(rows.tolist(), price.tolist(), [self.run] * len(rows))
+            )
+            if len(rows):
+                self.__set_meta("seconds_per_row", str(seconds / len(rows)))
+            stored = self.connection.execute(
+                "SELECT COUNT(*) FROM predictions"
+            ).fetchone()[0]
+            if stored > self.max_rows:
+                self.connection.execute(
+                    "DELETE FROM predictions WHERE row_hash IN (SELECT "
+                    "row_hash FROM predictions ORDER BY used LIMIT ?)",
+                    (stored - self.max_rows,)
+                )
+                logging.info("%s cached predictions evicted.",
+                             stored - self.max_rows)
+
+    def close(self):
+        """Close the SQLite file."""
+        self.connection.close()
+
+    def __enter__(self) -> "PredictionCache":
+        """Use the cache as a context manager, which closes it.
+
+        Returns:
+            PredictionCache: the cache.
+        """
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close the cache when the context ends."""
+        self.close()
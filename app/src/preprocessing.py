@@ -1,16 +1,32 @@
 """Data preprocesser
 
 This script allows the user to encode variables of a given dataframe
-using a predefined set of variables and levels with the Ordinal encoder
+using a predefined set of variables and levels with an ordinal encoding
 operation. Also allows the user to encode a set of desired categorical
 variables with the Label encoder operation.
 
-In addition to those functions, this scripts implements a predefined
-interations between variables, allowing the user to generate
-new variables from the original in the dataset given.
+In addition to those functions, this scripts implements the interactions
+between variables declared in the interactions.json file, allowing the user
+to generate new variables from the original in the dataset given. The file
+is compiled once into a plan, which computes every new variable into a
+single block allocated at once, without temporary columns.
 
-It uses the following libraries: pandas for data manipulation, json to
-read external data, and scikit-learn to perform the encoding process.
+Every function that modifies a dataframe accepts an inplace flag. When it is
+set, the dataframe given is used as the working buffer and mutated, instead
+of working on a copy.
+
+The categories of the map_encoders.json file and the plan of the
+interactions.json file are read once per process and reused until the
+files are modified.
+
+The encoded codes can be stored with the smallest integer type able to hold
+them, and a processed dataframe can be converted into a single C-contiguous
+float32 matrix, the type used internally by the scikit-learn forests, so
+they consume it without converting it again.
+
+It uses the following libraries: pandas and numpy for data manipulation,
+json to read external data, and scikit-learn to perform the label encoding
+process.
 
 This script can also be imported as a module.
 """
@@ -18,76 +34,119 @@ This script can also be imported as a module.
 # importing needed libraries
 import json
 import logging
-from typing import List
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from pandas import DataFrame
-from sklearn.preprocessing import LabelEncoder, OrdinalEncoder
+import numpy as np
+from pandas import CategoricalDtype, DataFrame, Index
 
+# the map_encoders.json file is located relative to the app folder, so it
+# is found no matter the working directory
+ENCODERS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "msc", "map_encoders.json"
+)
+
+# the interactions.json file is located next to the map_encoders.json file
+INTERACTIONS_PATH = os.path.join(
+    os.path.dirname(ENCODERS_PATH), "interactions.json"
+)
+
+# operations of the interactions and the ufunc which combines their columns
+OPERATIONS = {"sum": np.add, "product": np.multiply}
+
+# integer types tried, from the smallest, to store the encoded codes
+CODE_DTYPES = [np.int8, np.int16, np.int32, np.int64]
+
+# compiled categories of each encoders file, keyed by its path and stored
+# with the modification time of the file when it was read
+__ENCODERS_CACHE: Dict[str, Tuple[int, Dict[str, Index]]] = {}
+
+# compiled plan of each interactions file, keyed by its path and stored with
+# the modification time of the file when it was read
+__INTERACTIONS_CACHE: Dict[
+    str, Tuple[int, List[Tuple[str, Any, List[str]]]]
+] = {}
 
-def __encode_variable(
-            data: DataFrame,
-            column_name: str,
-            categories: List[str]
-        ):
-    """Performs the encoding of a variable on a given dataframe by using
-        a list of categories.
+
+def read_encoders(path: str = ENCODERS_PATH):
+    """Read the predefined categories of the ordinal variables.
+
+    The file is parsed once per process and the categories of each variable
+    are compiled into an index, whose lookup table is reused by every call.
+    The file is read again only when its modification time changes.
 
     Args:
-        data (DataFrame): a dataframe to be used for the encoding.
-        column_name (str): the column desired to be encoded.
-        categories (List[str]): the list of categories to encode the
-        column of the dataframe given.
+        path (str): the path of the JSON file with the categories.
 
     Returns:
-        pandas.core.series.Series: the column encoded with the
-        using the categories given.
+        encoders (Dict[str, Index]): the ordered categories of each
+        variable present in the file.
     """
-    # encode the column given with the levels proposed
-    ordinal_encoder = OrdinalEncoder(categories=[categories])
-    return ordinal_encoder.fit_transform(data[[column_name]])
+    modified = os.stat(path).st_mtime_ns
+    cached = __ENCODERS_CACHE.get(path)
+    if cached is not None and cached[0] == modified:
+        return cached[1]
+    with open(path, encoding="utf-8") as encoders_json:
+        encoders = {
+            column: Index(categories, dtype=object)
+            for column, categories in json.load(encoders_json).items()
+        }
+    __ENCODERS_CACHE[path] = (modified, encoders)
+    return encoders
 
 
-def encode_variables(data: DataFrame):
+def encode_variables(
+            data: DataFrame,
+            inplace: bool = False,
+            path: str = ENCODERS_PATH
+        ):
     """Encode variables using predifined categories from a JSON file.
 
     Args:
         data (DataFrame): a dataframe to be encoded.
+        inplace (bool): whether to encode the dataframe given instead of
+        a copy.
+        path (str): the path of the JSON file with the categories.
 
     Returns:
         data_encoded (DataFrame): the resulting dataframe after encoding
         the variables using the map_encoders.json file.
     """
-    data_encoded = data.copy()
     # read the map_encoders.json file and use its content to encode the
     # variables present in the file.
     try:
-        with open("msc/map_encoders.json", encoding="utf-8") as encoders_json:
-            encoders = json.load(encoders_json)
-            for column, categories in encoders.items():
-                data_encoded[column] = __encode_variable(
-                                                        data=data_encoded,
-                                                        column_name=column,
-                                                        categories=categories
-                                                    )
-            encoders_json.close()
-        return data_encoded
+        encoders = read_encoders(path)
     except FileNotFoundError:
         logging.error("The file with the encoding values was not found.")
         return None
+    data_encoded = encode_with_categories(
+        data, encoders, dtype="float64", inplace=inplace
+    )
+    return data_encoded
 
 
-def encode_categorical_columns(data: DataFrame, columns: List[str]):
+def encode_categorical_columns(
+            data: DataFrame,
+            columns: List[str],
+            inplace: bool = False
+        ):
     """Encode given categorical variables using a label encoder.
 
     Args:
         data (DataFrame): a dataframe to be encoded.
         columns (List[str]): the list of the desired columns to encode.
+        inplace (bool): whether to encode the dataframe given instead of
+        a copy.
 
     Returns:
         data (DataFrame): the resulting DataFrame after encoding the
         given variables.
     """
-    data_encoded = data.copy()
+    # scikit-learn is only imported by the callers of this function, the
+    # pipeline encodes with the vocabularies of fit_label_categories
+    from sklearn.preprocessing import LabelEncoder  # pylint: disable=C0415
+    data_encoded = data if inplace else data.copy()
     label_encoder = LabelEncoder()
     # for each of the columns given, perform the encoding
     for column in columns:
@@ -97,39 +156,207 @@ def encode_categorical_columns(data: DataFrame, columns: List[str]):
     return data_encoded
 
 
-def create_interactions(data: DataFrame):
-    """Generates predefined interactions between variables on a given dataframe.
+def fit_label_categories(data: DataFrame, columns: List[str]):
+    """Learn the vocabulary of given categorical variables, sorted in the same
+        way as a label encoder does.
+
+    Args:
+        data (DataFrame): a dataframe to learn the vocabularies from.
+        columns (List[str]): the list of the desired columns.
+
+    Returns:
+        categories (Dict[str, np.ndarray]): the sorted unique values of each
+        of the columns given.
+    """
+    return {column: np.unique(data[column].to_numpy()) for column in columns}
+
+
+def code_dtype(categories: int) -> np.dtype:
+    """Find the smallest integer type able to store the codes of a number of
+        categories.
+
+    Args:
+        categories (int): the number of categories.
+
+    Returns:
+        np.dtype: the smallest signed integer type.
+    """
+    for dtype in CODE_DTYPES:
+        if categories - 1 <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def encode_with_categories(
+            data: DataFrame,
+            categories: Dict[str, Sequence],
+            dtype: Optional[str] = "float64",
+            inplace: bool = False
+        ):
+    """Encode variables by looking up the position of each value in a set of
+        already known categories.
+
+    Args:
+        data (DataFrame): a dataframe to be encoded.
+        categories (Dict[str, Sequence]): the ordered categories of each
+        of the variables to encode, preferably as an Index to reuse its
+        lookup table.
+        dtype (str): the data type of the encoded columns, or None to use
+        the smallest integer type able to store the codes of each column.
+        inplace (bool): whether to encode the dataframe given instead of
+        a copy.
+
+    Raises:
+        ValueError: if a column has a value not present in its categories.
+
+    Returns:
+        data_encoded (DataFrame): the resulting dataframe after encoding
+        the given variables.
+    """
+    data_encoded = data if inplace else data.copy()
+    for column, column_categories in categories.items():
+        if not isinstance(column_categories, Index):
+            column_categories = Index(column_categories, dtype=object)
+        values = data_encoded[column]
+        if isinstance(values.dtype, CategoricalDtype):
+            # look up each category once and take the codes of the rows,
+            # the code -1 of the missing values takes the last position
+            lookup = np.append(
+                column_categories.get_indexer(values.cat.categories), -1
+            )
+            codes = lookup[values.cat.codes.to_numpy()]
+        else:
+            codes = column_categories.get_indexer(values)
+        if (codes < 0).any():
+            raise ValueError(f"Found unknown categories in column {column}")
+        data_encoded[column] = codes.astype(
+            code_dtype(len(column_categories)) if dtype is None else dtype
+        )
+    return data_encoded
+
+
+def compile_interactions(
+            spec: Dict[str, Dict[str, Any]]
+        ) -> List[Tuple[str, Any, List[str]]]:
+    """Compile the declaration of the interactions into a plan.
+
+    Args:
+        spec (Dict[str, Dict[str, Any]]): the operation, "sum" or
+        "product", and the columns combined by each new variable.
+
+    Raises:
+        ValueError: if an interaction has an unknown operation or no
+        columns.
+
+    Returns:
+        List[Tuple[str, Any, List[str]]]: the name, the ufunc and the
+        columns of each new variable, in the order they were declared.
+    """
+    plan = []
+    for name, interaction in spec.items():
+        operation = OPERATIONS.get(interaction.get("operation"))
+        columns = list(interaction.get("columns", []))
+        if operation is None or not columns:
+            logging.error("The interaction %s is not valid.", name)
+            raise ValueError(
+                f"The interaction {name} needs columns and one of the "
+                f"operations {sorted(OPERATIONS)}."
+            )
+        plan.append((name, operation, columns))
+    return plan
+
+
+def read_interactions(
+            path: str = INTERACTIONS_PATH
+        ) -> List[Tuple[str, Any, List[str]]]:
+    """Read and compile the interactions file, reusing the plan compiled
+        before while the file is not modified.
+
+    Args:
+        path (str): the path of the JSON file with the interactions.
+
+    Returns:
+        List[Tuple[str, Any, List[str]]]: the plan of the interactions.
+    """
+    modified = os.stat(path).st_mtime_ns
+    cached = __INTERACTIONS_CACHE.get(path)
+    if cached is not None and cached[0] == modified:
+        return cached[1]
+    with open(path, encoding="utf-8") as interactions_json:
+        plan = compile_interactions(json.load(interactions_json))
+    __INTERACTIONS_CACHE[path] = (modified, plan)
+    return plan
+
+
+def create_interactions(
+            data: DataFrame,
+            inplace: bool = False,
+            plan: Optional[List[Tuple[str, Any, List[str]]]] = None
+        ):
+    """Generates the interactions between variables on a given dataframe.
+
+    Every new variable is computed as float64 into a column of a single
+    block, combining the columns of its interaction with the ufunc of its
+    operation directly into the block.
 
     Args:
         data (DataFrame): the base dataframe on which the interactions will
         be created.
+        inplace (bool): whether to add the interactions to the dataframe
+        given instead of a copy.
+        plan (List[Tuple[str, Any, List[str]]]): the compiled interactions,
+        by default the ones of the interactions.json file.
 
     Returns:
         data_interactions: the resulting dataframe with the columns created
-        from the predefined interactions.
+        from the interactions.
     """
-    data_interactions = data.copy()
-    # multiply columns
-    data_interactions['BsmtRating'] = (
-        data_interactions['BsmtCond'] * data_interactions['BsmtQual']
-    )
-    data_interactions['ExterRating'] = (
-        data_interactions['ExterCond'] * data_interactions['ExterQual']
-    )
-    data_interactions['BsmtFinTypeRating'] = (
-        data_interactions['BsmtFinType1'] * data_interactions['BsmtFinType2']
-    )
-    # sum columns
-    data_interactions['BsmtBath'] = (
-        data_interactions['BsmtFullBath'] + data_interactions['BsmtHalfBath']
-    )
-    data_interactions['Bath'] = (
-        data_interactions['FullBath'] + data_interactions['HalfBath']
-    )
-    data_interactions['PorchArea'] = (
-        data_interactions['OpenPorchSF'] +
-        data_interactions['EnclosedPorch'] +
-        data_interactions['3SsnPorch'] +
-        data_interactions['ScreenPorch']
+    plan = read_interactions() if plan is None else plan
+    # column-major, so each new variable is a contiguous column
+    block = np.empty((len(data), len(plan)), dtype=np.float64, order="F")
+    for position, (_, operation, columns) in enumerate(plan):
+        result = block[:, position]
+        result[:] = data[columns[0]].to_numpy()
+        for column in columns[1:]:
+            # the small integer codes are combined as float64, so they do
+            # not overflow their type
+            operation(
+                result, data[column].to_numpy(), out=result, dtype=np.float64
+            )
+    names = [name for name, _, _ in plan]
+    if not inplace:
+        data = data.copy()
+    # a single insertion, which does not fragment the dataframe
+    data[names] = block
+    return data
+
+
+def feature_matrix(
+            data: DataFrame,
+            columns: Optional[Sequence[str]] = None,
+            out: Optional[np.ndarray] = None
+        ) -> np.ndarray:
+    """Convert a processed dataframe into a single C-contiguous float32
+        matrix, copying each column once.
+
+    Args:
+        data (DataFrame): a dataframe with numeric columns only.
+        columns (Sequence[str]): the columns of the matrix, in order, by
+        default all the columns of the dataframe.
+        out (np.ndarray): a float32 matrix where the values are written,
+        like a block of rows of a larger matrix, instead of a new one.
+
+    Raises:
+        KeyError: if a column is not present in the dataframe.
+
+    Returns:
+        np.ndarray: the matrix with a row per row of the dataframe and a
+        column per column given.
+    """
+    columns = data.columns if columns is None else columns
+    matrix = out if out is not None else np.empty(
+        (len(data), len(columns)), dtype=np.float32, order="C"
     )
-    return data_interactions
+    for position, column in enumerate(columns):
+        matrix[:, position] = data[column].to_numpy()
+    return matrix
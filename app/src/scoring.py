@@ -0,0 +1,281 @@
+"""Predictions scoring
+
+This script allows the user to generate the predictions of a trained model
+for a dataset, and to score a csv file with a model and its fitted pipeline
+saved as artifacts, without training the model again.
+
+A csv file can also be scored in a streaming mode, which reads, processes
+and predicts the file by chunks of rows and appends the predictions of each
+chunk to the results, so the memory used depends on the size of the chunks
+and not on the size of the file.
+
+The models trained with the feature matrix of the pipeline receive the
+float32 matrix of each dataset, while the models trained with a dataframe,
+saved before the matrix was introduced, keep receiving their columns.
+
+When a whole file is scored by a model trained with the feature matrix, the
+rows can be processed by a pool of workers with the n_jobs argument.
+
+The csv files are read with the ingestion module, so only the columns used
+by the fitted pipeline are parsed and the categorical ones are read with the
+category type.
+
+With a cache of predictions, the rows already scored by the same model are
+read from it, and only the rest are processed by the pipeline and predicted.
+
+It uses pandas for data manipulation.
+
+This script can also be imported as a module.
+"""
+# importing needed libraries
+import logging
+import time
+from typing import Any, Optional, Union
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+# importing needed modules
+from src import instrumentation as instr
+from src.ingestion import pipeline_read_options
+from src.parallel import transform_partitioned
+from src.predictions import PredictionCache, hash_rows
+
+
+def model_input(
+            model: Any,
+            fitted_pipeline: Any,
+            final_data: pd.DataFrame
+        ) -> Union[np.ndarray, pd.DataFrame]:
+    """Prepare a dataframe processed by the pipeline as the input of a model.
+
+    Args:
+        model (Any): a pretrained model.
+        fitted_pipeline (Any): the pipeline fitted with the train dataset.
+        final_data (pd.DataFrame): a dataframe processed by the pipeline.
+
+    Returns:
+        Union[np.ndarray, pd.DataFrame]: the feature matrix, or the columns
+        of the dataframe used to train the model when it was trained with
+        a dataframe.
+    """
+    features = getattr(model, "feature_names_in_", None)
+    if features is not None:
+        return final_data[features]
+    return fitted_pipeline.to_matrix(final_data)
+
+
+def generate_submissions(
+            ids: pd.core.series.Series,
+            model: RandomForestRegressor,
+            data: Union[np.ndarray, pd.DataFrame],
+            path_to_save: str
+        ):
+    """Generate a new dataset with the predictions generated from the
+        dataframe given.
+
+    Args:
+        ids (pd.core.series.Series): the ids to index the results.
+        model (RandomForestRegressor): a pretrained random forest model.
+        data (Union[np.ndarray, pd.DataFrame]): the feature matrix, or the
+        dataframe, which will be used to generate the predictions.
+        path_to_save (str): the relative path where the results are going
+        to be saved.
+
+    Output:
+        a csv file with the predictions indexed by the ids given.
+    """
+    # generate predictions using a given model
+    with instr.stage("predict", data) as current:
+        price = current.output(model.predict(data))
+    write_submissions(ids, price, path_to_save)
+
+
+def write_submissions(
+            ids: pd.core.series.Series,
+            price: np.ndarray,
+            path_to_save: str
+        ):
+    """Save the predictions indexed by the ids given.
+
+    Args:
+        ids (pd.core.series.Series): the ids to index the results.
+        price (np.ndarray): the prediction of each id.
+        path_to_save (str): the relative path where the results are going
+        to be saved.
+
+    Output:
+        a csv file with the predictions indexed by the ids given.
+    """
+    # create the predictions dataset using the ids to index each entry
+    submission = pd.DataFrame({
+        "Id": ids,
+        "SalePrice": price
+    })
+    with instr.stage("write", submission):
+        submission.to_csv(path_to_save, index=False)
+
+
+def predict_cached(
+            model: Any,
+            fitted_pipeline: Any,
+            data: pd.DataFrame,
+            cache: PredictionCache,
+            id_column: str = "Id"
+        ) -> np.ndarray:
+    """Predict the rows of a dataframe, processing and predicting only the
+        rows which are not in the cache of predictions.
+
+    Args:
+        model (Any): a pretrained model.
+        fitted_pipeline (Any): the pipeline fitted with the train dataset.
+        data (pd.DataFrame): the rows, as read from the csv file.
+        cache (PredictionCache): the cache of the predictions of the model.
+        id_column (str): the column which is not hashed.
+
+    Returns:
+        np.ndarray: the prediction of each row, identical to the one of the
+        whole dataframe predicted at once.
+    """
+    rows = hash_rows(data, [id_column])
+    with instr.stage("cache_lookup", data) as current:
+        price, hit = cache.get(rows)
+        current.output(price)
+    missing = np.flatnonzero(~hit)
+    if len(missing):
+        start = time.perf_counter()
+        features = model_input(
+            model, fitted_pipeline,
+            fitted_pipeline.transform(data.iloc[missing])
+        )
+        with instr.stage("predict", features) as current:
+            price[missing] = current.output(model.predict(features))
+        cache.put(rows[missing], price[missing], time.perf_counter() - start)
+    hits = len(rows) - len(missing)
+    cache.hits += hits
+    cache.misses += len(missing)
+    cache.seconds_saved += hits * cache.seconds_per_row()
+    logging.info("%s predictions read from the cache, %s rows predicted.",
+                 hits, len(missing))
+    return price
+
+
+def stream_submissions(
+            model: Any,
+            fitted_pipeline: Any,
+            input_path: str,
+            path_to_save: str,
+            chunksize: int,
+            id_column: str = "Id",
+            cache: Optional[PredictionCache] = None
+        ):
+    """Generate the predictions of a csv file by chunks of rows, appending
+        the predictions of each chunk to the results file.
+
+    Args:
+        model (Any): a pretrained model.
+        fitted_pipeline (Any): the pipeline fitted with the train dataset.
+        input_path (str): the relative path of the csv file to score.
+        path_to_save (str): the relative path where the results are going
+        to be saved.
+        chunksize (int): the number of rows of each chunk.
+        id_column (str): the column used to index the results.
+        cache (PredictionCache): the cache of the predictions of the model,
+        or None to predict every row.
+
+    Output:
+        a csv file with the predictions indexed by the ids of the input,
+        identical to the one generated by generate_submissions.
+    """
+    options = pipeline_read_options(
+        input_path, fitted_pipeline, keep=[id_column]
+    )
+    with pd.read_csv(input_path, chunksize=chunksize, **options) as chunks:
+        for number, chunk in enumerate(chunks):
+            # the ids are taken before the chunk reaches the pipeline, as a
+            # pipeline in the inplace mode deletes the dropped columns
+            ids = chunk[id_column]
+            if cache is not None:
+                price = predict_cached(
+                    model, fitted_pipeline, chunk, cache, id_column
+                )
+            else:
+                final_chunk = model_input(
+                    model, fitted_pipeline, fitted_pipeline.transform(chunk)
+                )
+                with instr.stage(
+                            "predict", final_chunk, chunk=number
+                        ) as current:
+                    price = current.output(model.predict(final_chunk))
+            submission = pd.DataFrame({
+                "Id": ids,
+                "SalePrice": price
+            })
+            # the first chunk creates the file and writes the header
+            with instr.stage("write", submission, chunk=number):
+                submission.to_csv(
+                    path_to_save,
+                    index=False,
+                    mode="w" if number == 0 else "a",
+                    header=number == 0
+                )
+
+
+def score_csv(
+            model: Any,
+            fitted_pipeline: Any,
+            input_path: str,
+            path_to_save: str,
+            id_column: str = "Id",
+            chunksize: Optional[int] = None,
+            engine: Optional[str] = None,
+            n_jobs: int = 1,
+            cache: Optional[PredictionCache] = None
+        ):
+    """Generate the predictions of a csv file with a trained model and its
+        fitted pipeline.
+
+    Args:
+        model (Any): a pretrained model.
+        fitted_pipeline (Any): the pipeline fitted with the train dataset.
+        input_path (str): the relative path of the csv file to score.
+        path_to_save (str): the relative path where the results are going
+        to be saved.
+        id_column (str): the column used to index the results.
+        chunksize (int): the number of rows of each chunk to score the file
+        in the streaming mode, or None to read the whole file at once.
+        engine (str): the parser engine used to read the whole file, "c" or
+        "pyarrow". The streaming mode always uses the c engine.
+        n_jobs (int): the number of workers which process the rows of the
+        whole file, -1 for all the cores. The streaming mode and the models
+        trained with a dataframe always use a single worker.
+        cache (PredictionCache): the cache of the predictions of the model,
+        or None to predict every row. The misses are processed by a single
+        worker.
+
+    Output:
+        a csv file with the predictions indexed by the ids of the input.
+    """
+    if chunksize is not None:
+        stream_submissions(
+            model, fitted_pipeline, input_path, path_to_save, chunksize,
+            id_column, cache
+        )
+        return
+    data = pd.read_csv(input_path, **pipeline_read_options(
+        input_path, fitted_pipeline, keep=[id_column], engine=engine
+    ))
+    ids = data[id_column]
+    if cache is not None:
+        write_submissions(ids, predict_cached(
+            model, fitted_pipeline, data, cache, id_column
+        ), path_to_save)
+        return
+    if n_jobs != 1 and getattr(model, "feature_names_in_", None) is None:
+        features = transform_partitioned(fitted_pipeline, data, n_jobs)
+    else:
+        features = model_input(
+            model, fitted_pipeline, fitted_pipeline.transform(data)
+        )
+    generate_submissions(ids, model, features, path_to_save)
@@ -0,0 +1,299 @@
+"""Hyperparameter search
+
+This script implements a search of the parameters of the random forest by
+successive halving. Every candidate of a grid of parameters is evaluated
+with cross validation over a small random subset of the rows, and only the
+best third of them, by default, is evaluated again with three times more
+rows, until the last candidates are evaluated with all the rows. So most
+of the candidates are discarded after being trained with a small fraction
+of the data.
+
+The feature matrix is processed once and copied to shared memory, where the
+workers of a process pool read it without copying it, and the candidates of
+each round are evaluated in parallel, one forest per worker. Each trial is
+appended as a JSON line to a trials.jsonl file as soon as it finishes, and
+the best candidate is written to a best.json file in the same folder.
+
+It uses scikit-learn for the machine learning model, numpy and the shared
+memory helpers of the parallel module to share the data between the
+workers.
+
+To search the parameters is as follows:
+trials = successive_halving(X, y, expand_grid(grid), output="results/search")
+
+This script can also be imported as a module.
+"""
+# importing needed libraries
+import itertools
+import json
+import logging
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import r2_score
+from sklearn.model_selection import KFold
+
+# importing needed modules
+from src import instrumentation as instr
+from src import training as trn
+from src.parallel import SHARED, attach_arrays, release_arrays, share_arrays
+
+# grid searched when none is given
+DEFAULT_GRID = {
+    "max_leaf_nodes": [50, 100, 250, 500, 1000],
+    "max_features": [1.0, 0.5, "sqrt"],
+    "min_samples_leaf": [1, 2, 5]
+}
+
+# the first round never uses less rows than these
+MIN_ROWS = 100
+
+def parse_value(value: str) -> Any:
+    """Convert a value of the grid given as text into its Python type.
+
+    Args:
+        value (str): the value, like 250, 0.5, sqrt or None.
+
+    Returns:
+        Any: the integer, float, None or string value.
+    """
+    if value == "None":
+        return None
+    for kind in (int, float):
+        try:
+            return kind(value)
+        except ValueError:
+            pass
+    return value
+
+
+def parse_grid(specs: List[str]) -> Dict[str, List[Any]]:
+    """Build a grid of parameters from name=value,value specifications.
+
+    Args:
+        specs (List[str]): the values of each parameter, for example
+        ["max_leaf_nodes=100,250", "max_features=1.0,sqrt"].
+
+    Raises:
+        ValueError: if a specification has no name or no values.
+
+    Returns:
+        Dict[str, List[Any]]: the values of each parameter.
+    """
+    grid = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if not name or not values:
+            logging.error("The parameter %s of the grid is not valid.", spec)
+            raise ValueError(f"Expected name=value[,value...], got {spec}.")
+        grid[name.strip()] = [
+            parse_value(value.strip()) for value in values.split(",")
+        ]
+    return grid
+
+
+def expand_grid(grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """Combine the values of a grid into the candidates of the search.
+
+    Args:
+        grid (Dict[str, List[Any]]): the values of each parameter.
+
+    Raises:
+        ValueError: if the grid does not include max_leaf_nodes.
+
+    Returns:
+        List[Dict[str, Any]]: the parameters of each candidate.
+    """
+    if "max_leaf_nodes" not in grid:
+        logging.error("The grid does not include max_leaf_nodes.")
+        raise ValueError("The grid has to include max_leaf_nodes.")
+    names = list(grid)
+    return [
+        dict(zip(names, values))
+        for values in itertools.product(*(grid[name] for name in names))
+    ]
+
+
+def halving_schedule(
+            candidates: int,
+            rows: int,
+            eta: int = 3,
+            min_rows: int = MIN_ROWS
+        ) -> List[Tuple[int, int]]:
+    """Compute the candidates and the rows of each round of the search.
+
+    Args:
+        candidates (int): the number of candidates of the first round.
+        rows (int): the number of rows of the dataset.
+        eta (int): the factor by which the candidates are reduced, and the
+        rows increased, after each round.
+        min_rows (int): the minimum rows of the first round.
+
+    Returns:
+        List[Tuple[int, int]]: the candidates and the rows of each round,
+        the last one using all the rows.
+    """
+    # the rounds needed to keep a single candidate, limited by the rows
+    rounds = 1 + min(
+        math.floor(math.log(candidates, eta) + 1e-9) if candidates > 1 else 0,
+        math.floor(math.log(max(rows / min_rows, 1), eta) + 1e-9)
+    )
+    schedule = []
+    for step in range(rounds):
+        schedule.append((
+            candidates,
+            max(min(rows, min_rows), rows // eta ** (rounds - 1 - step))
+        ))
+        candidates = max(1, math.ceil(candidates / eta))
+    return schedule
+
+
+def evaluate_trial(
+            params: Dict[str, Any],
+            rows: int,
+            folds: int,
+            seed: int = 0
+        ) -> Dict[str, Any]:
+    """Evaluate a candidate with cross validation over the first rows of
+        the shared arrays, which are shuffled before being shared.
+
+    Args:
+        params (Dict[str, Any]): the parameters of the forest.
+        rows (int): the number of rows used.
+        folds (int): the number of folds of the cross validation.
+        seed (int): the seed of the forests.
+
+    Returns:
+        Dict[str, Any]: the score of each fold, their mean and standard
+        deviation and the time spent.
+    """
+    X, y = SHARED["X"][:rows], SHARED["y"][:rows]
+    start = time.perf_counter()
+    scores = []
+    for train_index, test_index in KFold(folds).split(X):
+        model = trn.build_model(n_jobs=1, **params).set_params(
+            random_state=seed
+        )
+        model.fit(X[train_index], y[train_index])
+        scores.append(float(r2_score(y[test_index], model.predict(
+            X[test_index]
+        ))))
+    return {
+        "params": params,
+        "rows": rows,
+        "folds": folds,
+        "scores": scores,
+        "mean_score": float(np.mean(scores)),
+        "std_score": float(np.std(scores)),
+        "time_s": round(time.perf_counter() - start, 6),
+        "pid": os.getpid()
+    }
+
+
+def successive_halving(
+            X: pd.DataFrame,
+            y: pd.Series,
+            candidates: List[Dict[str, Any]],
+            folds: int = 5,
+            eta: int = 3,
+            min_rows: int = MIN_ROWS,
+            n_jobs: int = -1,
+            output: Optional[str] = None,
+            seed: int = 0
+        ) -> List[Dict[str, Any]]:
+    """Search the best candidate by successive halving, evaluating the
+        candidates of each round in parallel.
+
+    Args:
+        X (pd.DataFrame): the input variables.
+        y (pd.Series): the output variable.
+        candidates (List[Dict[str, Any]]): the parameters of each candidate.
+        folds (int): the number of folds of each cross validation.
+        eta (int): the factor by which the candidates are reduced, and the
+        rows increased, after each round.
+        min_rows (int): the minimum rows of the first round.
+        n_jobs (int): the number of workers, -1 for all the cores.
+        output (str): the folder of the trials.jsonl and best.json files,
+        or None to not write them.
+        seed (int): the seed used to shuffle the rows and of the forests.
+
+    Returns:
+        List[Dict[str, Any]]: every trial, in the order they finished.
+    """
+    schedule = halving_schedule(len(candidates), len(X), eta, min_rows)
+    if output is not None:
+        os.makedirs(output, exist_ok=True)
+        with open(
+                    os.path.join(output, "trials.jsonl"), "w", encoding="utf-8"
+                ):
+            pass
+    # the rows are shuffled once, so the first rows of every round are a
+    # random subset, and the forests read float32 like they do internally
+    order = np.random.default_rng(seed).permutation(len(X))
+    blocks, arrays = share_arrays({
+        "X": np.ascontiguousarray(X.to_numpy(dtype=np.float32)[order]),
+        "y": y.to_numpy(dtype=np.float64)[order]
+    })
+    workers = min(trn.resolve_workers(n_jobs), len(candidates))
+    logging.info(
+        "Searching %s candidates in %s rounds with %s workers.",
+        len(candidates), len(schedule), workers
+    )
+    trials: List[Dict[str, Any]] = []
+    try:
+        with ProcessPoolExecutor(
+                    workers, initializer=attach_arrays, initargs=(arrays,)
+                ) as pool:
+            for step, (_, rows) in enumerate(schedule):
+                with instr.stage("search_round", round=step, rows=rows):
+                    futures = [
+                        pool.submit(evaluate_trial, params, rows, folds, seed)
+                        for params in candidates
+                    ]
+                    results = []
+                    for future in as_completed(futures):
+                        trial = {
+                            "trial": len(trials),
+                            "round": step,
+                            **future.result()
+                        }
+                        trials.append(trial)
+                        results.append(trial)
+                        if output is not None:
+                            __append_trial(output, trial)
+                    results.sort(key=lambda trial: -trial["mean_score"])
+                logging.info(
+                    "Round %s with %s rows: best R2 %.4f with %s.",
+                    step, rows, results[0]["mean_score"], results[0]["params"]
+                )
+                if step + 1 < len(schedule):
+                    candidates = [
+                        trial["params"]
+                        for trial in results[:schedule[step + 1][0]]
+                    ]
+    finally:
+        release_arrays(blocks)
+    if output is not None:
+        with open(
+                    os.path.join(output, "best.json"), "w", encoding="utf-8"
+                ) as best_json:
+            json.dump(results[0], best_json, indent=2)
+    return trials
+
+
+def __append_trial(output: str, trial: Dict[str, Any]):
+    """Append a trial to the trials.jsonl file of a search.
+
+    Args:
+        output (str): the folder of the search.
+        trial (Dict[str, Any]): the result of the trial.
+    """
+    with open(
+                os.path.join(output, "trials.jsonl"), "a", encoding="utf-8"
+            ) as trials_json:
+        trials_json.write(json.dumps(trial) + "\n")
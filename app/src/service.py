@@ -0,0 +1,352 @@
+"""Scoring service
+
+This script implements a small HTTP service to score listings with a trained
+model and its fitted pipeline, both loaded once when the service starts.
+The listings received by concurrent requests are grouped into micro-batches
+by the MicroBatcher class, which waits until a batch is full or a maximum
+time has passed since its first listing, so the model generates the
+predictions of the whole batch in a single call. The random forests are
+compiled into packed node arrays when the service starts, which predict the
+small batches of the service faster than scikit-learn.
+
+The service exposes the following endpoints:
+- POST /predict: receives a listing, or a list of listings, as JSON objects
+  with the columns of the train dataset and returns the predicted SalePrice.
+- GET /stats: returns the p50 and p99 latency, the throughput and the size
+  of the batches.
+- GET /health: returns the version of the model being served.
+
+It uses the http.server library of the standard library, pandas for data
+manipulation and numpy to compute the latency percentiles.
+
+To instantiate a new service is as follows:
+example_of_server = make_server(model, fitted_pipeline, "127.0.0.1", 8000)
+
+This script can also be imported as a module.
+"""
+# importing needed libraries
+import json
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# importing needed modules
+from src.forest import compile_model
+from src.scoring import model_input
+
+
+class LatencyStats:
+    """The LatencyStats class keeps the latency of the last requests and the
+        counters needed to report the throughput and the size of the batches.
+    """
+    def __init__(self, window: int = 10000):
+        """Start the counters of the service.
+
+        Args:
+            window (int): the number of last requests used to compute the
+            latency percentiles.
+        """
+        self.latencies = deque(maxlen=window)
+        self.requests = 0
+        self.batches = 0
+        self.batched_rows = 0
+        self.started = time.monotonic()
+        self.lock = threading.Lock()
+
+    def add_request(self, latency: float):
+        """Record the latency of a request.
+
+        Args:
+            latency (float): the latency of the request in seconds.
+        """
+        with self.lock:
+            self.latencies.append(latency)
+            self.requests += 1
+
+    def add_batch(self, rows: int):
+        """Record the size of a batch sent to the model.
+
+        Args:
+            rows (int): the number of listings of the batch.
+        """
+        with self.lock:
+            self.batches += 1
+            self.batched_rows += rows
+
+    def summary(self) -> Dict[str, float]:
+        """Summarize the counters of the service.
+
+        Returns:
+            Dict[str, float]: the p50 and p99 latency in milliseconds, the
+            requests per second and the mean size of the batches.
+        """
+        with self.lock:
+            latencies = np.array(self.latencies, dtype=np.float64)
+            requests, batches = self.requests, self.batches
+            batched_rows = self.batched_rows
+        elapsed = time.monotonic() - self.started
+        p50, p99 = (
+            np.percentile(latencies, [50, 99]) * 1000
+            if len(latencies) else (0.0, 0.0)
+        )
+        return {
+            "requests": requests,
+            "batches": batches,
+            "mean_batch_size": batched_rows / batches if batches else 0.0,
+            "p50_ms": float(p50),
+            "p99_ms": float(p99),
+            "throughput_rps": requests / elapsed if elapsed else 0.0
+        }
+
+
+class MicroBatcher:
+    """The MicroBatcher class groups the listings submitted by several threads
+        into batches, which are scored by a single background thread.
+    """
+    def __init__(
+                self,
+                predict_batch: Callable[[List[Dict[str, Any]]], np.ndarray],
+                max_batch_size: int = 64,
+                max_wait: float = 0.005,
+                stats: Optional[LatencyStats] = None
+            ):
+        """Store the function to score the batches and the batching rules.
+
+        Args:
+            predict_batch (Callable): a function which receives a list of
+            listings and returns their predictions.
+            max_batch_size (int): the maximum number of listings of a batch.
+            max_wait (float): the maximum time in seconds that a batch waits
+            for more listings after receiving its first one.
+            stats (LatencyStats): the counters where the batches are recorded.
+        """
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.stats = stats
+        self.pending = queue.Queue()
+        self.worker = threading.Thread(target=self.__run, daemon=True)
+        self.running = False
+
+    def start(self):
+        """Start the background thread which scores the batches."""
+        self.running = True
+        self.worker.start()
+
+    def stop(self):
+        """Stop the background thread once the pending batch is scored."""
+        self.running = False
+        self.pending.put(None)
+        self.worker.join()
+
+    def submit(self, listing: Dict[str, Any]) -> Future:
+        """Add a listing to the next batch.
+
+        Args:
+            listing (Dict[str, Any]): the values of the listing.
+
+        Returns:
+            Future: the future result with the prediction of the listing.
+        """
+        future = Future()
+        self.pending.put((listing, future))
+        return future
+
+    def __collect(self, first: tuple) -> list:
+        """Wait for more listings until the batch is full or the maximum
+            time has passed.
+
+        Args:
+            first (tuple): the first listing and future of the batch.
+
+        Returns:
+            list: the listings and futures of the batch.
+        """
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self.pending.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self.pending.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def __score(self, batch: list):
+        """Score a batch and set the result of each future. When the batch
+            fails, each listing is scored alone so a wrong listing does not
+            fail the rest of the batch.
+
+        Args:
+            batch (list): the listings and futures of the batch.
+        """
+        listings = [listing for listing, _ in batch]
+        try:
+            predictions = self.predict_batch(listings)
+        except Exception:  # pylint: disable=broad-except
+            if len(batch) > 1:
+                for item in batch:
+                    self.__score([item])
+                return
+            batch[0][1].set_exception(ValueError("The listing is not valid."))
+            logging.exception("A listing could not be scored.")
+            return
+        if self.stats is not None:
+            self.stats.add_batch(len(batch))
+        for (_, future), prediction in zip(batch, predictions):
+            future.set_result(float(prediction))
+
+    def __run(self):
+        """Score the batches until the batcher is stopped."""
+        while True:
+            item = self.pending.get()
+            if item is None:
+                if not self.running:
+                    return
+                continue
+            self.__score(self.__collect(item))
+
+
+def make_predict_batch(
+            model: Any,
+            fitted_pipeline: Any
+        ) -> Callable[[List[Dict[str, Any]]], np.ndarray]:
+    """Create the function which scores a batch of listings.
+
+    Args:
+        model (Any): a pretrained model.
+        fitted_pipeline (Any): the pipeline fitted with the train dataset.
+
+    Returns:
+        Callable: a function which receives a list of listings and returns
+        their predictions.
+    """
+    columns = getattr(fitted_pipeline, "input_columns_", None)
+    predictor = compile_model(model)
+
+    def predict_batch(listings: List[Dict[str, Any]]) -> np.ndarray:
+        data = pd.DataFrame.from_records(listings)
+        if columns is not None:
+            # the missing values of a listing are filled by the pipeline
+            data = data.reindex(columns=columns)
+        final_data = fitted_pipeline.transform(data)
+        return predictor.predict(
+            model_input(model, fitted_pipeline, final_data)
+        )
+    return predict_batch
+
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    """The ScoringHandler class answers the requests of the service."""
+
+    def __send_json(self, status: int, body: Any):
+        """Send a JSON response.
+
+        Args:
+            status (int): the HTTP status code.
+            body (Any): the object to send as JSON.
+        """
+        content = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Answer the stats and health endpoints."""
+        if self.path == "/stats":
+            self.__send_json(200, self.server.stats.summary())
+        elif self.path == "/health":
+            self.__send_json(200, {"version": self.server.version})
+        else:
+            self.__send_json(404, {"error": "Not found."})
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Answer the predict endpoint."""
+        start = time.perf_counter()
+        if self.path != "/predict":
+            self.__send_json(404, {"error": "Not found."})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length))
+        except ValueError:
+            self.__send_json(400, {"error": "The body is not valid JSON."})
+            return
+        listings = body if isinstance(body, list) else [body]
+        futures = [self.server.batcher.submit(listing) for listing in listings]
+        try:
+            prices = [future.result() for future in futures]
+        except ValueError as error:
+            self.__send_json(400, {"error": str(error)})
+            return
+        self.server.stats.add_request(time.perf_counter() - start)
+        if isinstance(body, list):
+            self.__send_json(200, [{"SalePrice": price} for price in prices])
+        else:
+            self.__send_json(200, {"SalePrice": prices[0]})
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """Send the access log of each request to the logging module."""
+        logging.debug("%s - %s", self.address_string(), format % args)
+
+
+class ScoringServer(ThreadingHTTPServer):
+    """The ScoringServer class answers each request in its own thread and
+        accepts a large backlog of connections from concurrent clients.
+    """
+    daemon_threads = True
+    request_queue_size = 256
+
+
+def make_server(
+            model: Any,
+            fitted_pipeline: Any,
+            host: str = "127.0.0.1",
+            port: int = 8000,
+            max_batch_size: int = 64,
+            max_wait: float = 0.005,
+            version: Optional[str] = None
+        ) -> ScoringServer:
+    """Create the scoring service and start its batcher.
+
+    Args:
+        model (Any): a pretrained model.
+        fitted_pipeline (Any): the pipeline fitted with the train dataset.
+        host (str): the address to listen on.
+        port (int): the port to listen on, 0 to take any free port.
+        max_batch_size (int): the maximum number of listings of a batch.
+        max_wait (float): the maximum time in seconds that a batch waits
+        for more listings.
+        version (str): the version of the model being served.
+
+    Returns:
+        ScoringServer: the server ready to call serve_forever. Its batcher
+        has to be stopped after shutting it down.
+    """
+    server = ScoringServer((host, port), ScoringHandler)
+    server.stats = LatencyStats()
+    server.version = version
+    server.batcher = MicroBatcher(
+        make_predict_batch(model, fitted_pipeline),
+        max_batch_size=max_batch_size,
+        max_wait=max_wait,
+        stats=server.stats
+    )
+    server.batcher.start()
+    return server
@@ -0,0 +1,174 @@
+"""Model training
+
+This script allows the user to create the random forest model and to
+evaluate it with cross validation, distributing the work of both steps
+between a pool of workers. It also keeps a registry of the other models
+which can be compared with the random forest on the same features. The
+workers are split between the folds of the cross validation and the trees
+of each forest, so the total number of busy cores never exceeds the number
+of workers requested.
+
+It uses scikit-learn for the machine learning model and joblib to manage
+the pool of workers.
+
+This script can also be imported as a module.
+"""
+# importing needed libraries
+import logging
+import os
+from typing import Any, Callable, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+from joblib import parallel_backend
+from sklearn.base import clone
+from sklearn.ensemble import (ExtraTreesRegressor,
+                              HistGradientBoostingRegressor,
+                              RandomForestRegressor)
+from sklearn.linear_model import Ridge
+from sklearn.model_selection import cross_validate
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+# names of the supported pools of workers and their joblib backend
+BACKENDS = {
+    "threads": "threading",
+    "processes": "multiprocessing",
+    "loky": "loky"
+}
+
+# models which can be compared, each one created with its default parameters
+MODELS: Dict[str, Callable[[], Any]] = {
+    "random_forest": lambda: RandomForestRegressor(max_leaf_nodes=250),
+    "extra_trees": lambda: ExtraTreesRegressor(max_leaf_nodes=250),
+    "hist_gradient_boosting": HistGradientBoostingRegressor,
+    # the penalty of the coefficients needs features of the same scale
+    "ridge": lambda: make_pipeline(StandardScaler(), Ridge())
+}
+
+
+def resolve_workers(n_jobs: int) -> int:
+    """Translate a joblib-like number of workers into a positive number.
+
+    Args:
+        n_jobs (int): the number of workers, where -1 means all the cores
+        and -2 all the cores but one.
+
+    Returns:
+        int: the actual number of workers.
+    """
+    cores = os.cpu_count() or 1
+    if n_jobs < 0:
+        return max(1, cores + 1 + n_jobs)
+    return max(1, n_jobs)
+
+
+def split_workers(n_jobs: int, folds: int) -> Tuple[int, int]:
+    """Split a number of workers between the folds and the trees.
+
+    Args:
+        n_jobs (int): the total number of workers.
+        folds (int): the number of folds of the cross validation.
+
+    Returns:
+        Tuple[int, int]: the workers used to run the folds at the same time
+        and the workers used by each forest to build its trees.
+    """
+    workers = resolve_workers(n_jobs)
+    folds_jobs = min(folds, workers)
+    return folds_jobs, max(1, workers // folds_jobs)
+
+
+def build_model(
+            max_leaf_nodes: int,
+            n_jobs: int = 1,
+            **params
+        ) -> RandomForestRegressor:
+    """Create a new random forest regressor.
+
+    Args:
+        max_leaf_nodes (int): the number of max leaf nodes of each tree.
+        n_jobs (int): the number of workers used to build the trees.
+        **params: other parameters of the forest, like max_features.
+
+    Returns:
+        RandomForestRegressor: the model ready to be trained.
+    """
+    return RandomForestRegressor(
+        max_leaf_nodes=max_leaf_nodes, n_jobs=resolve_workers(n_jobs),
+        **params
+    )
+
+
+def create_model(name: str, n_jobs: int = 1, seed: int = 0) -> Any:
+    """Create a new model of the registry.
+
+    Args:
+        name (str): the name of the model in the registry.
+        n_jobs (int): the number of workers used by the model, if it can
+        use more than one.
+        seed (int): the seed of the model, if it is random.
+
+    Raises:
+        ValueError: if the model is not in the registry.
+
+    Returns:
+        Any: the model ready to be trained.
+    """
+    if name not in MODELS:
+        logging.error("The model %s is not in the registry.", name)
+        raise ValueError(
+            f"Unknown model {name}, expected one of {sorted(MODELS)}."
+        )
+    model = MODELS[name]()
+    params = model.get_params()
+    if "n_jobs" in params:
+        model.set_params(n_jobs=resolve_workers(n_jobs))
+    if "random_state" in params:
+        model.set_params(random_state=seed)
+    return model
+
+
+def cross_validate_model(
+            model: RandomForestRegressor,
+            X: pd.DataFrame,
+            y: pd.Series,
+            folds: int = 10,
+            n_jobs: int = 1,
+            backend: str = "loky"
+        ) -> np.ndarray:
+    """Evaluate a model with cross validation, running the folds in parallel.
+
+    Args:
+        model (RandomForestRegressor): the model to be evaluated.
+        X (pd.DataFrame): the input variables.
+        y (pd.Series): the output variable.
+        folds (int): the number of folds.
+        n_jobs (int): the total number of workers.
+        backend (str): the pool of workers used to run the folds, one of
+        threads, processes or loky.
+
+    Returns:
+        np.ndarray: the score of each fold.
+    """
+    folds_jobs, trees_jobs = split_workers(n_jobs, folds)
+    fold_model = clone(model).set_params(n_jobs=trees_jobs)
+    logging.info(
+        "Cross validation with %s folds in parallel and %s workers per "
+        "forest using the %s backend.", folds_jobs, trees_jobs, backend
+    )
+    # the backend only applies to the folds, each forest keeps using threads
+    with parallel_backend(BACKENDS[backend], n_jobs=folds_jobs):
+        results = cross_validate(
+            fold_model, X, y, cv=folds, n_jobs=folds_jobs
+        )
+    for fold, (fit_time, score_time, score) in enumerate(zip(
+                results["fit_time"],
+                results["score_time"],
+                results["test_score"]
+            )):
+        logging.info(
+            "Fold %s: fit %.3fs, score %.3fs, R2 %.4f.",
+            fold, fit_time, score_time, score
+        )
+    return results["test_score"]
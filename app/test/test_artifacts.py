@@ -0,0 +1,60 @@
+"""Model artifacts testing
+
+This script test the functions to save and load a trained model with its
+fitted pipeline. A fixture was defined in order to return the path
+associated to the source dataset, and the artifacts are saved under a
+temporary folder given by pytest.
+
+The expected result is that the loaded model and pipeline generate the same
+predictions as the ones that were saved.
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from main import GOAL_VARIABLE, build_pipeline
+from src import artifacts as art
+from src import training as trn
+
+
+@pytest.fixture(scope="module", name="data_path")
+def path():
+    """return the path of the train dataset."""
+    return "data/train.csv"
+
+
+def test_save_and_load_artifacts(data_path, tmp_path):
+    """Save a small model and load it back as the last version.
+
+    Args:
+        data_path (str): the path where the dataset is located.
+        tmp_path (Path): a temporary folder given by pytest.
+
+    Raises:
+        asserr: AssertionError if the loaded objects predict differently.
+    """
+    data = pd.read_csv(data_path)
+    fitted_pipeline = build_pipeline()
+    final_data = fitted_pipeline.fit_transform(data)
+    X = final_data.drop(GOAL_VARIABLE, axis=1)
+    model = trn.build_model(max_leaf_nodes=10).set_params(n_estimators=5)
+    model.fit(X, final_data[GOAL_VARIABLE])
+    version = art.save_artifacts(
+        model, fitted_pipeline, str(tmp_path), metadata={"cv_score": 0.5}
+    )
+    try:
+        loaded_model, loaded_pipeline, metadata = art.load_artifacts(
+            str(tmp_path)
+        )
+        assert metadata["version"] == version
+        assert metadata["cv_score"] == 0.5
+        loaded_X = loaded_pipeline.transform(data.drop(GOAL_VARIABLE, axis=1))
+        np.testing.assert_array_equal(
+            loaded_model.predict(loaded_X), model.predict(X)
+        )
+    except AssertionError as asserr:
+        logging.error("The artifacts were not saved or loaded well.")
+        raise asserr
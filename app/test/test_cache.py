@@ -0,0 +1,53 @@
+"""Tests of the datasets cache."""
+# importing needed libraries
+import os
+
+import pandas as pd
+
+# importing needed modules
+from main import CATEGORICAL_COLUMNS, build_pipeline
+from src import ingestion as ing
+from src.cache import DatasetCache
+
+
+def test_frames_round_trip(tmp_path):
+    """The cached frames keep their values and data types."""
+    data = ing.read_dataset("data/train.csv", categorical=CATEGORICAL_COLUMNS)
+    final_data = build_pipeline().fit_transform(data)
+    cache = DatasetCache(str(tmp_path))
+    for name, frame in (("raw", data), ("final", final_data)):
+        key = cache.key(["data/train.csv"], {"stage": name})
+        assert cache.get_frame(key) is None
+        cache.put_frame(key, frame)
+        pd.testing.assert_frame_equal(cache.get_frame(key), frame)
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_key_changes_with_content_and_params(tmp_path):
+    """The key depends on the content of the files and the parameters."""
+    source = tmp_path / "source.csv"
+    source.write_text("a,b\n1,2\n")
+    key = DatasetCache.key([str(source)], {"engine": "c"})
+    assert key == DatasetCache.key([str(source)], {"engine": "c"})
+    assert key != DatasetCache.key([str(source)], {"engine": "pyarrow"})
+    source.write_text("a,b\n1,3\n")
+    os.utime(source, ns=(1, 1))
+    assert key != DatasetCache.key([str(source)], {"engine": "c"})
+
+
+def test_refresh_disabled_and_eviction(tmp_path):
+    """Refreshing ignores the entries, disabling skips the writes and the
+        least recently used entries are evicted when the limit is exceeded.
+    """
+    frame = pd.DataFrame({"value": range(1000)})
+    DatasetCache(str(tmp_path), enabled=False).put_frame("disabled", frame)
+    assert not os.listdir(tmp_path)
+    cache = DatasetCache(str(tmp_path))
+    cache.put_frame("old", frame)
+    assert DatasetCache(str(tmp_path), refresh=True).get_frame("old") is None
+    size = sum(entry.stat().st_size for entry in os.scandir(tmp_path))
+    cache.max_size = size * 1.5
+    os.utime(os.path.join(tmp_path, os.listdir(tmp_path)[0]), (0, 0))
+    cache.put_frame("new", frame)
+    assert cache.get_frame("old") is None
+    pd.testing.assert_frame_equal(cache.get_frame("new"), frame)
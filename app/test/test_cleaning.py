@@ -91,3 +91,44 @@ def test_fill_all_na_values(data_path):
     except AssertionError as asserr:
         logging.error("The NA values were not filled well.")
         raise asserr
+
+
+def test_fill_all_na_values_precomputed(data_path):
+    """Fill all the NA values of a dataset with precomputed fill values.
+
+    Args:
+        data_path (str): the path where the dataset is located.
+
+    Raises:
+        asserr: AssertionError if the result is different from computing
+        the fill values from the same dataset.
+    """
+    data = read_data(data_path)
+    try:
+        fill_values = cleaning.compute_fill_values(data)
+        cleaned_data = cleaning.fill_all_na_values(
+            data, fill_values=fill_values
+        )
+        pd.testing.assert_frame_equal(
+            cleaned_data, cleaning.fill_all_na_values(data)
+        )
+        assert cleaned_data.isna().sum().sum() == 0
+    except AssertionError as asserr:
+        logging.error("The precomputed values were not used well.")
+        raise asserr
+
+
+def test_fill_all_na_values_new_category(data_path):
+    """Fill a categorical batch whose categories miss the learned value.
+
+    Args:
+        data_path (str): the path where the dataset is located.
+    """
+    data = read_data(data_path)
+    fill_values = cleaning.compute_fill_values(data)
+    batch = pd.DataFrame(
+        {"MSZoning": pd.Categorical([None, "FV"]).remove_categories("FV")}
+    )
+    cleaned_batch = cleaning.fill_all_na_values(batch, fill_values=fill_values)
+    assert cleaned_batch["MSZoning"].tolist() == [fill_values["MSZoning"]] * 2
+    assert batch["MSZoning"].isna().all()
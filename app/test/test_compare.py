@@ -0,0 +1,69 @@
+"""Model comparison testing
+
+This script test the comparison of the models of the registry. A fixture
+was defined in order to return the path associated to the source dataset,
+which is processed with the pipeline of the main module.
+
+The expected result is that every model given is evaluated with the shared
+arrays, reporting its score, speed and size, and that the results are
+written to the folder of the comparison.
+"""
+
+import json
+import logging
+
+import pandas as pd
+import pytest
+
+from main import GOAL_VARIABLE, pipeline
+from src import compare as cmp
+
+
+@pytest.fixture(scope="module", name="data_path")
+def path():
+    """return the path of the train dataset."""
+    return "data/train.csv"
+
+
+def test_compare_models(data_path, tmp_path):
+    """Compare two models with two workers and check the saved results.
+
+    Args:
+        data_path (str): the path where the dataset is located.
+        tmp_path (Path): a temporary folder for the results.
+
+    Raises:
+        asserr: AssertionError if a model was not evaluated or saved.
+    """
+    final_data = pipeline(pd.read_csv(data_path))
+    results = cmp.compare_models(
+        final_data.drop(GOAL_VARIABLE, axis=1),
+        final_data[GOAL_VARIABLE],
+        ["ridge", "hist_gradient_boosting"],
+        folds=3,
+        n_jobs=2,
+        output=str(tmp_path)
+    )
+    with open(
+                tmp_path / "comparison.json", encoding="utf-8"
+            ) as comparison_json:
+        saved = json.load(comparison_json)
+    try:
+        assert [result["model"] for result in results] == [
+            "ridge", "hist_gradient_boosting"
+        ]
+        assert saved == results
+        for result in results:
+            assert len(result["scores"]) == 3
+            assert result["fit_time_s"] > 0
+            assert result["predict_ms_per_1k"] > 0
+            assert result["size_bytes"] > 0
+    except AssertionError as asserr:
+        logging.error("The models were not compared.")
+        raise asserr
+    with pytest.raises(ValueError):
+        cmp.compare_models(
+            final_data.drop(GOAL_VARIABLE, axis=1),
+            final_data[GOAL_VARIABLE],
+            ["linear_svm"]
+        )
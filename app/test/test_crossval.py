@@ -0,0 +1,125 @@
+"""Leakage-free cross validation testing
+
+This script test the cross validation which learns the values of the
+pipeline in every fold. A fixture was defined in order to return the path
+associated to the source dataset, which is split in folds.
+
+The expected result is that the values derived by subtracting the
+statistics of the held-out rows are identical to the ones of a pipeline
+fitted with the training rows of each fold, that the held-out values not
+seen in the training rows are filled, and that every fold is evaluated.
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.model_selection import KFold
+
+from main import GOAL_VARIABLE, build_pipeline
+from src import crossval as cv
+from src import training as trn
+
+
+@pytest.fixture(scope="module", name="data_path")
+def path():
+    """return the path of the train dataset."""
+    return "data/train.csv"
+
+
+def test_fold_statistics(data_path):
+    """Compare the values derived for each fold with the ones of a pipeline
+        fitted with its training rows.
+
+    Args:
+        data_path (str): the path where the dataset is located.
+
+    Raises:
+        asserr: AssertionError if the values of a fold are different.
+    """
+    data = pd.read_csv(data_path)
+    fitted_pipeline = build_pipeline().fit(data)
+    splits = list(KFold(5).split(data))
+    total, held_out = cv.fold_statistics(fitted_pipeline, data, splits)
+    try:
+        assert total.rows_ == len(data)
+        for fold, (train_index, _) in enumerate(splits):
+            fold_pipeline = fitted_pipeline.with_statistics(
+                total.copy().subtract(held_out[fold])
+            )
+            expected = build_pipeline().fit(data.iloc[train_index])
+            assert list(fold_pipeline.fill_columns_) == list(
+                expected.fill_columns_
+            )
+            assert pd.Series(fold_pipeline.fill_values_).equals(
+                pd.Series(expected.fill_values_)
+            )
+            for column, categories in expected.label_categories_.items():
+                assert list(fold_pipeline.label_categories_[column]) == list(
+                    categories
+                )
+    except AssertionError as asserr:
+        logging.error("The values of a fold were not derived exactly.")
+        raise asserr
+
+
+def test_fill_unknown(data_path):
+    """Process rows with a value not seen by the pipeline.
+
+    Args:
+        data_path (str): the path where the dataset is located.
+
+    Raises:
+        asserr: AssertionError if the unknown value was not filled.
+    """
+    data = pd.read_csv(data_path)
+    fitted_pipeline = build_pipeline().fit(data)
+    rows = data.iloc[:2].copy()
+    rows["Street"] = ["Pave", "Unknown"]
+    with pytest.raises(ValueError):
+        fitted_pipeline.with_statistics(
+            fitted_pipeline.statistics_, fill_unknown=False
+        ).transform(rows)
+    fold_pipeline = fitted_pipeline.with_statistics(
+        fitted_pipeline.statistics_
+    )
+    try:
+        final_data = fold_pipeline.transform(rows)
+        # the unknown value takes the code of the mode
+        mode = fitted_pipeline.fill_values_[
+            list(fitted_pipeline.fill_columns_).index("Street")
+        ]
+        assert final_data["Street"].iloc[1] == list(
+            fitted_pipeline.label_categories_["Street"]
+        ).index(mode)
+        assert rows["Street"].iloc[1] == "Unknown"
+    except AssertionError as asserr:
+        logging.error("The unknown value was not filled.")
+        raise asserr
+
+
+def test_cross_validate_pipeline(data_path):
+    """Evaluate a small model with the folds in parallel.
+
+    Args:
+        data_path (str): the path where the dataset is located.
+
+    Raises:
+        asserr: AssertionError if a fold was not evaluated.
+    """
+    data = pd.read_csv(data_path)
+    fitted_pipeline = build_pipeline().fit(data)
+    model = trn.build_model(max_leaf_nodes=10).set_params(
+        n_estimators=5, random_state=0
+    )
+    try:
+        scores = cv.cross_validate_pipeline(
+            model, fitted_pipeline, data, data[GOAL_VARIABLE].to_numpy(),
+            folds=3, n_jobs=2
+        )
+        assert len(scores) == 3
+        assert np.all((scores > 0) & (scores <= 1))
+    except AssertionError as asserr:
+        logging.error("The leakage-free cross validation was not executed.")
+        raise asserr
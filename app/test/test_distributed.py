@@ -0,0 +1,157 @@
+"""Distributed trials testing
+
+This script test the coordinator and the workers of the distributed trials
+on localhost. A fixture was defined in order to return the path associated
+to the source dataset, which is processed with the pipeline of the main
+module.
+
+The expected result is that the workers evaluate every fold of every
+candidate with the same score as a local evaluation, that the task of a
+worker lost is handed out again to another one, that a worker without the
+key is refused, and that the trials are written to the output folder.
+"""
+
+import json
+import logging
+import socket
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from main import GOAL_VARIABLE, pipeline
+from src import distributed as dist
+
+
+@pytest.fixture(scope="module", name="data_path")
+def path():
+    """return the path of the train dataset."""
+    return "data/train.csv"
+
+
+def start_workers(address, authkey, workers):
+    """Start workers on localhost, each one in a thread.
+
+    Args:
+        address (Tuple[str, int]): the address of the coordinator.
+        authkey (bytes): the key of the coordinator.
+        workers (int): the number of workers.
+
+    Returns:
+        List[threading.Thread]: the threads of the workers.
+    """
+    threads = [
+        threading.Thread(target=dist.run_worker, args=(address, authkey))
+        for _ in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def test_parse_address():
+    """Check the host and the port of the addresses given as text.
+
+    Raises:
+        asserr: AssertionError if an address is not split well.
+    """
+    try:
+        assert dist.parse_address("10.0.0.5:6001") == ("10.0.0.5", 6001)
+        assert dist.parse_address("node-3") == ("node-3", 6000)
+    except AssertionError as asserr:
+        logging.error("The address was not parsed well.")
+        raise asserr
+    with pytest.raises(ValueError):
+        dist.parse_address("node-3:port")
+
+
+def test_coordinator_reassigns(data_path):
+    """Lose a worker in the middle of a task and check that another worker
+        evaluates it.
+
+    Args:
+        data_path (str): the path where the dataset is located.
+
+    Raises:
+        asserr: AssertionError if a task is missing or its score changed.
+    """
+    final_data = pipeline(pd.read_csv(data_path))
+    X = final_data.drop(GOAL_VARIABLE, axis=1).to_numpy(dtype=np.float32)
+    y = final_data[GOAL_VARIABLE].to_numpy(dtype=np.float64)
+    tasks = dist.fold_tasks([
+        {"max_leaf_nodes": 10, "n_estimators": 5},
+        {"max_leaf_nodes": 50, "n_estimators": 5}
+    ], folds=3)
+    coordinator = dist.Coordinator(
+        X, y, tasks, ("127.0.0.1", 0), b"secret", task_timeout=60
+    )
+    results = []
+    serving = threading.Thread(
+        target=lambda: results.extend(coordinator.serve())
+    )
+    serving.start()
+    with pytest.raises(AuthenticationError):
+        Client(coordinator.address, authkey=b"wrong")
+    # a worker which takes a task and dies before answering it
+    lost = Client(coordinator.address, authkey=b"secret")
+    lost.send(("hello", "lost", 0))
+    lost.recv()
+    _, index, _ = lost.recv()
+    lost.close()
+    for thread in start_workers(coordinator.address, b"secret", 2):
+        thread.join()
+    serving.join()
+    try:
+        assert coordinator.reassigned == 1
+        assert len(results) == len(tasks)
+        assert results[index]["score"] == dist.evaluate_task(
+            X, y, tasks[index]
+        )["score"]
+    except AssertionError as asserr:
+        logging.error("The task of the worker lost was not handed out again.")
+        raise asserr
+
+
+def test_distributed_search(data_path, tmp_path):
+    """Evaluate a small grid with two workers on localhost, shipping the
+        features through a file.
+
+    Args:
+        data_path (str): the path where the dataset is located.
+        tmp_path (Path): a temporary folder for the features and trials.
+
+    Raises:
+        asserr: AssertionError if a trial is missing or not saved.
+    """
+    final_data = pipeline(pd.read_csv(data_path))
+    with socket.socket() as free:
+        free.bind(("127.0.0.1", 0))
+        address = free.getsockname()
+    threads = start_workers(address, b"secret", 2)
+    trials = dist.distributed_search(
+        final_data.drop(GOAL_VARIABLE, axis=1),
+        final_data[GOAL_VARIABLE],
+        [{"max_leaf_nodes": 10, "n_estimators": 5},
+         {"max_leaf_nodes": 50, "n_estimators": 5}],
+        address,
+        b"secret",
+        folds=3,
+        data_path=str(tmp_path / "features.npz"),
+        output=str(tmp_path)
+    )
+    for thread in threads:
+        thread.join()
+    with open(tmp_path / "trials.jsonl", encoding="utf-8") as trials_json:
+        saved = [json.loads(line) for line in trials_json]
+    with open(tmp_path / "best.json", encoding="utf-8") as best_json:
+        best = json.load(best_json)
+    try:
+        assert saved == trials
+        assert [len(trial["scores"]) for trial in trials] == [3, 3]
+        assert best == max(trials, key=lambda trial: trial["mean_score"])
+    except AssertionError as asserr:
+        logging.error("The trials of the workers were not gathered.")
+        raise asserr
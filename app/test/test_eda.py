@@ -12,6 +12,7 @@ the *test_results* folder once the previuos tests were evaluated.
 
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 import pandas as pd
 import pytest
@@ -98,6 +99,41 @@ def test_collage(data_path, collage_path):
         raise fnfe_res
 
 
+def test_null_matrix_downsampled(data_path):
+    """test if large datasets are reduced to the null fraction of blocks.
+
+    Args:
+        data_path (str): the path where the dataset is located.
+    """
+    data = read_data(data_path)
+    nulls = eda.null_matrix(data, max_rows=100)
+    assert nulls.shape == (100, data.shape[1])
+    assert nulls.columns.equals(data.columns)
+    assert nulls.min().min() >= 0 and nulls.max().max() <= 1
+    # the mean of the blocks of equal size is the overall null fraction
+    pd.testing.assert_series_equal(
+        nulls.mean(), data.isnull().mean(), atol=0.01
+    )
+    assert eda.null_matrix(data, max_rows=None).equals(data.isnull())
+
+
+def test_start_plots(data_path, heatmap_path, collage_path):
+    """test if the plots are generated by a pool of workers.
+
+    Args:
+        data_path (str): the path where the dataset is located.
+        heatmap_path (str): the path where the plot is going to be saved.
+        collage_path (str): the path where the plot is going to be saved.
+    """
+    data = read_data(data_path)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        plots = eda.start_plots(executor, data, heatmap_path, collage_path)
+        for plot in plots:
+            plot.result()
+    assert os.path.exists(heatmap_path)
+    assert os.path.exists(collage_path)
+
+
 def test_remove_results(heatmap_path, collage_path):
     """Remove all the results generated from the other test functions
 
@@ -0,0 +1,77 @@
+"""Compiled forest testing
+
+This script test the compilation of a trained random forest into packed
+node arrays. A fixture was defined in order to return the path associated
+to the source dataset, which is processed with the pipeline of the main
+module.
+
+The expected result is that the predictions of the compiled forest are
+identical to the ones of scikit-learn, for single rows, batches and rows
+with values between the thresholds of the trees.
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from main import GOAL_VARIABLE, build_pipeline
+from src import forest as frst
+from src import training as trn
+
+
+@pytest.fixture(scope="module", name="data_path")
+def path():
+    """return the path of the train dataset."""
+    return "data/train.csv"
+
+
+@pytest.mark.parametrize("name", ["random_forest", "extra_trees"])
+def test_compiled_predictions(data_path, name):
+    """Compare the predictions of a compiled forest with scikit-learn.
+
+    Args:
+        data_path (str): the path where the dataset is located.
+        name (str): the forest of the registry.
+
+    Raises:
+        asserr: AssertionError if a prediction is different.
+    """
+    fitted_pipeline = build_pipeline()
+    final_data = fitted_pipeline.fit_transform(pd.read_csv(data_path))
+    X = fitted_pipeline.to_matrix(final_data)
+    model = trn.create_model(name, n_jobs=1).set_params(n_estimators=20)
+    model.fit(X, final_data[GOAL_VARIABLE])
+    compiled_forest = frst.compile_model(model)
+    # values around the thresholds of the splits
+    noisy = X + np.random.default_rng(0).normal(
+        0, 0.5, X.shape
+    ).astype(np.float32)
+    try:
+        assert isinstance(compiled_forest, frst.CompiledForest)
+        for batch in (X[:1], X, noisy):
+            assert np.array_equal(
+                compiled_forest.predict(batch), model.predict(batch)
+            )
+    except AssertionError as asserr:
+        logging.error("The compiled forest predicted other values.")
+        raise asserr
+    with pytest.raises(ValueError):
+        compiled_forest.predict(X[:, :3])
+
+
+def test_compile_other_models():
+    """Check that the models which are not forests are not compiled.
+
+    Raises:
+        asserr: AssertionError if a model was compiled.
+    """
+    model = trn.create_model("ridge")
+    try:
+        assert frst.compile_model(model) is model
+    except AssertionError as asserr:
+        logging.error("A model which is not a forest was compiled.")
+        raise asserr
+    with pytest.raises(ValueError):
+        frst.CompiledForest(model)
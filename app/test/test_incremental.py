@@ -0,0 +1,170 @@
+"""Incremental fill statistics testing
+
+This script test the FillStatistics class and the pipeline updated with
+new partitions of the train dataset. A fixture was defined in order to
+return the path associated to the source dataset, which is split in
+partitions as if it arrived day by day.
+
+The expected result is that the sums are exact, and that the fill values
+and the vocabularies updated partition by partition, or merged, are
+identical to the ones computed from the whole dataset at once, also after
+saving and loading the pipeline as an artifact, and that the float32
+columns are filled with their mean like the float64 ones.
+"""
+
+import logging
+from fractions import Fraction
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from main import (CATEGORICAL_COLUMNS, GOAL_VARIABLE, NUMERICAL_COLUMNS,
+                  build_pipeline)
+from src import artifacts as art
+from src import incremental as inc
+from src import ingestion as ing
+from src import training as trn
+
+
+@pytest.fixture(scope="module", name="data_path")
+def path():
+    """return the path of the train dataset."""
+    return "data/train.csv"
+
+
+def test_exact_sum():
+    """Check that the sums of integers and of any floats are exact.
+
+    Raises:
+        asserr: AssertionError if a sum is not exact.
+    """
+    rng = np.random.default_rng(0)
+    values = np.concatenate([
+        rng.normal(0, 1e6, 1000), [5e-324, -1e300, 1e300, 0.1]
+    ])
+    integers = rng.integers(-1000, 1000, 1000).astype("float64")
+    try:
+        for array in (values, integers):
+            assert Fraction(inc.exact_sum(array), 2 ** 1074) == sum(
+                Fraction(value) for value in array
+            )
+        assert inc.exact_mean(inc.exact_sum(integers), len(integers)) == (
+            float(Fraction(int(integers.sum()), len(integers)))
+        )
+    except AssertionError as asserr:
+        logging.error("The sums are not exact.")
+        raise asserr
+    with pytest.raises(ValueError):
+        inc.exact_sum(np.array([1.0, np.inf]))
+
+
+def test_partitions_match_full(data_path):
+    """Update the statistics partition by partition, and merge them, and
+        compare them with the statistics of the whole dataset.
+
+    Args:
+        data_path (str): the path where the dataset is located.
+
+    Raises:
+        asserr: AssertionError if a fill value or a vocabulary differs.
+    """
+    data = pd.read_csv(data_path)
+    # a noisy float column, whose float sums depend on the order
+    data["Noise"] = np.random.default_rng(0).normal(0, 1e3, len(data))
+    full = inc.FillStatistics().update(data)
+    partitions = np.array_split(np.arange(len(data)), 7)
+    updated = inc.FillStatistics()
+    merged = inc.FillStatistics()
+    for rows in partitions:
+        updated.update(data.iloc[rows])
+        merged.merge(inc.FillStatistics().update(data.iloc[rows]))
+    try:
+        for statistics in (updated, merged):
+            assert statistics.fill_values() == full.fill_values()
+            assert statistics.rows_ == len(data)
+            for column in full.vocabularies_:
+                np.testing.assert_array_equal(
+                    statistics.vocabulary(column), full.vocabulary(column)
+                )
+                np.testing.assert_array_equal(
+                    statistics.value_counts_[column],
+                    full.value_counts_[column]
+                )
+    except AssertionError as asserr:
+        logging.error("The incremental statistics differ from the full ones.")
+        raise asserr
+
+
+def test_pipeline_partial_fit(data_path, tmp_path):
+    """Fit a pipeline with the first days, save it as an artifact, load it
+        and update it with the last days.
+
+    Args:
+        data_path (str): the path where the dataset is located.
+        tmp_path (Path): a temporary folder given by pytest.
+
+    Raises:
+        asserr: AssertionError if the updated pipeline differs from the
+        one fitted with the whole dataset.
+    """
+    data = pd.read_csv(data_path)
+    history, last_day = data.iloc[:1000], data.iloc[1000:]
+    fitted_pipeline = build_pipeline()
+    final_history = fitted_pipeline.fit_transform(history)
+    model = trn.build_model(max_leaf_nodes=10).set_params(n_estimators=5)
+    model.fit(
+        fitted_pipeline.to_matrix(final_history), final_history[GOAL_VARIABLE]
+    )
+    art.save_artifacts(model, fitted_pipeline, str(tmp_path))
+    updated = art.load_pipeline(str(tmp_path)).partial_fit(last_day)
+    full = build_pipeline().fit(data)
+    try:
+        np.testing.assert_array_equal(updated.fill_columns_, full.fill_columns_)
+        assert list(updated.fill_values_) == list(full.fill_values_)
+        for column, categories in full.label_categories_.items():
+            np.testing.assert_array_equal(
+                updated.label_categories_[column], categories
+            )
+        pd.testing.assert_frame_equal(
+            updated.transform(data), full.transform(data)
+        )
+    except AssertionError as asserr:
+        logging.error("The updated pipeline differs from the full one.")
+        raise asserr
+
+
+def test_float32_numerical(data_path):
+    """Fit the pipeline with the numerical variables read as float32, and
+        update it with a partition read with the inferred types.
+
+    Args:
+        data_path (str): the path where the dataset is located.
+
+    Raises:
+        asserr: AssertionError if a float32 column is not filled with its
+        mean or is not recorded as numerical.
+    """
+    data = ing.read_dataset(
+        data_path, categorical=CATEGORICAL_COLUMNS,
+        numerical=NUMERICAL_COLUMNS
+    )
+    default = pd.read_csv(data_path)
+    fitted_pipeline = build_pipeline().fit(data)
+    fill_values = fitted_pipeline.statistics_.fill_values()
+    numerical = fitted_pipeline.statistics_.numerical_
+    try:
+        assert data["LotFrontage"].dtype == "float32"
+        assert {"LotFrontage", "MasVnrArea"} <= set(numerical)
+        assert not {"LotFrontage", "MasVnrArea"} & set(
+            fitted_pipeline.statistics_.vocabularies_
+        )
+        for column in ("LotFrontage", "MasVnrArea"):
+            assert fill_values[column] == default[column].mean()
+        assert set(NUMERICAL_COLUMNS) - set(fitted_pipeline.cols_to_drop) <= (
+            set(ing.pipeline_read_options(data_path, fitted_pipeline)["dtype"])
+        )
+    except AssertionError as asserr:
+        logging.error("The float32 columns were not filled with their mean.")
+        raise asserr
+    fitted_pipeline.partial_fit(default.iloc[:100])
@@ -0,0 +1,80 @@
+"""Dataset ingestion testing
+
+This script test the functions to read the datasets with the sets of
+variables of the project. A fixture was defined in order to return the path
+associated to the source dataset.
+
+The expected result is that the dropped variables are not read, the
+categorical ones use the category type, the numerical ones listed use the
+float32 type with the same values, and the pipeline generates the same
+result as with the dataset read with the default options.
+"""
+
+import logging
+
+import pandas as pd
+import pytest
+
+from main import (CATEGORICAL_COLUMNS, COLS_TO_DROP, ID_COLUMN,
+                  NUMERICAL_COLUMNS, build_pipeline)
+from src import ingestion as ing
+
+
+@pytest.fixture(scope="module", name="data_path")
+def path():
+    """return the path of the train dataset."""
+    return "data/train.csv"
+
+
+def test_read_dataset(data_path):
+    """Read a dataset with the typed and pruned options.
+
+    Args:
+        data_path (str): the path where the dataset is located.
+
+    Raises:
+        asserr: AssertionError if the columns or their types are wrong, or
+        if the pipeline generates a different result.
+    """
+    data = ing.read_dataset(
+        data_path, COLS_TO_DROP, CATEGORICAL_COLUMNS, keep=[ID_COLUMN]
+    )
+    try:
+        assert ID_COLUMN in data.columns
+        assert not (set(COLS_TO_DROP) - {ID_COLUMN}) & set(data.columns)
+        assert len(data.select_dtypes("object").columns) == 0
+        assert data["Neighborhood"].dtype == "category"
+        pd.testing.assert_frame_equal(
+            build_pipeline().fit_transform(data),
+            build_pipeline().fit_transform(pd.read_csv(data_path))
+        )
+    except AssertionError as asserr:
+        logging.error("The dataset was not read well.")
+        raise asserr
+
+
+def test_read_numerical(data_path):
+    """Read a dataset with the numerical variables of the project.
+
+    Args:
+        data_path (str): the path where the dataset is located.
+
+    Raises:
+        asserr: AssertionError if a numerical variable is not float32 or
+        its values changed.
+    """
+    data = ing.read_dataset(
+        data_path, COLS_TO_DROP, CATEGORICAL_COLUMNS, keep=[ID_COLUMN],
+        numerical=NUMERICAL_COLUMNS
+    )
+    default = pd.read_csv(data_path)
+    try:
+        assert (data[NUMERICAL_COLUMNS].dtypes == "float32").all()
+        assert data[ID_COLUMN].dtype == "int64"
+        pd.testing.assert_frame_equal(
+            data[NUMERICAL_COLUMNS].astype("float64"),
+            default[NUMERICAL_COLUMNS].astype("float64")
+        )
+    except AssertionError as asserr:
+        logging.error("The numerical variables were not read as float32.")
+        raise asserr
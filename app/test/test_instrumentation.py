@@ -0,0 +1,96 @@
+"""Instrumentation testing
+
+This script tests the records written by the instrumentation layer for the
+stages of the pipeline, and the dumps of the profilers of each stage.
+"""
+# importing needed libraries
+import json
+import os
+import tracemalloc
+
+import pandas as pd
+import pytest
+
+# importing needed modules
+from main import build_pipeline
+from src import instrumentation as instr
+
+
+@pytest.fixture(name="metrics_path")
+def metrics(tmp_path):
+    """return a metrics file, and stop measuring once the test finishes."""
+    yield str(tmp_path / "metrics.jsonl")
+    instr.configure(None)
+
+
+def read_records(path):
+    """Read the records written to a metrics file.
+
+    Args:
+        path (str): the JSON lines file.
+
+    Returns:
+        list: the records of the stages.
+    """
+    with open(path, encoding="utf-8") as metrics_file:
+        return [json.loads(line) for line in metrics_file]
+
+
+def test_disabled_by_default(tmp_path):
+    """Nothing is written until the instrumentation is configured."""
+    with instr.stage("idle", pd.DataFrame({"a": [1]})) as current:
+        current.output(None)
+    assert not instr.is_enabled()
+    assert not os.listdir(tmp_path)
+
+
+def test_pipeline_stages(metrics_path):
+    """Each step of the pipeline writes a record nested in its parent."""
+    data = pd.read_csv("data/train.csv")
+    instr.configure(metrics_path, run="test")
+    final_data = build_pipeline().fit_transform(data)
+    records = {
+        record["stage"]: record for record in read_records(metrics_path)
+    }
+    for name in ("drop", "custom_fill", "fill_all", "ordinal_encode",
+                 "label_encode", "interactions", "drop_output"):
+        assert records[name]["parent"] == "pipeline_fit_transform"
+        assert records[name]["rows_in"] == len(data)
+        assert records[name]["wall_s"] >= 0
+        assert records[name]["run"] == "test"
+    outer = records["pipeline_fit_transform"]
+    assert outer["parent"] is None
+    assert (outer["rows_in"], outer["columns_in"]) == data.shape
+    assert (outer["rows_out"], outer["columns_out"]) == final_data.shape
+
+
+def test_profilers(metrics_path, tmp_path):
+    """cProfile dumps the outermost stage and tracemalloc every stage."""
+    profile_dir = str(tmp_path / "profiles")
+
+    @instr.instrumented("allocate")
+    def allocate(data):
+        return pd.concat([data] * 100)
+
+    data = pd.DataFrame({"a": range(1000)})
+    instr.configure(metrics_path, "cprofile", profile_dir)
+    with instr.stage("outer"):
+        allocate(data)
+    assert [name.split("-")[-1] for name in os.listdir(profile_dir)] == [
+        "outer.prof"
+    ]
+    instr.configure(metrics_path, "tracemalloc", profile_dir)
+    with instr.stage("outer"):
+        allocate(data)
+    records = read_records(metrics_path)
+    assert records[2]["stage"] == "allocate"
+    assert records[2]["rows_out"] == 100000
+    assert records[2]["traced_peak_delta_mb"] > 0.5
+    assert records[3]["traced_peak_delta_mb"] >= (
+        records[2]["traced_peak_delta_mb"]
+    )
+    assert len(os.listdir(profile_dir)) == 3
+    with pytest.raises(ValueError):
+        instr.configure(metrics_path, "unknown")
+    instr.configure(None)
+    assert not tracemalloc.is_tracing()
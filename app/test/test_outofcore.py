@@ -0,0 +1,95 @@
+"""Out-of-core training testing
+
+This script test the training of the random forest with a train dataset
+read by chunks. A fixture was defined in order to return the path
+associated to the source dataset, which is read in chunks of rows.
+
+The expected result is that the pipeline fitted by chunks learns the same
+values as the one fitted with the whole dataset, that the forest has the
+trees of every chunk, and that the R2 score computed by chunks is the one
+of the whole dataset.
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.metrics import r2_score
+
+from main import GOAL_VARIABLE, build_pipeline
+from src import outofcore as ooc
+from src import training as trn
+
+
+@pytest.fixture(scope="module", name="data_path")
+def path():
+    """return the path of the train dataset."""
+    return "data/train.csv"
+
+
+def test_fit_pipeline_chunked(data_path):
+    """Compare the pipeline fitted by chunks with the one fitted at once.
+
+    Args:
+        data_path (str): the path where the dataset is located.
+
+    Raises:
+        asserr: AssertionError if a learned value is different.
+    """
+    chunked_pipeline = ooc.fit_pipeline_chunked(
+        build_pipeline(), data_path, 400
+    )
+    fitted_pipeline = build_pipeline().fit(pd.read_csv(data_path))
+    try:
+        assert list(chunked_pipeline.fill_columns_) == list(
+            fitted_pipeline.fill_columns_
+        )
+        assert pd.Series(chunked_pipeline.fill_values_).equals(
+            pd.Series(fitted_pipeline.fill_values_)
+        )
+        assert list(chunked_pipeline.feature_names_) == list(
+            fitted_pipeline.feature_names_
+        )
+    except AssertionError as asserr:
+        logging.error("The pipeline fitted by chunks is different.")
+        raise asserr
+
+
+def test_grow_forest(data_path):
+    """Grow a forest by chunks and score it by chunks.
+
+    Args:
+        data_path (str): the path where the dataset is located.
+
+    Raises:
+        asserr: AssertionError if a chunk was not used or the score is
+        wrong.
+    """
+    fitted_pipeline = ooc.fit_pipeline_chunked(
+        build_pipeline(), data_path, 500
+    )
+    model = trn.build_model(max_leaf_nodes=10).set_params(random_state=0)
+    ooc.grow_forest(model, fitted_pipeline, data_path, 500, GOAL_VARIABLE, 3)
+    final_data = fitted_pipeline.transform(pd.read_csv(data_path))
+    expected = r2_score(
+        final_data[GOAL_VARIABLE],
+        model.predict(fitted_pipeline.to_matrix(final_data))
+    )
+    try:
+        # 1460 rows are read in 3 chunks
+        assert len(model.estimators_) == 9
+        assert not model.warm_start
+        assert np.isclose(
+            ooc.r2_chunked(
+                model, fitted_pipeline, data_path, 500, GOAL_VARIABLE
+            ),
+            expected
+        )
+    except AssertionError as asserr:
+        logging.error("The forest was not grown by chunks.")
+        raise asserr
+    with pytest.raises(ValueError):
+        ooc.grow_forest(
+            model, fitted_pipeline, data_path, 500, GOAL_VARIABLE, 0
+        )
@@ -0,0 +1,86 @@
+"""Partitioned preprocessing testing
+
+This script test the transformation of a dataframe by blocks of rows in a
+pool of processes. A fixture was defined in order to return the path
+associated to the source dataset, which is repeated to have enough rows
+for several workers.
+
+The expected result is that the feature matrix reassembled from the blocks
+is identical to the one of the pipeline transforming the whole dataframe,
+and that the arrays shared with the workers are read back unchanged and
+read-only.
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from main import build_pipeline
+from src import parallel as par
+
+
+@pytest.fixture(scope="module", name="data_path")
+def path():
+    """return the path of the train dataset."""
+    return "data/train.csv"
+
+
+@pytest.mark.parametrize("inplace", [False, True])
+def test_transform_partitioned(data_path, inplace):
+    """Transform a large dataframe with two workers and uneven blocks.
+
+    Args:
+        data_path (str): the path where the dataset is located.
+        inplace (bool): whether the pipeline mutates the dataframes.
+
+    Raises:
+        asserr: AssertionError if the matrices are different.
+    """
+    data = pd.read_csv(data_path)
+    fitted_pipeline = build_pipeline(inplace).fit(data)
+    large_data = pd.concat([data] * 15, ignore_index=True)
+    expected = fitted_pipeline.transform_matrix(large_data.copy())
+    matrix = par.transform_partitioned(
+        fitted_pipeline, large_data, n_jobs=2, partition_rows=7000
+    )
+    try:
+        assert matrix.flags["C_CONTIGUOUS"]
+        np.testing.assert_array_equal(matrix, expected)
+        # the small inputs are transformed without workers
+        np.testing.assert_array_equal(
+            par.transform_partitioned(fitted_pipeline, data.copy(), n_jobs=2),
+            fitted_pipeline.transform_matrix(data.copy())
+        )
+    except AssertionError as asserr:
+        logging.error("The partitioned transformation changed the result.")
+        raise asserr
+
+
+def test_shared_arrays():
+    """Share two arrays and attach to them as a worker does.
+
+    Raises:
+        asserr: AssertionError if an array changed or can be written.
+    """
+    arrays = {
+        "X": np.arange(12, dtype=np.float32).reshape(4, 3),
+        "y": np.linspace(0, 1, 4)
+    }
+    blocks, shared = par.share_arrays(arrays)
+    try:
+        par.attach_arrays(shared)
+        try:
+            for key, array in arrays.items():
+                np.testing.assert_array_equal(par.SHARED[key], array)
+                assert par.SHARED[key].dtype == array.dtype
+                assert not par.SHARED[key].flags.writeable
+        except AssertionError as asserr:
+            logging.error("The shared arrays were not attached well.")
+            raise asserr
+    finally:
+        for key in arrays:
+            del par.SHARED[key]
+            par.SHARED.pop(key + "_block").close()
+        par.release_arrays(blocks)
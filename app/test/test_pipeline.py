@@ -0,0 +1,138 @@
+"""Fitted pipeline testing
+
+This script test the HousePricingPipeline class. A fixture was defined in
+order to return the path associated to the source dataset, and the sets of
+variables of the pipeline were taken from the main module.
+
+The expected result is that the values learned from the train dataset are
+reused on any new batch, so each row is processed in the same way no matter
+the batch it belongs to, and that the feature matrix keeps the same values
+in a single float32 array.
+"""
+
+import logging
+
+import pandas as pd
+import pytest
+
+from main import build_pipeline
+
+
+def read_data(data_path):
+    """Read a dataset from a path given and return it.
+
+    Args:
+        data_path (str): path where the data is located.
+
+    Returns:
+        data (DataFrame): the dataset read with Pandas library.
+    """
+    data = pd.read_csv(data_path)
+    return data
+
+
+@pytest.fixture(scope="module", name="data_path")
+def path():
+    """return the path of the train dataset."""
+    return "data/train.csv"
+
+
+def test_fit_transform(data_path):
+    """Check that fit_transform gives the same result as fit and transform.
+
+    Args:
+        data_path (str): the path where the dataset is located.
+
+    Raises:
+        asserr: AssertionError if both results are different.
+    """
+    data = read_data(data_path)
+    try:
+        fitted_data = build_pipeline().fit_transform(data)
+        transformed_data = build_pipeline().fit(data).transform(data)
+        pd.testing.assert_frame_equal(fitted_data, transformed_data)
+        assert len(fitted_data.select_dtypes("object").columns) == 0
+    except AssertionError as asserr:
+        logging.error("The fitted pipeline is not consistent.")
+        raise asserr
+
+
+def test_transform_batches(data_path):
+    """Check that a small batch is encoded as in the full dataset.
+
+    Args:
+        data_path (str): the path where the dataset is located.
+
+    Raises:
+        asserr: AssertionError if the batch was encoded differently.
+    """
+    data = read_data(data_path)
+    fitted_pipeline = build_pipeline().fit(data)
+    try:
+        full_data = fitted_pipeline.transform(data)
+        batch_data = fitted_pipeline.transform(data.tail(5))
+        pd.testing.assert_frame_equal(full_data.tail(5), batch_data)
+    except AssertionError as asserr:
+        logging.error("The batch was not encoded with the learned values.")
+        raise asserr
+
+
+def test_transform_not_fitted(data_path):
+    """Check that a pipeline cannot transform before being fitted.
+
+    Args:
+        data_path (str): the path where the dataset is located.
+    """
+    data = read_data(data_path)
+    with pytest.raises(RuntimeError):
+        build_pipeline().transform(data)
+
+
+def test_inplace_transform(data_path):
+    """Check that the inplace mode gives the same result as the copy mode.
+
+    Args:
+        data_path (str): the path where the dataset is located.
+
+    Raises:
+        asserr: AssertionError if both results are different.
+    """
+    data = read_data(data_path)
+    try:
+        copied_data = build_pipeline().fit_transform(data)
+        inplace_data = build_pipeline(inplace=True).fit_transform(data.copy())
+        pd.testing.assert_frame_equal(copied_data, inplace_data)
+    except AssertionError as asserr:
+        logging.error("The inplace mode changed the result of the pipeline.")
+        raise asserr
+
+
+def test_transform_matrix(data_path):
+    """Check that the feature matrix is a float32 C-contiguous copy of the
+        features, without the target, and that the codes are downcast.
+
+    Args:
+        data_path (str): the path where the dataset is located.
+
+    Raises:
+        asserr: AssertionError if the matrix or the codes are not compact.
+    """
+    data = read_data(data_path)
+    fitted_pipeline = build_pipeline()
+    final_data = fitted_pipeline.fit_transform(data)
+    matrix = fitted_pipeline.transform_matrix(data)
+    features = fitted_pipeline.feature_names_
+    try:
+        assert "SalePrice" not in features
+        assert list(build_pipeline().fit(data).feature_names_) == list(
+            features
+        )
+        assert matrix.dtype == "float32"
+        assert matrix.flags["C_CONTIGUOUS"]
+        assert matrix.shape == (len(data), len(features))
+        assert (matrix == final_data[features].to_numpy("float32")).all()
+        assert final_data["Neighborhood"].dtype == "int8"
+        assert final_data["Street"].dtype == "int8"
+    except AssertionError as asserr:
+        logging.error("The feature matrix is not compact.")
+        raise asserr
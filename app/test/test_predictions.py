@@ -0,0 +1,122 @@
+"""Predictions cache testing
+
+This script test the cache of the predictions of the scored rows. A fixture
+was defined in order to return the path associated to the source dataset,
+which is used to train a small model and is scored with it.
+
+The expected result is that the hash of a row only depends on its values,
+that the rows read from the cache get the same predictions as the ones
+predicted, that only the changed rows are predicted again, and that the
+cache is emptied when the model changes and evicts the rows used least
+recently when it is full.
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from main import GOAL_VARIABLE, build_pipeline
+from src import predictions as prd
+from src import training as trn
+from src.scoring import model_input, predict_cached
+
+
+@pytest.fixture(scope="module", name="data_path")
+def path():
+    """return the path of the train dataset."""
+    return "data/train.csv"
+
+
+def test_hash_rows(data_path):
+    """Check that the hash of a row only depends on its values.
+
+    Args:
+        data_path (str): the path where the dataset is located.
+
+    Raises:
+        asserr: AssertionError if the hash of a row changed or collided.
+    """
+    data = pd.read_csv(data_path).iloc[:100]
+    rows = prd.hash_rows(data, ["Id"])
+    reordered = data[data.columns[::-1]].copy()
+    reordered["Id"] += 1000
+    reordered["LotArea"] = reordered["LotArea"].astype("float64")
+    changed = data.copy()
+    changed.loc[5, "LotArea"] += 1
+    try:
+        assert len(np.unique(rows)) == len(data)
+        assert np.array_equal(prd.hash_rows(reordered, ["Id"]), rows)
+        assert np.flatnonzero(
+            prd.hash_rows(changed, ["Id"]) != rows
+        ).tolist() == [5]
+    except AssertionError as asserr:
+        logging.error("The rows were not hashed by their values.")
+        raise asserr
+
+
+def test_predict_cached(data_path, tmp_path):
+    """Score a dataset twice with the cache, changing a row in between.
+
+    Args:
+        data_path (str): the path where the dataset is located.
+        tmp_path (Path): a temporary folder for the cache.
+
+    Raises:
+        asserr: AssertionError if a prediction changed or was not cached.
+    """
+    data = pd.read_csv(data_path)
+    fitted_pipeline = build_pipeline()
+    final_data = fitted_pipeline.fit_transform(data)
+    model = trn.build_model(max_leaf_nodes=10).set_params(
+        n_estimators=5, random_state=0
+    )
+    model.fit(
+        fitted_pipeline.to_matrix(final_data), final_data[GOAL_VARIABLE]
+    )
+    data = data.drop(GOAL_VARIABLE, axis=1)
+    expected = model.predict(model_input(
+        model, fitted_pipeline, fitted_pipeline.transform(data)
+    ))
+    cache_path = str(tmp_path / "predictions.sqlite")
+    with prd.PredictionCache(cache_path, "model") as cache:
+        first = predict_cached(model, fitted_pipeline, data, cache)
+    data.loc[3, "GrLivArea"] += 500
+    with prd.PredictionCache(cache_path, "model") as cache:
+        second = predict_cached(model, fitted_pipeline, data, cache)
+        hits, misses = cache.hits, cache.misses
+    with prd.PredictionCache(cache_path, "retrained") as cache:
+        predict_cached(model, fitted_pipeline, data.iloc[:10], cache)
+        retrained_misses = cache.misses
+    try:
+        assert np.array_equal(first, expected)
+        assert np.array_equal(np.delete(second, 3), np.delete(expected, 3))
+        assert (hits, misses) == (len(data) - 1, 1)
+        assert retrained_misses == 10
+    except AssertionError as asserr:
+        logging.error("The predictions were not cached.")
+        raise asserr
+
+
+def test_evict(tmp_path):
+    """Fill the cache over its limit and check the rows evicted.
+
+    Args:
+        tmp_path (Path): a temporary folder for the cache.
+
+    Raises:
+        asserr: AssertionError if a row used recently was evicted.
+    """
+    cache_path = str(tmp_path / "predictions.sqlite")
+    with prd.PredictionCache(cache_path, "model", max_rows=4) as cache:
+        cache.put(np.arange(4), np.arange(4.0), 1.0)
+    with prd.PredictionCache(cache_path, "model", max_rows=4) as cache:
+        cache.get(np.array([0, 1]))
+        cache.put(np.array([10, 11]), np.array([10.0, 11.0]), 1.0)
+        _, hit = cache.get(np.array([0, 1, 2, 3, 10, 11]))
+    try:
+        assert hit.tolist() == [True, True, False, False, True, True]
+    except AssertionError as asserr:
+        logging.error("The rows used least recently were not evicted.")
+        raise asserr
@@ -7,6 +7,7 @@ were created.
 """
 
 import logging
+import os
 
 import pandas as pd
 import pytest
@@ -112,3 +113,68 @@ def test_pipeline(data_path):
         logging.error("The final dataframe has at least one non-numerical column \
             after the preprocessing of the data.")
         raise asserr
+
+
+def test_read_encoders_cache(tmp_path):
+    """Check that the encoders file is parsed once and read again only
+        when it is modified.
+
+    Args:
+        tmp_path (Path): a temporary folder given by pytest.
+
+    Raises:
+        asserr: AssertionError if the cache was not used or not refreshed.
+    """
+    encoders_path = tmp_path / "map_encoders.json"
+    encoders_path.write_text('{"PavedDrive": ["N", "P", "Y"]}')
+    try:
+        encoders = prcs.read_encoders(str(encoders_path))
+        assert prcs.read_encoders(str(encoders_path)) is encoders
+        encoders_path.write_text('{"PavedDrive": ["Y", "P", "N"]}')
+        os.utime(encoders_path, ns=(0, 0))
+        reloaded = prcs.read_encoders(str(encoders_path))
+        assert list(reloaded["PavedDrive"]) == ["Y", "P", "N"]
+        encoded_data = prcs.encode_variables(
+            pd.DataFrame({"PavedDrive": ["N", "Y"]}), path=str(encoders_path)
+        )
+        assert encoded_data["PavedDrive"].tolist() == [2.0, 0.0]
+    except AssertionError as asserr:
+        logging.error("The encoders cache was not refreshed.")
+        raise asserr
+
+
+def test_compiled_interactions(tmp_path):
+    """Check that the declared interactions are compiled once and computed
+        as the products and sums of their columns.
+
+    Args:
+        tmp_path (Path): a temporary folder given by pytest.
+
+    Raises:
+        asserr: AssertionError if an interaction was not computed well.
+    """
+    interactions_path = tmp_path / "interactions.json"
+    interactions_path.write_text(
+        '{"Rating": {"operation": "product", "columns": ["Cond", "Qual"]},'
+        ' "Area": {"operation": "sum", "columns": ["A", "B", "C"]}}'
+    )
+    data = pd.DataFrame({
+        "Cond": pd.Series([100, 120], dtype="int8"),
+        "Qual": pd.Series([100, 3], dtype="int8"),
+        "A": [1.5, 0.0], "B": [2, 4], "C": [0.5, 1.0]
+    })
+    try:
+        plan = prcs.read_interactions(str(interactions_path))
+        assert prcs.read_interactions(str(interactions_path)) is plan
+        interacted_data = prcs.create_interactions(data, plan=plan)
+        # the codes are not overflowed by their small integer type
+        assert interacted_data["Rating"].tolist() == [10000.0, 360.0]
+        assert interacted_data["Area"].tolist() == [4.0, 5.0]
+        assert list(data.columns) == ["Cond", "Qual", "A", "B", "C"]
+        prcs.create_interactions(data, inplace=True, plan=plan)
+        assert list(data.columns)[-2:] == ["Rating", "Area"]
+    except AssertionError as asserr:
+        logging.error("The interactions were not compiled successfully.")
+        raise asserr
+    with pytest.raises(ValueError):
+        prcs.compile_interactions({"Rating": {"operation": "max"}})
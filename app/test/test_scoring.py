@@ -0,0 +1,162 @@
+"""Predictions scoring testing
+
+This script test the functions to score a csv file with a trained model and
+its fitted pipeline. A fixture was defined in order to return the path
+associated to the source dataset, and the results are saved under a
+temporary folder given by pytest.
+
+The expected result is that scoring a file by chunks generates exactly the
+same file as scoring it at once, also with a pipeline fitted in the inplace
+mode, which is cached and saved without it, and that the listings with
+values not seen in training are scored as the ones with the mode of those
+variables.
+"""
+
+import logging
+
+import pandas as pd
+import pytest
+
+from main import GOAL_VARIABLE, build_pipeline, preprocess_cached
+from src import artifacts as art
+from src import training as trn
+from src.cache import DatasetCache
+from src.scoring import score_csv
+
+
+@pytest.fixture(scope="module", name="data_path")
+def path():
+    """return the path of the train dataset."""
+    return "data/train.csv"
+
+
+def test_stream_submissions(data_path, tmp_path):
+    """Score a csv file at once and by chunks.
+
+    Args:
+        data_path (str): the path where the dataset is located.
+        tmp_path (Path): a temporary folder given by pytest.
+
+    Raises:
+        asserr: AssertionError if both files are different.
+    """
+    data = pd.read_csv(data_path)
+    fitted_pipeline = build_pipeline()
+    final_data = fitted_pipeline.fit_transform(data)
+    model = trn.build_model(max_leaf_nodes=10).set_params(n_estimators=5)
+    model.fit(final_data.drop(GOAL_VARIABLE, axis=1), final_data[GOAL_VARIABLE])
+    input_path = tmp_path / "input.csv"
+    data.drop(GOAL_VARIABLE, axis=1).to_csv(input_path, index=False)
+    full_path = tmp_path / "full.csv"
+    stream_path = tmp_path / "stream.csv"
+    score_csv(model, fitted_pipeline, str(input_path), str(full_path))
+    score_csv(
+        model, fitted_pipeline, str(input_path), str(stream_path),
+        chunksize=100
+    )
+    try:
+        assert full_path.read_bytes() == stream_path.read_bytes()
+    except AssertionError as asserr:
+        logging.error("The streaming mode generated a different file.")
+        raise asserr
+
+
+def test_stream_inplace(data_path, tmp_path):
+    """Score a csv file by chunks with a pipeline fitted in the inplace
+        mode.
+
+    Args:
+        data_path (str): the path where the dataset is located.
+        tmp_path (Path): a temporary folder given by pytest.
+
+    Raises:
+        asserr: AssertionError if the pipeline mutates the chunks or the
+        file differs from the one of a pipeline without the inplace mode.
+    """
+    data = pd.read_csv(data_path)
+    data_test = data.drop(GOAL_VARIABLE, axis=1)
+    input_path = tmp_path / "input.csv"
+    data_test.to_csv(input_path, index=False)
+    fitted_pipeline = build_pipeline(inplace=True)
+    final_data = fitted_pipeline.fit_transform(data.copy())
+    model = trn.build_model(max_leaf_nodes=10).set_params(n_estimators=5)
+    model.fit(
+        final_data.drop(GOAL_VARIABLE, axis=1), final_data[GOAL_VARIABLE]
+    )
+    full_path = tmp_path / "full.csv"
+    stream_path = tmp_path / "stream.csv"
+    cached_path = tmp_path / "cached.csv"
+    score_csv(model, build_pipeline().fit(data), str(input_path),
+              str(full_path))
+    score_csv(
+        model, fitted_pipeline, str(input_path), str(stream_path),
+        chunksize=500
+    )
+    _, _, cached_pipeline = preprocess_cached(
+        DatasetCache(str(tmp_path / "cache")), data.copy(), data_test.copy(),
+        [data_path], inplace=True
+    )
+    score_csv(
+        model, cached_pipeline, str(input_path), str(cached_path),
+        chunksize=500
+    )
+    art.save_artifacts(model, fitted_pipeline, str(tmp_path / "artifacts"))
+    try:
+        assert full_path.read_bytes() == stream_path.read_bytes()
+        assert full_path.read_bytes() == cached_path.read_bytes()
+        assert not cached_pipeline.inplace
+        assert fitted_pipeline.inplace
+        assert not art.load_pipeline(str(tmp_path / "artifacts")).inplace
+    except AssertionError as asserr:
+        logging.error("The inplace pipeline did not score the chunks.")
+        raise asserr
+
+
+def test_score_unknown_categories(data_path, tmp_path):
+    """Score listings with an ordinal and a label value not seen in
+        training.
+
+    Args:
+        data_path (str): the path where the dataset is located.
+        tmp_path (Path): a temporary folder given by pytest.
+
+    Raises:
+        asserr: AssertionError if the listings were not scored as the ones
+        with the modes.
+    """
+    data = pd.read_csv(data_path)
+    fitted_pipeline = build_pipeline()
+    final_data = fitted_pipeline.fit_transform(data)
+    model = trn.build_model(max_leaf_nodes=10).set_params(n_estimators=5)
+    model.fit(
+        fitted_pipeline.to_matrix(final_data), final_data[GOAL_VARIABLE]
+    )
+    listings = data.drop(GOAL_VARIABLE, axis=1).iloc[:3].copy()
+    unknown_path = tmp_path / "unknown.csv"
+    listings.assign(
+        Neighborhood=["NewTown", "NewTown", "NewTown"],
+        Street=["Pave", "Cobble", "Pave"]
+    ).to_csv(unknown_path, index=False)
+    modes = dict(zip(
+        fitted_pipeline.fill_columns_, fitted_pipeline.fill_values_
+    ))
+    mode_path = tmp_path / "mode.csv"
+    listings.assign(
+        Neighborhood=modes["Neighborhood"],
+        Street=["Pave", modes["Street"], "Pave"]
+    ).to_csv(mode_path, index=False)
+    score_csv(
+        model, fitted_pipeline, str(unknown_path),
+        str(tmp_path / "unknown_scored.csv")
+    )
+    score_csv(
+        model, fitted_pipeline, str(mode_path),
+        str(tmp_path / "mode_scored.csv")
+    )
+    try:
+        assert (tmp_path / "unknown_scored.csv").read_bytes() == (
+            tmp_path / "mode_scored.csv"
+        ).read_bytes()
+    except AssertionError as asserr:
+        logging.error("The unknown values were not filled with the mode.")
+        raise asserr
@@ -0,0 +1,106 @@
+"""Hyperparameter search testing
+
+This script test the functions related to the search of the parameters of
+the random forest by successive halving. A fixture was defined in order to
+return the path associated to the source dataset, which is processed with
+the pipeline of the main module.
+
+The expected result is that the grid is parsed and expanded into every
+combination of values, that each round keeps less candidates with more
+rows, and that every trial is written to the folder of the search.
+"""
+
+import json
+import logging
+
+import pandas as pd
+import pytest
+
+from main import GOAL_VARIABLE, pipeline
+from src import search as srch
+
+
+@pytest.fixture(scope="module", name="data_path")
+def path():
+    """return the path of the train dataset."""
+    return "data/train.csv"
+
+
+def test_expand_grid():
+    """Check that the grid given as text is expanded into every candidate.
+
+    Raises:
+        asserr: AssertionError if a candidate is missing or not parsed.
+    """
+    grid = srch.parse_grid([
+        "max_leaf_nodes=50,250", "max_features=0.5,sqrt,None"
+    ])
+    try:
+        candidates = srch.expand_grid(grid)
+        assert len(candidates) == 6
+        assert {"max_leaf_nodes": 50, "max_features": None} in candidates
+        assert {"max_leaf_nodes": 250, "max_features": 0.5} in candidates
+        assert {"max_leaf_nodes": 250, "max_features": "sqrt"} in candidates
+    except AssertionError as asserr:
+        logging.error("The grid was not expanded well.")
+        raise asserr
+    with pytest.raises(ValueError):
+        srch.expand_grid({"max_features": [0.5]})
+    with pytest.raises(ValueError):
+        srch.parse_grid(["max_leaf_nodes"])
+
+
+def test_halving_schedule():
+    """Check that each round keeps less candidates with more rows, and that
+        the last one uses all the rows.
+
+    Raises:
+        asserr: AssertionError if the schedule is not halving.
+    """
+    try:
+        assert srch.halving_schedule(45, 1460) == [
+            (45, 162), (15, 486), (5, 1460)
+        ]
+        assert srch.halving_schedule(1, 1460) == [(1, 1460)]
+        assert srch.halving_schedule(9, 50) == [(9, 50)]
+    except AssertionError as asserr:
+        logging.error("The rounds of the search are not well computed.")
+        raise asserr
+
+
+def test_successive_halving(data_path, tmp_path):
+    """Search a small grid with two workers and check the saved trials.
+
+    Args:
+        data_path (str): the path where the dataset is located.
+        tmp_path (Path): a temporary folder for the trials.
+
+    Raises:
+        asserr: AssertionError if a trial is missing or not saved.
+    """
+    final_data = pipeline(pd.read_csv(data_path))
+    candidates = srch.expand_grid({
+        "max_leaf_nodes": [5, 10, 50], "n_estimators": [5]
+    })
+    trials = srch.successive_halving(
+        final_data.drop(GOAL_VARIABLE, axis=1),
+        final_data[GOAL_VARIABLE],
+        candidates,
+        folds=3,
+        min_rows=len(final_data) // 3,
+        n_jobs=2,
+        output=str(tmp_path)
+    )
+    with open(tmp_path / "trials.jsonl", encoding="utf-8") as trials_json:
+        saved = [json.loads(line) for line in trials_json]
+    with open(tmp_path / "best.json", encoding="utf-8") as best_json:
+        best = json.load(best_json)
+    try:
+        assert [trial["round"] for trial in trials] == [0, 0, 0, 1]
+        assert trials[-1]["rows"] == len(final_data)
+        assert saved == trials
+        assert best == trials[-1]
+        assert len(trials[0]["scores"]) == 3
+    except AssertionError as asserr:
+        logging.error("The trials of the search were not saved.")
+        raise asserr
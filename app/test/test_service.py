@@ -0,0 +1,94 @@
+"""Scoring service testing
+
+This script test the local scoring service. A fixture was defined in order to
+return the path associated to the source dataset, which is used to train a
+small model served on a free local port.
+
+The expected result is that the service returns the same predictions as the
+model, and that concurrent listings are grouped into batches.
+"""
+
+import json
+import logging
+import threading
+import urllib.request
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from main import GOAL_VARIABLE, build_pipeline
+from src import training as trn
+from src.service import MicroBatcher, make_server
+
+
+@pytest.fixture(scope="module", name="data_path")
+def path():
+    """return the path of the train dataset."""
+    return "data/train.csv"
+
+
+def test_micro_batcher():
+    """Check that the listings submitted together are scored in one batch.
+
+    Raises:
+        asserr: AssertionError if the listings were not batched.
+    """
+    sizes = []
+
+    def predict_batch(listings):
+        sizes.append(len(listings))
+        return np.array([listing["value"] * 2 for listing in listings])
+
+    batcher = MicroBatcher(predict_batch, max_batch_size=8, max_wait=0.5)
+    futures = [batcher.submit({"value": value}) for value in range(8)]
+    batcher.start()
+    try:
+        assert [future.result() for future in futures] == list(range(0, 16, 2))
+        assert sizes == [8]
+    except AssertionError as asserr:
+        logging.error("The listings were not scored in a single batch.")
+        raise asserr
+    finally:
+        batcher.stop()
+
+
+def test_predict_endpoint(data_path):
+    """Score listings through the service.
+
+    Args:
+        data_path (str): the path where the dataset is located.
+
+    Raises:
+        asserr: AssertionError if the service predicts differently.
+    """
+    data = pd.read_csv(data_path)
+    fitted_pipeline = build_pipeline()
+    final_data = fitted_pipeline.fit_transform(data)
+    X = final_data.drop(GOAL_VARIABLE, axis=1)
+    model = trn.build_model(max_leaf_nodes=10).set_params(n_estimators=5)
+    model.fit(X, final_data[GOAL_VARIABLE])
+    server = make_server(model, fitted_pipeline, port=0, max_wait=0.001)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    listings = json.loads(
+        data.drop(GOAL_VARIABLE, axis=1).head(3).to_json(orient="records")
+    )
+    request = urllib.request.Request(
+        f"http://{host}:{port}/predict",
+        data=json.dumps(listings).encode("utf-8")
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            prices = [row["SalePrice"] for row in json.loads(response.read())]
+        with urllib.request.urlopen(f"http://{host}:{port}/stats") as response:
+            stats = json.loads(response.read())
+        np.testing.assert_allclose(prices, model.predict(X.head(3)))
+        assert stats["requests"] == 1
+    except AssertionError as asserr:
+        logging.error("The service did not score the listings well.")
+        raise asserr
+    finally:
+        server.shutdown()
+        server.server_close()
+        server.batcher.stop()
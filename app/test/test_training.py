@@ -0,0 +1,88 @@
+"""Model training testing
+
+This script test the functions related to the training and evaluation of
+the random forest model. A fixture was defined in order to return the path
+associated to the source dataset, which is processed with the pipeline of
+the main module.
+
+The expected result is that the workers are split between the folds and the
+trees without exceeding the number requested, and that every fold is
+evaluated with any of the pools of workers.
+"""
+
+import logging
+
+import pandas as pd
+import pytest
+
+from main import GOAL_VARIABLE, pipeline
+from src import training as trn
+
+
+@pytest.fixture(scope="module", name="data_path")
+def path():
+    """return the path of the train dataset."""
+    return "data/train.csv"
+
+
+def test_split_workers():
+    """Check that the workers of the folds and the trees are not
+        oversubscribed.
+
+    Raises:
+        asserr: AssertionError if more workers than requested are used.
+    """
+    try:
+        assert trn.split_workers(32, 10) == (10, 3)
+        assert trn.split_workers(4, 10) == (4, 1)
+        assert trn.split_workers(1, 10) == (1, 1)
+    except AssertionError as asserr:
+        logging.error("The workers were not split well.")
+        raise asserr
+
+
+@pytest.mark.parametrize("backend", sorted(trn.BACKENDS))
+def test_cross_validate_model(data_path, backend):
+    """Evaluate a small model with each pool of workers.
+
+    Args:
+        data_path (str): the path where the dataset is located.
+        backend (str): the pool of workers to use.
+
+    Raises:
+        asserr: AssertionError if a fold was not evaluated.
+    """
+    final_data = pipeline(pd.read_csv(data_path))
+    y = final_data[GOAL_VARIABLE]
+    X = final_data.drop(GOAL_VARIABLE, axis=1)
+    model = trn.build_model(max_leaf_nodes=10).set_params(n_estimators=5)
+    try:
+        scores = trn.cross_validate_model(
+            model, X, y, folds=3, n_jobs=2, backend=backend
+        )
+        assert len(scores) == 3
+    except AssertionError as asserr:
+        logging.error("The cross validation was not executed.")
+        raise asserr
+
+
+@pytest.mark.parametrize("name", sorted(trn.MODELS))
+def test_create_model(name):
+    """Create each model of the registry with one worker and a seed.
+
+    Args:
+        name (str): the name of the model in the registry.
+
+    Raises:
+        asserr: AssertionError if the workers or the seed were not set.
+    """
+    model = trn.create_model(name, n_jobs=1, seed=7)
+    params = model.get_params()
+    try:
+        assert params.get("n_jobs", 1) == 1
+        assert params.get("random_state", 7) == 7
+    except AssertionError as asserr:
+        logging.error("The model %s was not created well.", name)
+        raise asserr
+    with pytest.raises(ValueError):
+        trn.create_model("linear_svm")